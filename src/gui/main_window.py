@@ -10,9 +10,8 @@
 
 from PySide6.QtWidgets import QMainWindow, QStatusBar, QWidget, QCheckBox, QVBoxLayout, QWidgetAction, QSplitter, QTabWidget, QProgressBar, QFileDialog, QMessageBox
 from PySide6.QtGui import QAction
-from PySide6.QtCore import QDir, Qt, QSignalBlocker
+from PySide6.QtCore import QDir, Qt, QSignalBlocker, QTimer
 
-from utils.file_utils import list_prof_files
 from utils.postprocess import toggle_postprocessor, PostprocessManager, get_postprocessors, PostprocessResult
 from utils import preferences
 from utils.figure_export import copy_plot_widget_to_clipboard
@@ -22,13 +21,14 @@ from gui.widgets.sidebar import Sidebar
 from gui.widgets.FileView import FileView
 from gui.widgets.ProfileWidget import ProfileWidget
 from gui.log_window import LogWindow
-from models.Profile import Profile
 import settings
 import store
 from workers.file_transfer import FileTransferManager
+from workers.roll_view_loader import RollViewLoader
 from gui.widgets.serialports import SerialWidget
 from gui.widgets.DirectoryView import DirectoryView
 from gui.widgets.StatisticsAnalysis import StatisticsAnalysisWidget
+from models.AlertIndex import AlertIndex
 from gui.settings import SettingsWindow
 from gui.qr_config_dialog import QRConfigDialog
 from utils.translation import _
@@ -43,6 +43,8 @@ class MainWindow(QMainWindow):
 
         self.file_transfer_manager = FileTransferManager()
         self.postprocess_manager = PostprocessManager()
+        self.roll_view_loader = RollViewLoader(self)
+        self.roll_view_loader.loaded.connect(self.on_roll_view_loaded)
         self.log_window = None
         self.settings_window = None
         self.directory_name = None
@@ -56,8 +58,14 @@ class MainWindow(QMainWindow):
         self.sidebar.addWidget(self.directory_view)
 
         self.tab_view = QTabWidget()
-        self.statistics_analysis_widget = StatisticsAnalysisWidget()
+        self.statistics_analysis_widget = StatisticsAnalysisWidget(roll_filter=self.directory_view.roll_filter)
         self.statistics_analysis_widget.directory_selected.connect(self.on_statistics_directory_selected)
+        store.roll_repository.add_invalidation_listener(self._on_roll_invalidated)
+        # Rolls out of alert limits, badged in the directory view
+        self.alert_index = AlertIndex()
+        self.alert_index.set_limits(preferences.alert_limits)
+        self.statistics_analysis_widget.roll_statistics_changed.connect(self.on_roll_statistics_changed)
+        preferences.add_change_listener(self._on_preferences_changed)
         self.profile_widget = ProfileWidget()
         self.tab_view.addTab(self.profile_widget, _("TAB_TITLE_PROFILES"))
         self.tab_view.addTab(self.statistics_analysis_widget, _("TAB_TITLE_STATISTICS"))
@@ -65,7 +73,7 @@ class MainWindow(QMainWindow):
 
         self.fileView = FileView()
         self.fileView.file_selected.connect(self.on_file_selected)
-        self.fileView.profile_state_changed.connect(self.refresh_plot)
+        self.fileView.profile_state_changed.connect(self.on_profile_state_changed)
         self.fileView.sort_changed.connect(self.on_file_sort_changed)
 
         self.directory_view.directory_selected.connect(self.on_directory_selected)
@@ -125,6 +133,11 @@ class MainWindow(QMainWindow):
 
         self.postprocess_manager.postprocess_finished.connect(self.on_postprocess_finished)
 
+        # Cache memory use in the log, to follow it over a long session
+        self.cache_telemetry_timer = QTimer(self)
+        self.cache_telemetry_timer.timeout.connect(self.log_cache_telemetry)
+        self.cache_telemetry_timer.start(settings.CACHE_TELEMETRY_INTERVAL_MS)
+
     def on_scan_progress(self, value, text):
         self.scan_progress_bar.setVisible(True)
         self.scan_progress_bar.setValue(value)
@@ -408,13 +421,14 @@ class MainWindow(QMainWindow):
             return
 
         directory_changed = store.selected_directory != directory
-        self.directory_name = os.path.basename(directory)
         store.selected_directory = directory
         if directory_changed:
             store.selected_profile = None
-        self.load_profiles(store.selected_directory)
+            # The file list shows the new roll before its profiles have loaded
+            store.unload_roll()
         self.fileView.set_directory(store.selected_directory)
-        self.profile_widget.update_plot(store.profiles, self.directory_name)
+        # The plot is updated in on_roll_view_loaded once the roll has loaded
+        self.load_profiles(store.selected_directory)
 
     def on_statistics_directory_selected(self, directory):
         self.on_directory_selected(directory)
@@ -430,18 +444,31 @@ class MainWindow(QMainWindow):
             print(f"Invalid directory path provided to load_profiles: '{dir_path}'")
             return
 
-        files = list_prof_files(store.selected_directory)
-        profiles = [ Profile.fromfile(filename) for filename in files ]
-        profiles = [ profile for profile in profiles if profile is not None ]
-        store.profiles = profiles
+        # Loading and calculation run in the background, a newer selection cancels them
+        self.roll_view_loader.load(dir_path)
+
+    def on_roll_view_loaded(self, view):
+        if view.path != store.selected_directory:
+            store.roll_repository.release(view.path)
+            return
+
+        store.set_loaded_roll(view.path, view.roll)
 
         # Sort profiles using current sort criteria
         store.sort_profiles()
 
+        self.directory_name = os.path.basename(view.path)
+        self.profile_widget.update_plot(store.profiles, self.directory_name, view)
+        self.fileView.refresh_profiles()
+
+        # Have the rolls next to this one ready when the user moves on
+        self.roll_view_loader.prefetch(
+            self.directory_view.neighbour_directory_paths(settings.ROLL_PREFETCH_NEIGHBOURS))
+
     def on_file_selected(self, file_path):
         filename = os.path.basename(file_path)
         store.selected_profile = filename
-        self.profile_widget.update_plot(store.profiles, self.directory_name)
+        self.profile_widget.update_profile_styles(store.profiles, self.directory_name)
 
     def on_directory_contents_changed(self):
         # Reload the selected directory and redraw plot. If the selected folder
@@ -457,29 +484,35 @@ class MainWindow(QMainWindow):
         self.directory_view.select_first_directory()
 
     def refresh_plot(self):
+        """Redraw after a preference change; loaded profiles are updated in memory."""
         if not store.selected_directory:
             return
 
-        # Store which profiles are currently hidden
-        # TODO: refactor this later, this was introduced only because flip feature was added
-        hidden_names = set()
-        for profile in store.profiles:
-            if hasattr(profile, 'hidden') and profile.hidden:
-                hidden_names.add(profile.name)
-
-        # Reload profiles to apply new flip_profiles preference
-        self.load_profiles(store.selected_directory)
+        # Loaded and prefetched rolls were calculated with the old preferences
+        self.roll_view_loader.clear_cache()
+        if self.roll_view_loader.is_loading():
+            self.roll_view_loader.cancel()
+            self.load_profiles(store.selected_directory)
+            return
 
-        # Restore hidden state
-        for profile in store.profiles:
-            if profile.name in hidden_names:
-                profile.hidden = True
+        # File changes are picked up by on_directory_contents_changed, here only
+        # preferences such as flip_profiles or the band pass filter can differ
+        store.roll_repository.apply_preferences()
 
         self.profile_widget.update_plot(store.profiles, self.directory_name)
 
+    def on_profile_state_changed(self):
+        """Redraw after profiles were hidden or shown, nothing is reloaded."""
+        if not store.selected_directory or store.loaded_roll_path != store.selected_directory:
+            # The plot is updated in on_roll_view_loaded once the roll has loaded
+            return
+        self.profile_widget.update_profile_styles(store.profiles, self.directory_name)
+
     def on_file_sort_changed(self, column_index, sort_order):
         """Handle file list sort changes and update the plot order accordingly."""
         store.sort_profiles(column_index, sort_order)
+        # Mean profiles of cached rolls follow the old order in continuous mode
+        self.roll_view_loader.clear_cache()
         self.profile_widget.update_plot(store.profiles, self.directory_name)
 
     def on_root_directory_changed(self, directory):
@@ -496,9 +529,10 @@ class MainWindow(QMainWindow):
             )
 
     def _clear_profile_selection(self, root_directory=None, clear_plot=True):
+        self.roll_view_loader.cancel()
         store.selected_directory = None
         store.selected_profile = None
-        store.profiles = []
+        store.unload_roll()
         self.directory_name = None
         if root_directory and os.path.isdir(root_directory):
             self.fileView.set_directory(root_directory)
@@ -539,7 +573,11 @@ class MainWindow(QMainWindow):
         self.settings_window.settings_updated.connect(self.refresh_plot)
         self.settings_window.show()
 
+    def log_cache_telemetry(self):
+        print(store.cache_budget.summary())
+
     def open_log_window(self):
+        self.log_cache_telemetry()
         self.log_window = LogWindow(store.log_manager)
         self.log_window.closed.connect(self.on_log_window_closed)
         self.log_window.show()
@@ -614,6 +652,23 @@ class MainWindow(QMainWindow):
             self.log_window.close()
             self.log_window = None
 
+    def _on_roll_invalidated(self, path):
+        # Statistics calculated before a roll changed are out of date
+        self.statistics_analysis_widget.cache_valid = False
+
+    def on_roll_statistics_changed(self, roll_statistics):
+        self.alert_index.set_roll_statistics(roll_statistics)
+        self.directory_view.set_alert_violations(self.alert_index.violations_by_path())
+
+    def _on_preferences_changed(self, keys):
+        if 'alert_limits' in keys and self.alert_index.set_limits(preferences.alert_limits):
+            self.directory_view.set_alert_violations(self.alert_index.violations_by_path())
+
     def closeEvent(self, event):
         self.close_child_windows()
+        self.cache_telemetry_timer.stop()
+        self.roll_view_loader.stop()
+        store.roll_repository.remove_invalidation_listener(self._on_roll_invalidated)
+        preferences.remove_change_listener(self._on_preferences_changed)
+        self.directory_view.model.date_indexer.save()
         event.accept()
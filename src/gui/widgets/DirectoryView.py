@@ -1,4 +1,5 @@
 from PySide6.QtWidgets import (
+    QCheckBox,
     QFileSystemModel,
     QFileDialog,
     QPushButton,
@@ -13,22 +14,27 @@ from PySide6.QtCore import (
     QDateTime,
     QSortFilterProxyModel,
     Signal,
-    QFileSystemWatcher,
+    Slot,
     QItemSelectionModel,
     QTimer,
     QSignalBlocker,
 )
+from PySide6.QtGui import QColor, QIcon, QPainter, QPixmap
 import settings
 from gui.widgets.ContextMenuTreeView import ContextMenuTreeView
 from gui.widgets.RegexFilterLineEdit import RegexFilterLineEdit
 from utils.file_utils import open_in_file_explorer
 from utils.translation import _
 from gui.widgets.messagebox import show_error_msgbox
+from utils.change_coalescer import ChangeCoalescer
+from utils.directory_watcher import DirectoryWatcher
+from utils.roll_filter import RollFilter
+from utils import profile_stats
+from models.RollIndex import RollIndex, roll_sort_key
+from workers.roll_date_indexer import RollDateIndexer, latest_profile_mtime
 import os
 from datetime import datetime
 
-CUSTOM_SORT_FILES_IN_DIRECTORY_LIMIT = 128
-
 selection_flags = (
     QItemSelectionModel.SelectionFlag.Clear |
     QItemSelectionModel.SelectionFlag.Select |
@@ -69,6 +75,7 @@ class DirectoryView(QWidget):
         self.active_roll_filter_pattern = ""
         self.active_roll_filter_regex = None
         self._suppress_directory_contents_signal = False
+        self._select_first_when_dated = False
 
         # Set up the layout
         layout = QVBoxLayout(self)
@@ -79,8 +86,11 @@ class DirectoryView(QWidget):
         self.model.setFilter(QDir.Filter.NoDotAndDotDot | QDir.Filter.AllDirs)
         self.model.directoryLoaded.connect(self.init_selection)
         self.model.fileRenamed.connect(self.on_directory_renamed)
+        self.model.date_indexer.idle.connect(self.on_dates_indexed)
 
-        self.proxy_model = DirectorySortFilterProxyModel()
+        # Shared with the statistics analysis, see MainWindow
+        self.roll_filter = RollFilter()
+        self.proxy_model = DirectorySortFilterProxyModel(roll_filter=self.roll_filter)
         self.proxy_model.setSourceModel(self.model)
 
         self.treeView = DirectoryTreeView(self.proxy_model)
@@ -105,6 +115,9 @@ class DirectoryView(QWidget):
         self.rollFilterInput = RegexFilterLineEdit(_("FOLDER_FILTER_PLACEHOLDER"))
         self.rollFilterInput.filter_changed.connect(self.set_roll_filter)
 
+        self.outOfLimitsCheckBox = QCheckBox(_("FOLDER_FILTER_OUT_OF_LIMITS"))
+        self.outOfLimitsCheckBox.toggled.connect(self.set_out_of_limits_only)
+
         self.openDirButton = QPushButton(_("BUTTON_TEXT_OPEN_FILE_EXPLORER"))
         self.openDirButton.clicked.connect(self.open_directory_in_file_explorer)
 
@@ -114,14 +127,18 @@ class DirectoryView(QWidget):
 
         # Add widgets to the layout
         layout.addWidget(self.rollFilterInput)
+        layout.addWidget(self.outOfLimitsCheckBox)
         layout.addWidget(self.treeView)
         layout.addWidget(self.openDirButton)
         layout.addWidget(self.changeDirButton)
 
-        # Setup the QFileSystemWatcher
-        self.watcher = QFileSystemWatcher(self)
-        self.watcher.directoryChanged.connect(self.on_directory_changed)
-        self.watcher.fileChanged.connect(self.on_file_changed)
+        # Watch the root directory and the roll folders in it
+        self.watcher = DirectoryWatcher(parent=self)
+        self.watcher.directory_changed.connect(self.on_directory_changed)
+        self.watcher.file_changed.connect(self.on_file_changed)
+        # A file transfer reports every written file, they are handled together
+        self.change_coalescer = ChangeCoalescer(parent=self)
+        self.change_coalescer.changes_ready.connect(self.on_directories_changed)
         self.proxy_model.rowsRemoved.connect(self.on_rows_removed)
         self.proxy_model.rowsAboutToBeInserted.connect(self.on_rows_about_to_be_inserted)
         self.proxy_model.rowsInserted.connect(self.on_rows_inserted)
@@ -143,19 +160,8 @@ class DirectoryView(QWidget):
             return
 
         try:
-            # Clear previous watchers
-            if len(self.watcher.directories()):
-                self.watcher.removePaths(self.watcher.directories())
-            if len(self.watcher.files()):
-                self.watcher.removePaths(self.watcher.files())
-
-            # Add the main directory
-            self.watcher.addPath(directory)
-
-            # Add all immediate subdirectories
-            for entry in os.scandir(directory):
-                if entry.is_dir():
-                    self.watcher.addPath(entry.path)
+            # Only folders that appeared or disappeared since the last call are (un)registered
+            self.watcher.watch(directory)
         except PermissionError:
             show_error_msgbox(
                 _("ERROR_MSGBOX_TEXT_PERMISSION_DENIED").format(directory=directory),
@@ -210,24 +216,54 @@ class DirectoryView(QWidget):
         self._focus_restore_scheduled = False
 
     def set_roll_filter(self, pattern, compiled_regex):
-        selected_path = self.get_selected_directory_path()
         self.active_roll_filter_pattern = pattern
         self.active_roll_filter_regex = compiled_regex
+        self._refilter(lambda: self.proxy_model.set_roll_filter(compiled_regex))
+        self.roll_filter_changed.emit(pattern, compiled_regex)
+
+    @Slot(bool)
+    def set_out_of_limits_only(self, enabled):
+        """Show only the rolls breaching an alert limit."""
+        self._refilter(lambda: self.proxy_model.set_out_of_limits_only(enabled))
+
+    def set_alert_violations(self, violations):
+        """Badge the rolls in violations, roll path -> names of the alert limits it breaches."""
+        if self.model.set_alert_violations(violations) and self.proxy_model.out_of_limits_only:
+            self._refilter(self.proxy_model.invalidateFilter)
+
+    def _refilter(self, change_filter):
+        """Call change_filter, keeping the selected roll if it is still shown."""
+        selected_path = self.get_selected_directory_path()
         self._suppress_directory_contents_signal = True
         selection_blocker = QSignalBlocker(self.treeView.selectionModel())
         try:
-            self.proxy_model.set_roll_filter(compiled_regex)
+            change_filter()
             self._apply_root_index()
             self._selected_directory_path = selected_path
             self._sync_selection_after_filter()
         finally:
             self._suppress_directory_contents_signal = False
             del selection_blocker
-        self.roll_filter_changed.emit(pattern, compiled_regex)
 
     def init_selection(self):
         if not self.treeView.rootIndex().isValid():
             self._apply_root_index()
+        if not self.get_selected_directory_path() and self.treeView.rootIndex().isValid():
+            self.select_first_dated_directory()
+
+    def select_first_dated_directory(self):
+        """Select the first directory once the dates the rows are sorted by are known."""
+        if self.model.is_indexing_dates():
+            self._select_first_when_dated = True
+            return
+        self._select_first_when_dated = False
+        self.select_first_directory()
+
+    def on_dates_indexed(self):
+        if not self._select_first_when_dated:
+            return
+        self._select_first_when_dated = False
+        # The user may have picked a directory meanwhile
         if not self.get_selected_directory_path() and self.treeView.rootIndex().isValid():
             self.select_first_directory()
 
@@ -279,6 +315,8 @@ class DirectoryView(QWidget):
                 self._root_directory = directory
                 self._clear_current_selection(clear_logical_selection=True)
                 self._clear_pending_focus_restore()
+                self.change_coalescer.clear()
+                self.model.set_dated_root(directory)
                 self.model.setRootPath(directory)
                 self.proxy_model.set_root_directory(directory)
                 root_index = self.proxy_model.mapFromSource(self.model.index(directory))
@@ -294,7 +332,7 @@ class DirectoryView(QWidget):
 
                 # Initially select the first directory in the new root
                 if root_index_valid:
-                    self.select_first_directory()
+                    self.select_first_dated_directory()
             except PermissionError:
                 show_error_msgbox(
                     _("ERROR_MSGBOX_TEXT_PERMISSION_DENIED").format(directory=directory),
@@ -382,6 +420,27 @@ class DirectoryView(QWidget):
 
         return selected_path
 
+    def neighbour_directory_paths(self, count):
+        """
+        Return the paths of up to count rolls below and above the current one
+        in the displayed order, nearest first.
+        """
+        current_index = self.treeView.currentIndex()
+        if not current_index.isValid():
+            return []
+
+        parent = current_index.parent()
+        row_count = self.proxy_model.rowCount(parent)
+        paths = []
+        for distance in range(1, count + 1):
+            for row in (current_index.row() + distance, current_index.row() - distance):
+                if not 0 <= row < row_count:
+                    continue
+                source_index = self.proxy_model.mapToSource(self.proxy_model.index(row, 0, parent))
+                if source_index.isValid():
+                    paths.append(self.model.filePath(source_index))
+        return paths
+
     def _is_selectable_directory_path(self, path):
         return (
             path
@@ -509,8 +568,7 @@ class DirectoryView(QWidget):
         self.directory_contents_changed.emit()
 
     def on_directory_changed(self, path):
-        self.refresh_directory_dates([path])
-        self.directory_contents_changed.emit()
+        self.change_coalescer.add(path)
 
     def on_file_changed(self, path):
         # A specific file changed event occurred
@@ -518,6 +576,11 @@ class DirectoryView(QWidget):
         directory_path = os.path.dirname(path)
         self.on_directory_changed(directory_path)
 
+    def on_directories_changed(self, paths):
+        """Refresh the dates of the changed rolls and reload once for a batch of changes."""
+        self.refresh_directory_dates(paths)
+        self.directory_contents_changed.emit()
+
     @staticmethod
     def _normalized_path_key(path):
         return os.path.normcase(os.path.normpath(os.path.abspath(path)))
@@ -616,7 +679,17 @@ class DirectoryView(QWidget):
 class CustomFileSystemModel(QFileSystemModel):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.modified_date_cache = {}
+        # Roll folders of the root with the dates indexed in this session
+        self.roll_index = RollIndex()
+        self._dated_root_prefix = None
+        # Dates are indexed in the background, rows show the date from the
+        # previous session or none until then and are re-sorted as dates come in
+        self.date_indexer = RollDateIndexer(parent=self)
+        self.date_indexer.dates_indexed.connect(self._on_dates_indexed)
+        self.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        # Normalized roll path -> (path, names of the alert limits it breaches)
+        self.alert_violations = {}
+        self._alert_badge = None
 
     def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
         if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
@@ -627,89 +700,183 @@ class CustomFileSystemModel(QFileSystemModel):
                     return _("TREEVIEW_HEADER_DATE_MODIFIED")
         return super().headerData(section, orientation, role)
 
+    def set_dated_root(self, directory):
+        """Only folders inside directory are sorted by their profile dates."""
+        self._dated_root_prefix = os.path.join(os.path.normcase(os.path.abspath(directory)), '')
+        self.roll_index.clear()
+
+    def _is_dated(self, file_path):
+        # Paths of the model are absolute already, normcase only adapts them on Windows
+        return self._dated_root_prefix is not None and os.path.normcase(file_path).startswith(self._dated_root_prefix)
+
+    def _indexed_timestamp(self, file_path):
+        entry = self.roll_index.get(file_path)
+        if entry is not None:
+            return entry.modified
+        self.date_indexer.request(file_path)
+        return self.date_indexer.known_date(file_path)
+
+    def set_alert_violations(self, violations):
+        """Set the rolls out of alert limits, roll path -> limit names. Returns True if any roll changed."""
+        violations = {
+            os.path.normcase(os.path.abspath(path)): (path, tuple(names))
+            for path, names in violations.items()
+        }
+        changed = [
+            key for key in violations.keys() | self.alert_violations.keys()
+            if violations.get(key, (None, None))[1] != self.alert_violations.get(key, (None, None))[1]
+        ]
+        previous, self.alert_violations = self.alert_violations, violations
+        for key in changed:
+            path = (violations.get(key) or previous[key])[0]
+            source_index = self.index(path, 0)
+            if source_index.isValid():
+                self.dataChanged.emit(
+                    source_index, source_index, [Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.ToolTipRole])
+        return bool(changed)
+
+    def breached_alert_limits(self, file_path):
+        """Return the names of the alert limits the roll at file_path breaches."""
+        if not self.alert_violations:
+            return ()
+        # Paths of the model are absolute already
+        entry = self.alert_violations.get(os.path.normcase(file_path))
+        return entry[1] if entry is not None else ()
+
+    def _get_alert_badge(self):
+        if self._alert_badge is None:
+            pixmap = QPixmap(16, 16)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("red"))
+            painter.drawEllipse(3, 3, 10, 10)
+            painter.end()
+            self._alert_badge = QIcon(pixmap)
+        return self._alert_badge
+
     def data(self, index: QModelIndex, role: int):
+        if index.column() == 0 and role in (Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.ToolTipRole) \
+                and self.alert_violations:
+            breached = self.breached_alert_limits(self.filePath(index))
+            if breached:
+                if role == Qt.ItemDataRole.DecorationRole:
+                    return self._get_alert_badge()
+                return _("ROLL_OUT_OF_ALERT_LIMITS_TOOLTIP").format(
+                    limits=", ".join(profile_stats.stat_labels.get(name, name) for name in breached))
         if role == Qt.ItemDataRole.DisplayRole and index.column() == 3:
             file_path = self.filePath(index)
-            # Check if cached
-            if file_path not in self.modified_date_cache:
-                latest_modified_date = self.get_latest_modified_date(file_path)
-                if latest_modified_date:
-                    self.modified_date_cache[file_path] = QDateTime(latest_modified_date)
-                else:
-                    # No custom date available, get the directory's own modification time
-                    try:
-                        dir_mtime = os.path.getmtime(file_path)
-                        self.modified_date_cache[file_path] = QDateTime(datetime.fromtimestamp(dir_mtime))
-                    except (OSError, PermissionError, ValueError):
-                        # Handle problematic paths (root drives, special system paths, etc.)
-                        # Return empty QDateTime for paths that cannot be accessed
-                        self.modified_date_cache[file_path] = QDateTime()
-            return self.modified_date_cache.get(file_path)
+            if not self._is_dated(file_path):
+                # Folders outside the root are not listed, their folder time will do
+                return self.lastModified(index)
+            return self._to_date_time(self._indexed_timestamp(file_path))
         return super().data(index, role)
 
+    def date_sort_key(self, index: QModelIndex):
+        """Return the key the row at index is sorted by date with, see roll_sort_key."""
+        file_path = self.filePath(index)
+        if self._is_dated(file_path):
+            entry = self.roll_index.get(file_path)
+            if entry is not None:
+                return entry.sort_key
+            timestamp = self._indexed_timestamp(file_path)
+        else:
+            timestamp = self.lastModified(index).toMSecsSinceEpoch() / 1000
+        return roll_sort_key(file_path, self.fileName(index), timestamp)
+
+    @staticmethod
+    def _to_date_time(timestamp):
+        if timestamp is None:
+            # Handle problematic paths (root drives, special system paths, etc.)
+            return QDateTime()
+        try:
+            return QDateTime(datetime.fromtimestamp(timestamp))
+        except (OSError, OverflowError, ValueError):
+            return QDateTime()
+
+    @Slot(list)
+    def _on_dates_indexed(self, results):
+        for file_path, indexed in results:
+            if not self._is_dated(file_path):
+                # Requested before the root changed
+                continue
+            entry = self.roll_index.get(file_path)
+            if entry is not None and entry.modified == indexed.timestamp:
+                continue
+            self.roll_index.update(file_path, os.path.basename(file_path), modified=indexed.timestamp)
+            source_index = self.index(file_path, 3)
+            if source_index.isValid():
+                # The proxy re-sorts the row on dataChanged
+                self.dataChanged.emit(source_index, source_index, [Qt.ItemDataRole.DisplayRole])
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        for row in range(first, last + 1):
+            self.roll_index.remove(self.filePath(self.index(row, 0, parent)))
+
+    def is_indexing_dates(self):
+        return self.date_indexer.is_busy()
+
     def get_latest_modified_date(self, directory_path):
         # Validate that the directory path exists and is a directory
-        if not directory_path or not os.path.exists(directory_path) or not os.path.isdir(directory_path):
+        if not directory_path or not os.path.isdir(directory_path):
             return None
 
-        try:
-            latest_date = None
-            for root, _, files in os.walk(directory_path):
-                if len(files) > CUSTOM_SORT_FILES_IN_DIRECTORY_LIMIT:
-                    return None
-                for file_name in files:
-                    file_name_lower = file_name.lower()
-                    if file_name_lower.endswith('.prof') and file_name_lower != "mean.prof":
-                        file_path = os.path.join(root, file_name)
-                        file_modified = datetime.fromtimestamp(os.path.getmtime(file_path))
-                        if latest_date is None or file_modified > latest_date:
-                            latest_date = file_modified
-            return latest_date
-        except PermissionError:
-            # Silently handle permission errors for individual directories
-            # This is common when traversing directory trees
-            return None
-        except OSError:
-            # Silently handle other OS errors (file deleted, etc.)
-            # These are not critical for display purposes
-            return None
+        timestamp = latest_profile_mtime(directory_path)
+        return datetime.fromtimestamp(timestamp) if timestamp is not None else None
 
     def invalidate_cache(self, directory_path):
-        """Remove the cached date for the given directory to force a recalculation."""
-        if directory_path in self.modified_date_cache:
-            del self.modified_date_cache[directory_path]
+        """Forget the indexed date for the given directory to force a recalculation."""
+        self.date_indexer.invalidate(directory_path)
+        self.roll_index.remove(directory_path)
 
 class DirectorySortFilterProxyModel(QSortFilterProxyModel):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, roll_filter=None):
         super().__init__(parent)
         # Define folders to exclude
         self.excluded_folders = settings.IGNORE_FOLDERS
+        self.roll_filter = roll_filter if roll_filter is not None else RollFilter()
         self.roll_filter_regex = None
+        self.out_of_limits_only = False
         self.root_directory = None
+        # Normalized paths of the root directory and its ancestors
+        self._root_chain = frozenset()
 
     def set_roll_filter(self, roll_filter_regex):
         self.roll_filter_regex = roll_filter_regex
+        self.roll_filter.set_pattern(roll_filter_regex.pattern if roll_filter_regex else "", roll_filter_regex)
+        self.invalidateFilter()
+
+    def set_out_of_limits_only(self, enabled):
+        if self.out_of_limits_only == enabled:
+            return
+        self.out_of_limits_only = enabled
         self.invalidateFilter()
 
     def set_root_directory(self, root_directory):
         if self.root_directory == root_directory:
             return
         self.root_directory = root_directory
+        self._root_chain = self._ancestor_chain(root_directory)
         self.invalidateFilter()
 
-    def is_root_or_root_ancestor(self, file_path):
-        if not self.root_directory:
-            return False
-
+    @staticmethod
+    def _ancestor_chain(directory):
+        chain = set()
+        if not directory:
+            return frozenset()
         try:
-            normalized_path = os.path.normcase(os.path.abspath(file_path))
-            normalized_root = os.path.normcase(os.path.abspath(self.root_directory))
-            return (
-                normalized_path == normalized_root
-                or os.path.commonpath([normalized_path, normalized_root]) == normalized_path
-            )
+            path = os.path.normcase(os.path.abspath(directory))
         except ValueError:
-            return False
+            return frozenset()
+        while path not in chain:
+            chain.add(path)
+            path = os.path.dirname(path)
+        return frozenset(chain)
+
+    def is_root_or_root_ancestor(self, file_path):
+        # Source paths are absolute, normcase only adapts them on Windows
+        return os.path.normcase(file_path) in self._root_chain
 
     def filterAcceptsRow(self, source_row, source_parent):
         source_model = self.sourceModel()
@@ -724,12 +891,21 @@ class DirectorySortFilterProxyModel(QSortFilterProxyModel):
         if dir_name in self.excluded_folders:
             return False
 
-        if self.roll_filter_regex and not self.roll_filter_regex.search(dir_name):
+        if not self.roll_filter.matches(dir_name):
+            return False
+
+        if self.out_of_limits_only and isinstance(source_model, CustomFileSystemModel) \
+                and not source_model.breached_alert_limits(file_path):
             return False
 
         return super().filterAcceptsRow(source_row, source_parent)
 
     def lessThan(self, left: QModelIndex, right: QModelIndex):
+        source_model = self.sourceModel()
+        if isinstance(source_model, CustomFileSystemModel) and left.column() == 3:
+            # Precomputed keys of the roll index, no QDateTime per comparison
+            return source_model.date_sort_key(left) < source_model.date_sort_key(right)
+
         left_data = self.sourceModel().data(left, Qt.ItemDataRole.DisplayRole)
         right_data = self.sourceModel().data(right, Qt.ItemDataRole.DisplayRole)
 
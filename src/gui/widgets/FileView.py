@@ -154,6 +154,9 @@ class CustomFileSystemModel(QFileSystemModel):
             file_info = self.fileInfo(index)
             file_path = file_info.filePath()
             profile = store.get_profile_by_filename(file_path)
+            if not profile:
+                # The roll's profiles are still loading
+                return False
             # If checkbox is checked => show => hidden = False
             # If checkbox is unchecked => do not show => hidden = True
             hidden = (value == Qt.CheckState.Unchecked.value)
@@ -180,11 +183,22 @@ class CustomFileSystemModel(QFileSystemModel):
 
     def flags(self, index):
         fl = super().flags(index)
-        if index.column() == 5:
-            # Make the 'Hidden' column checkable
+        if index.column() == 5 and store.get_profile_by_filename(self.fileInfo(index).filePath()):
+            # Make the 'Hidden' column checkable once the profile has loaded
             fl |= Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEditable
         return fl
 
+    def refresh_profile_columns(self, parent):
+        """Update the profile length and hidden columns of the files in parent after their roll has loaded."""
+        last_row = self.rowCount(parent) - 1
+        if last_row < 0:
+            return
+        self.dataChanged.emit(
+            self.index(0, 4, parent),
+            self.index(last_row, 5, parent),
+            [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.CheckStateRole],
+        )
+
 
 class FileTreeView(ContextMenuTreeView):
     selectionCleared = Signal()
@@ -218,6 +232,7 @@ class FileView(QWidget):
         self._pending_delete_parent = QPersistentModelIndex()
         self._pending_delete_row = None
         self._pending_directory = None
+        self._refreshing_profiles = False
 
         layout = QVBoxLayout()
         self.setLayout(layout)
@@ -335,6 +350,15 @@ class FileView(QWidget):
                 _("ERROR_MSGBOX_TITLE")
             )
 
+    def refresh_profiles(self):
+        """Show the profile length and hidden state of the loaded roll's files."""
+        # Only the columns are repainted, the profiles' state has not changed
+        self._refreshing_profiles = True
+        try:
+            self.model.refresh_profile_columns(self.proxy_model.mapToSource(self.view.rootIndex()))
+        finally:
+            self._refreshing_profiles = False
+
     def on_file_selected(self, selected, deselected):
         indexes = selected.indexes()
         if len(indexes):
@@ -402,7 +426,8 @@ class FileView(QWidget):
         self._pending_delete_row = None
 
     def on_files_updated(self, **args):
-        self.profile_state_changed.emit()
+        if not self._refreshing_profiles:
+            self.profile_state_changed.emit()
 
     def on_selection_cleared(self):
         self.file_selected.emit('')
@@ -2,9 +2,10 @@ import matplotlib.pyplot as plt
 import settings
 from utils import preferences, profile_stats
 from models.Profile import Profile
+from models.RollView import RollView, spectrum_plot_data, visible_profiles
 from utils.zoom_pan import ZoomPan
-from scipy.signal import welch
 from utils.profile_stats import Stats, calc_mean_profile, has_profile_samples
+from utils.decimation import DecimatedSeries
 from utils.excluded_regions import get_included_samples, get_visual_excluded_ranges
 from utils.highlighted_regions import (
     AbsoluteMeanOffsetHardnessHighlightRegion,
@@ -43,6 +44,11 @@ STYLE_HIGHLIGHT_MEAN_LINE = {
 }
 
 
+# The selected profile is drawn over its regular line. Over the regular line's
+# alpha of 0.2 this gives the selected profile an opacity of 0.6.
+SELECTED_PROFILE_OVERLAY_ALPHA = 0.5
+
+
 def _highlight_edge_style(color):
     return {
         'color': color,
@@ -63,6 +69,54 @@ if preferences.locale == 'ja':
     matplotlib.rcParams['font.family'] = prop.get_name()
 
 
+class DecimatingFigure(Figure):
+    """
+    Figure that draws registered lines decimated to the width of their axes
+    in pixels. Before each draw, lines whose x limits or axes width changed
+    (zoom, pan, resize, export at another resolution) are decimated again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Line2D -> (DecimatedSeries, (x_min, x_max, pixels) of its current data)
+        self._decimated_lines = {}
+
+    @staticmethod
+    def _view_of(line):
+        x_min, x_max = sorted(line.axes.get_xlim())
+        return x_min, x_max, max(int(np.ceil(line.axes.bbox.width)), 1)
+
+    def add_decimated_line(self, line, series):
+        self._decimated_lines[line] = (series, None)
+
+    def copy_decimated_line(self, line, source):
+        """Give line the samples and decimation of source."""
+        line.set_data(source.get_data(orig=False))
+        if source in self._decimated_lines:
+            self._decimated_lines[line] = self._decimated_lines[source]
+
+    def remove_decimated_line(self, line):
+        self._decimated_lines.pop(line, None)
+
+    def decimate_lines(self):
+        for line, (series, view) in list(self._decimated_lines.items()):
+            if line.axes is None:
+                del self._decimated_lines[line]
+                continue
+            current_view = self._view_of(line)
+            if current_view != view:
+                line.set_data(*series.view(*current_view))
+                self._decimated_lines[line] = (series, current_view)
+
+    def clear(self, keep_observers=False):
+        self._decimated_lines = {}
+        return super().clear(keep_observers)
+
+    def draw(self, renderer):
+        self.decimate_lines()
+        super().draw(renderer)
+
+
 class WarningLabel(QLabel):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -91,7 +145,7 @@ class ProfileWidget(QWidget):
 
         # Existing initialization code
         self.layout = QVBoxLayout(self)
-        self.figure = Figure()
+        self.figure = DecimatingFigure()
         self.warning_label = WarningLabel()
         self.empty_state_label = QLabel()
         self.empty_state_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -101,6 +155,17 @@ class ProfileWidget(QWidget):
         self.canvas = FigureCanvas(self.figure)
         self.stats = Stats()
 
+        # Artists of the current plot, see update_plot and update_profile_styles
+        self.profiles = []
+        self.directory_name = None
+        self._profile_lines = {}
+        self._plotted_profiles = {}
+        self._selected_profile_path = None
+        self._selection_line = None
+        self._mean_artists = []
+        self._blit_background = None
+        self.canvas.mpl_connect('draw_event', self._on_canvas_draw)
+
         self.setMinimumHeight(400)
         self.setMinimumWidth(400)
 
@@ -191,64 +256,60 @@ class ProfileWidget(QWidget):
         return plot_ranges
 
     def _draw_distance_highlight_region_edges(self, start_x, end_x, color):
-        self.profile_ax.axvline(start_x, **_highlight_edge_style(color))
+        artists = [self.profile_ax.axvline(start_x, **_highlight_edge_style(color))]
         if end_x != start_x:
-            self.profile_ax.axvline(end_x, **_highlight_edge_style(color))
+            artists.append(self.profile_ax.axvline(end_x, **_highlight_edge_style(color)))
+        return artists
 
     def _draw_hardness_highlight_region_edges(self, start_y, end_y, color):
-        self.profile_ax.axhline(start_y, **_highlight_edge_style(color))
+        artists = [self.profile_ax.axhline(start_y, **_highlight_edge_style(color))]
         if end_y != start_y:
-            self.profile_ax.axhline(end_y, **_highlight_edge_style(color))
+            artists.append(self.profile_ax.axhline(end_y, **_highlight_edge_style(color)))
+        return artists
 
     def _draw_hardness_highlight_mean_line(self, mean_value):
-        self.profile_ax.axhline(mean_value, **STYLE_HIGHLIGHT_MEAN_LINE)
+        return self.profile_ax.axhline(mean_value, **STYLE_HIGHLIGHT_MEAN_LINE)
 
     def _draw_distance_highlight_regions_visualization(self, mean_profile_distances, conversion_factor):
+        artists = []
         for start_x, end_x, color in self._get_distance_highlight_region_plot_ranges(
             mean_profile_distances,
             conversion_factor,
         ):
             if start_x < end_x:
-                self.profile_ax.axvspan(
+                artists.append(self.profile_ax.axvspan(
                     start_x,
                     end_x,
                     alpha=0.2,
                     color=color,
                     zorder=-2,
-                )
-                self._draw_distance_highlight_region_edges(start_x, end_x, color)
+                ))
+                artists.extend(self._draw_distance_highlight_region_edges(start_x, end_x, color))
+        return artists
 
     def _draw_hardness_highlight_regions_visualization(self, mean_profile_distances, mean_profile_values):
+        artists = []
         mean_line_drawn = False
         for start_y, end_y, color, is_around_mean, mean_value in self._get_hardness_highlight_region_plot_ranges(
             mean_profile_distances,
             mean_profile_values,
         ):
             if start_y < end_y:
-                self.profile_ax.axhspan(
+                artists.append(self.profile_ax.axhspan(
                     start_y,
                     end_y,
                     alpha=0.15,
                     color=color,
                     zorder=-3,
-                )
-                self._draw_hardness_highlight_region_edges(start_y, end_y, color)
+                ))
+                artists.extend(self._draw_hardness_highlight_region_edges(start_y, end_y, color))
                 if is_around_mean and not mean_line_drawn:
-                    self._draw_hardness_highlight_mean_line(mean_value)
+                    artists.append(self._draw_hardness_highlight_mean_line(mean_value))
                     mean_line_drawn = True
+        return artists
 
     def _get_spectrum_plot_data(self, mean_profile_values):
-        f, Pxx = welch(mean_profile_values,
-                       fs=(1/settings.SAMPLE_INTERVAL_M),
-                       window='hann',
-                       nperseg=settings.NPERSEG,
-                       noverlap=settings.NOVERLAP,
-                       scaling='spectrum')
-        mask = (
-            (f >= settings.SPECTRUM_LOWER_LIMIT_1M) &
-            (f <= settings.SPECTRUM_UPPER_LIMIT_1M)
-        )
-        return f[mask], np.sqrt(Pxx)[mask]
+        return spectrum_plot_data(mean_profile_values)
 
     def _draw_excluded_regions_visualization(self, mean_profile_distances, conversion_factor):
         """Draw excluded regions visualization on the plot."""
@@ -258,20 +319,22 @@ class ProfileWidget(QWidget):
         )
 
         # Draw each excluded region
+        artists = []
         for i, (start_x, end_x) in enumerate(visual_ranges):
             if start_x < end_x:
-                self.profile_ax.axvspan(
+                artists.append(self.profile_ax.axvspan(
                     start_x,
                     end_x,
                     alpha=0.2,
                     color='gray',
                     label=_("EXCLUDED_REGION") if i == 0 else '',
                     zorder=-1
-                )
+                ))
 
-            self.profile_ax.axvline(start_x, **STYLE_AXVLINE)
+            artists.append(self.profile_ax.axvline(start_x, **STYLE_AXVLINE))
             if end_x != start_x:
-                self.profile_ax.axvline(end_x, **STYLE_AXVLINE)
+                artists.append(self.profile_ax.axvline(end_x, **STYLE_AXVLINE))
+        return artists
 
     def customize_toolbar(self):
         actions = self.toolbar.actions()
@@ -420,145 +483,144 @@ class ProfileWidget(QWidget):
         self.toolbar.setVisible(False)
         self.canvas.draw()
 
-    def update_plot(self, profiles: list[Profile], directory_name):
-        self.stats_widget.setVisible(True)
-        self.canvas.setVisible(True)
-        self.empty_state_label.clear()
-        self.empty_state_label.setHidden(True)
+    def _profile_line_style(self, profile, selected_profile_in_current_directory):
+        # Prevent reducing line opacity if select state is in another folder
+        return {
+            'alpha': 0.2 if selected_profile_in_current_directory else 0.3,
+            'visible': not profile.hidden,
+        }
 
-        # Filter empty profiles before drawing any axes. If there are no usable
-        # profile files, the profile tab should show a UI message, not a plot.
-        self.profiles = [
-            profile for profile in profiles if has_profile_samples(profile)]
-        if len(self.profiles) == 0:
-            self.show_no_profile_files_message(directory_name)
+    def _update_selection_line(self):
+        """Move the selected profile highlight onto the selected profile's line."""
+        profile_line = self._profile_lines.get(self._selected_profile_path)
+        if profile_line is None or not profile_line.get_visible():
+            if self._selection_line is not None:
+                self._selection_line.set_visible(False)
             return
 
-        # Reconfigure axes layout
-        self._setup_axes()
-
-        # Update toolbar visibility
-        self.toolbar.setVisible(preferences.show_plot_toolbar)
-
-        self.clear()
-        self.figure.suptitle(directory_name)
+        if self._selection_line is None:
+            # Drawn over the cached background with blitting, see _on_canvas_draw
+            self._selection_line, = self.profile_ax.plot(
+                [], [], lw=settings.SELECTED_PROFILE_LINE_WIDTH,
+                alpha=SELECTED_PROFILE_OVERLAY_ALPHA, zorder=np.inf, animated=True)
+        self.figure.copy_decimated_line(self._selection_line, profile_line)
+        self._selection_line.set_color(profile_line.get_color())
+        self._selection_line.set_visible(True)
 
-        self.directory_name = directory_name
-        selected_profile_in_current_directory = store.selected_profile in [ p.name for p in self.profiles ]
-
-        # Get distance unit info
-        unit_info = preferences.get_distance_unit_info()
-
-        self.profile_ax.set_ylabel(f"{_("CHART_HARDNESS_LABEL")} [g]")
-        self.profile_ax.set_xlabel(f"{_("CHART_DISTANCE_LABEL")} [{unit_info.unit}]")
-        previous_distance = 0
-
-        for i, profile in enumerate(self.profiles):
-
-            distances = np.array(profile.data.distances) + previous_distance
-            # Convert distances to selected unit
-            distances = distances * unit_info.conversion_factor
-            hardnesses = profile.data.hardnesses
-
-            linestyle = 'solid'
-            if profile.hidden:
-                linestyle = 'None'
-
-            if preferences.continuous_mode and not profile.hidden:
-                previous_distance = (distances[-1] / unit_info.conversion_factor) + settings.SAMPLE_INTERVAL_M
-                if i > 0:
-                    # Add marker between profiles at the first hardness value
-                    self.profile_ax.plot(distances[0], hardnesses[0], marker=7,
-                                       color='k', markersize=6, alpha=0.5, zorder=np.inf)
-
-            # Prevent reducing line opacity if select state is in another folder
-            if selected_profile_in_current_directory:
-                if profile.name == store.selected_profile:
-
-                    self.profile_ax.plot(distances,
-                                         hardnesses,
-                                         alpha=0.6,
-                                         lw=settings.SELECTED_PROFILE_LINE_WIDTH,
-                                         linestyle=linestyle,
-                                         zorder=np.inf)
-                else:
-                    self.profile_ax.plot(
-                        distances, hardnesses, alpha=0.2, linestyle=linestyle)
-            else:
-                self.profile_ax.plot(distances, hardnesses,
-                                     alpha=0.3, linestyle=linestyle)
-
-        if preferences.recalculate_mean:
-            self.profiles = [
-                profile for profile in self.profiles if not profile.hidden]
-        mean_profile_distances, mean_profile_values = calc_mean_profile(
-            self.profiles)
+    def _plot_profile_line(self, distances, values, series=None, **kwargs):
+        """
+        Plot a profile or mean profile line, decimated if enabled. A series
+        precomputed for values is reused at distances.
+        """
+        if not settings.PLOT_DECIMATION:
+            line, = self.profile_ax.plot(np.asarray(distances), values, **kwargs)
+            return line
+
+        # Plot the full extent first so autoscaling sees the same limits as with all samples
+        series = series.with_x(distances) if series is not None else DecimatedSeries(distances, values)
+        width = max(int(np.ceil(self.profile_ax.bbox.width)), 1)
+        line, = self.profile_ax.plot(*series.full_view(width), **kwargs)
+        self.figure.add_decimated_line(line, series)
+        return line
+
+    def _on_canvas_draw(self, event):
+        self._blit_background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_selection_line()
+
+    def _draw_selection_line(self):
+        if self._selection_line is not None and self._selection_line.axes is not None:
+            self.profile_ax.draw_artist(self._selection_line)
+
+    def _blit_selection_line(self):
+        if self._blit_background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._blit_background)
+        self._draw_selection_line()
+        self.canvas.blit(self.figure.bbox)
+
+    @staticmethod
+    def _get_selected_profile_path(profiles):
+        for profile in profiles:
+            if profile.name == store.selected_profile:
+                return profile.path
+        return None
+
+    def _draw_mean_profile(self, unit_info, view: RollView | None = None):
+        """
+        Draw the mean profile of self.profiles and everything derived from it.
+        The mean profile and spectrum are taken from view if it was calculated
+        from self.profiles, otherwise they are calculated here.
+        """
+        for artist in self._mean_artists:
+            artist.remove()
+            self.figure.remove_decimated_line(artist)
+        self._mean_artists = []
+
+        if view is not None and not view.matches(self.profiles):
+            view = None
+        if view is not None:
+            mean_profile_distances, mean_profile_values = view.mean_profile_distances, view.mean_profile
+        else:
+            mean_profile_distances, mean_profile_values = calc_mean_profile(
+                self.profiles)
         self.mean_profile_distances = mean_profile_distances
         self.mean_profile = mean_profile_values
 
         if len(mean_profile_values) > 0:
             # Convert mean profile distances to selected unit
-            mean_profile_distances_converted = mean_profile_distances * unit_info.conversion_factor
-            self.profile_ax.plot(mean_profile_distances_converted,
-                                 mean_profile_values,
-                                 label=_("CHART_MEAN_PROFILE_LABEL"),
-                                 lw=settings.MEAN_PROFILE_LINE_WIDTH,
-                                 color=settings.MEAN_PROFILE_LINE_COLOR)
+            self._mean_artists.append(self._plot_profile_line(
+                mean_profile_distances * unit_info.conversion_factor,
+                mean_profile_values,
+                series=view.mean_series if view is not None else None,
+                label=_("CHART_MEAN_PROFILE_LABEL"),
+                lw=settings.MEAN_PROFILE_LINE_WIDTH,
+                color=settings.MEAN_PROFILE_LINE_COLOR))
 
             x_limits_before_distance_highlights = self.profile_ax.get_xlim()
             if preferences.distance_highlight_regions:
-                self._draw_distance_highlight_regions_visualization(
+                self._mean_artists.extend(self._draw_distance_highlight_regions_visualization(
                     mean_profile_distances,
                     unit_info.conversion_factor,
-                )
+                ))
                 self.profile_ax.set_xlim(x_limits_before_distance_highlights)
 
             x_limits_before_hardness_highlights = self.profile_ax.get_xlim()
             if preferences.hardness_highlight_regions:
-                self._draw_hardness_highlight_regions_visualization(
+                self._mean_artists.extend(self._draw_hardness_highlight_regions_visualization(
                     mean_profile_distances,
                     mean_profile_values,
-                )
+                ))
                 self.profile_ax.set_xlim(x_limits_before_hardness_highlights)
 
             # Visualize excluded regions when enabled
             if preferences.excluded_regions_mode != settings.EXCLUDED_REGIONS_MODE_NONE:
-                self._draw_excluded_regions_visualization(
+                self._mean_artists.extend(self._draw_excluded_regions_visualization(
                     mean_profile_distances,
                     unit_info.conversion_factor,
-                )
+                ))
         else:
             self.warning_label.set_text(
                 _("CHART_WARNING_TEXT_TOO_SHORT_PROFILES"))
 
         if preferences.show_spectrum:
-            spectrum_frequencies, spectrum_amplitudes = self._get_spectrum_plot_data(mean_profile_values)
-            self.spectrum_ax.plot(spectrum_frequencies, spectrum_amplitudes)
-
-            self.spectrum_ax.set_ylabel(f"{_("CHART_AMPLITUDE_LABEL")} [g]")
-            self.spectrum_ax.set_xlabel(f"{_("CHART_FREQUENCY_LABEL")} [1/m]")
-
-        if settings.SPECTRUM_WAVELENGTH_TICKS and preferences.show_spectrum:
-            self.update_ticks_wavelength()
-            self.spectrum_ax.callbacks.connect(
-                'xlim_changed', self.update_ticks_wavelength)
-            self.spectrum_ax.figure.canvas.mpl_connect(
-                'resize_event', self.update_ticks_wavelength)
-
-        self.figure.suptitle(directory_name)
-        if hasattr(settings, 'GRID') and settings.GRID is not None:
-            self.profile_ax.grid()
-            if preferences.show_spectrum:
-                self.spectrum_ax.grid()
+            if view is not None and view.spectrum is not None:
+                spectrum_frequencies, spectrum_amplitudes = view.spectrum
+            else:
+                spectrum_frequencies, spectrum_amplitudes = self._get_spectrum_plot_data(mean_profile_values)
+            self._mean_artists.extend(self.spectrum_ax.plot(spectrum_frequencies, spectrum_amplitudes))
+            self.spectrum_ax.relim()
+            self.spectrum_ax.autoscale_view()
 
+    def _apply_y_limits(self):
         # Calculate max value from all plotted data
         max_plotted_value = 0
         if self.profiles:
-            max_plotted_value = max(max(profile.data.hardnesses)
+            max_plotted_value = max(np.max(profile.data.hardnesses)
                                     for profile in self.profiles if profile.data is not None)
-        if len(mean_profile_values) > 0:
+        if len(self.mean_profile) > 0:
             max_plotted_value = max(
-                max_plotted_value, max(mean_profile_values))
+                max_plotted_value, np.max(self.mean_profile))
 
         # Use per-user Y-limit overrides if provided, otherwise use selected default scaling mode.
         y_axis_scaling = getattr(preferences, "default_y_axis_scaling", settings.Y_AXIS_SCALING_DEFAULT)
@@ -589,13 +651,163 @@ class ProfileWidget(QWidget):
         elif high is not None and not np.isfinite(high):
             self.warning_label.set_text("Y_LIM_HIGH is not a finite value.")
 
+    def _visible_profiles(self, profiles):
+        return visible_profiles(profiles)
+
+    def update_plot(self, profiles: list[Profile], directory_name, view: RollView | None = None):
+        """
+        Draw profiles of the roll directory_name. Whatever view has calculated
+        for these profiles in the background is drawn as is.
+        """
+        self.stats_widget.setVisible(True)
+        self.canvas.setVisible(True)
+        self.empty_state_label.clear()
+        self.empty_state_label.setHidden(True)
+
+        # Filter empty profiles before drawing any axes. If there are no usable
+        # profile files, the profile tab should show a UI message, not a plot.
+        self.profiles = [
+            profile for profile in profiles if has_profile_samples(profile)]
+        if len(self.profiles) == 0:
+            self.show_no_profile_files_message(directory_name)
+            return
+
+        # Reconfigure axes layout
+        self._setup_axes()
+
+        # Update toolbar visibility
+        self.toolbar.setVisible(preferences.show_plot_toolbar)
+
+        self.clear()
+        self.figure.suptitle(directory_name)
+
+        self.directory_name = directory_name
+        self._selected_profile_path = self._get_selected_profile_path(self.profiles)
+        selected_profile_in_current_directory = self._selected_profile_path is not None
+
+        # Get distance unit info
+        unit_info = preferences.get_distance_unit_info()
+
+        self.profile_ax.set_ylabel(f"{_("CHART_HARDNESS_LABEL")} [g]")
+        self.profile_ax.set_xlabel(f"{_("CHART_DISTANCE_LABEL")} [{unit_info.unit}]")
+        previous_distance = 0
+
+        self._profile_lines = {}
+        self._plotted_profiles = {}
+        self._selection_line = None
+        self._mean_artists = []
+
+        for i, profile in enumerate(self.profiles):
+
+            # Convert distances to selected unit, an implicit axis stays implicit
+            distances = (profile.data.distances + previous_distance) * unit_info.conversion_factor
+            hardnesses = profile.data.hardnesses
+
+            if preferences.continuous_mode and not profile.hidden:
+                previous_distance = (distances[-1] / unit_info.conversion_factor) + settings.SAMPLE_INTERVAL_M
+                if i > 0:
+                    # Add marker between profiles at the first hardness value
+                    self.profile_ax.plot(distances[0], hardnesses[0], marker=7,
+                                       color='k', markersize=6, alpha=0.5, zorder=np.inf)
+
+            line = self._plot_profile_line(
+                distances, hardnesses,
+                series=view.series_for(profile) if view is not None else None,
+                **self._profile_line_style(profile, selected_profile_in_current_directory))
+            self._profile_lines[profile.path] = line
+            self._plotted_profiles[profile.path] = (profile.data, profile.hidden)
+
+        self._update_selection_line()
+
+        self.profiles = self._visible_profiles(self.profiles)
+        self._draw_mean_profile(unit_info, view)
+
+        if preferences.show_spectrum:
+            self.spectrum_ax.set_ylabel(f"{_("CHART_AMPLITUDE_LABEL")} [g]")
+            self.spectrum_ax.set_xlabel(f"{_("CHART_FREQUENCY_LABEL")} [1/m]")
+
+        if settings.SPECTRUM_WAVELENGTH_TICKS and preferences.show_spectrum:
+            self.update_ticks_wavelength()
+            self.spectrum_ax.callbacks.connect(
+                'xlim_changed', self.update_ticks_wavelength)
+            self.spectrum_ax.figure.canvas.mpl_connect(
+                'resize_event', self.update_ticks_wavelength)
+
+        self.figure.suptitle(directory_name)
+        if hasattr(settings, 'GRID') and settings.GRID is not None:
+            self.profile_ax.grid()
+            if preferences.show_spectrum:
+                self.spectrum_ax.grid()
+
+        self._apply_y_limits()
+
         # self.profile_ax.legend(loc="upper right")
         self.figure.tight_layout()
         self.canvas.draw()
 
         self._reset_toolbar_history()
 
-        self.stats_widget.update_data((self.mean_profile_distances, self.mean_profile))
+        stat_values = view.stat_values if view is not None and view.matches(self.profiles) else None
+        self.stats_widget.update_data((self.mean_profile_distances, self.mean_profile), stat_values)
+
+    def _can_update_profile_styles(self, profiles, directory_name):
+        if directory_name != self.directory_name or self.canvas.isHidden():
+            return False
+        if self.profile_ax not in self.figure.axes:
+            return False
+
+        plotted = [profile for profile in profiles if has_profile_samples(profile)]
+        # Line colors follow the plotting order, so the order has to match too
+        if [profile.path for profile in plotted] != list(self._plotted_profiles):
+            return False
+
+        hidden_changed = False
+        for profile in plotted:
+            data, hidden = self._plotted_profiles[profile.path]
+            if profile.data is not data:
+                return False
+            hidden_changed = hidden_changed or profile.hidden != hidden
+
+        # Hiding a profile moves the following profiles in continuous mode
+        return not (hidden_changed and preferences.continuous_mode)
+
+    def update_profile_styles(self, profiles: list[Profile], directory_name):
+        """
+        Update the plot after the selected profile or profile visibility changed.
+
+        Only line styles are updated, the mean profile is recalculated if
+        visibility changed it, and a selection change within the roll is blitted.
+        Anything else falls back to a full update_plot.
+        """
+        if not self._can_update_profile_styles(profiles, directory_name):
+            self.update_plot(profiles, directory_name)
+            return
+
+        plotted = [profile for profile in profiles if has_profile_samples(profile)]
+        hidden_changed = any(
+            profile.hidden != self._plotted_profiles[profile.path][1] for profile in plotted)
+
+        previously_selected_in_directory = self._selected_profile_path is not None
+        self._selected_profile_path = self._get_selected_profile_path(plotted)
+        selected_profile_in_current_directory = self._selected_profile_path is not None
+
+        for profile in plotted:
+            self._profile_lines[profile.path].set(
+                **self._profile_line_style(profile, selected_profile_in_current_directory))
+            self._plotted_profiles[profile.path] = (profile.data, profile.hidden)
+        self._update_selection_line()
+
+        self.profiles = self._visible_profiles(plotted)
+        if hidden_changed and preferences.recalculate_mean:
+            self.warning_label.clear()
+            self._draw_mean_profile(preferences.get_distance_unit_info())
+            self._apply_y_limits()
+            self.stats_widget.update_data((self.mean_profile_distances, self.mean_profile))
+
+        if hidden_changed or previously_selected_in_directory != selected_profile_in_current_directory:
+            self.canvas.draw_idle()
+        else:
+            self._blit_selection_line()
 
     def update_ticks_wavelength(self, *args):
         primary_ticks = self.spectrum_ax.get_xticks()
@@ -7,22 +7,61 @@ from PySide6.QtWidgets import (
     QPushButton,
     QLabel,
     QSizePolicy,
+    QCheckBox,
 )
 from PySide6.QtCore import Slot, Signal, Qt
 import store
+import settings
 import os
-from typing import List, Dict, Any
+import numpy as np
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba
 from datetime import datetime, timedelta
 from utils.translation import _
 from utils import preferences
 from utils import profile_stats
+from utils import spc
+from utils.spc import ControlChartData, ProcessControl
+from utils.roll_filter import RollFilter
+from models.RollStatistics import (
+    GRANULARITY_DAY,
+    GRANULARITY_MONTH,
+    GRANULARITY_WEEK,
+    AggregatedStatSeries,
+    RollStatistics,
+    StatSeries,
+)
 from workers.statistics_processor import StatisticsProcessor
 from gui.widgets.LoadingWidget import LoadingWidget
 
 stat_label_map = profile_stats.analysis_stat_label_map
 
+BAR_WIDTH = 0.7
+BAR_COLOR = to_rgba('tab:blue')
+HIGHLIGHTED_BAR_COLOR = to_rgba('tab:orange')
+
+aggregation_options = {
+    "AGGREGATION_EACH_ROLL": None,
+    "AGGREGATION_DAILY": GRANULARITY_DAY,
+    "AGGREGATION_WEEKLY": GRANULARITY_WEEK,
+    "AGGREGATION_MONTHLY": GRANULARITY_MONTH,
+}
+spc_rule_labels = {
+    spc.RULE_BEYOND_3_SIGMA: "SPC_RULE_BEYOND_3_SIGMA",
+    spc.RULE_2_OF_3_BEYOND_2_SIGMA: "SPC_RULE_2_OF_3_BEYOND_2_SIGMA",
+    spc.RULE_4_OF_5_BEYOND_1_SIGMA: "SPC_RULE_4_OF_5_BEYOND_1_SIGMA",
+    spc.RULE_8_ON_ONE_SIDE: "SPC_RULE_8_ON_ONE_SIDE",
+    spc.RULE_CUSUM: "SPC_RULE_CUSUM",
+    spc.RULE_EWMA: "SPC_RULE_EWMA",
+}
+granularity_axis_labels = {
+    GRANULARITY_DAY: "PLOT_TITLE_DAY",
+    GRANULARITY_WEEK: "PLOT_TITLE_WEEK",
+    GRANULARITY_MONTH: "PLOT_TITLE_MONTH",
+}
+
 class StatSelectionDropdown(QComboBox):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -34,6 +73,16 @@ class FilterDropdown(QComboBox):
         self.addItems([_("FILTER_LAST_7_DAYS"), _("FILTER_LAST_30_DAYS"), _("FILTER_SHOW_ALL_ROLLS")])
         self.setCurrentText(_("FILTER_LAST_7_DAYS"))
 
+class AggregationDropdown(QComboBox):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        for text_key, granularity in aggregation_options.items():
+            self.addItem(_(text_key), granularity)
+
+    def granularity(self):
+        """Return the selected granularity, None to show each roll."""
+        return self.currentData()
+
 class StatisticsAnalysisChart(QWidget):
     point_selected = Signal(str)
 
@@ -51,8 +100,12 @@ class StatisticsAnalysisChart(QWidget):
         self.empty_state_label.setStyleSheet("font-size: 16px;")
         self.empty_state_label.setHidden(True)
         self.ax = self.figure.add_subplot(111)
-        self.stat_data = []
-        self.bars = []
+        self.stat_data = StatSeries.empty()
+        # Process control values of the rolls in stat_data, if shown
+        self.control = None
+        # All bars as one collection, bar i is drawn around x = i
+        self.bars = None
+        self.highlighted_index = None
         self.highlighted_point = None
         self.current_filter = None  # Track current filter for display
 
@@ -61,23 +114,57 @@ class StatisticsAnalysisChart(QWidget):
         layout.addWidget(self.canvas)
         self.setLayout(layout)
 
-        self.canvas.mpl_connect("pick_event", self.on_pick)
+        self.canvas.mpl_connect("button_press_event", self.on_click)
         self.canvas.mpl_connect('motion_notify_event', self.on_hover)
 
     def highlight_point(self, label: str):
+        """Highlight the bar of the roll label by recoloring the bars in place."""
         self.highlighted_point = label
-        self.plot(self.stat_data)
+        if self._update_highlight():
+            self.canvas.draw_idle()
 
-    def plot(self, stat_data: List[Dict[str, Any]]):
+    def _update_highlight(self):
+        """Recolor the bars for highlighted_point. Returns True if a bar changed color."""
+        index = None
+        if self.highlighted_point:
+            matches = np.flatnonzero(self.stat_data.labels == self.highlighted_point)
+            if len(matches):
+                index = int(matches[0])
+        if self.bars is None or index == self.highlighted_index:
+            self.highlighted_index = index
+            return False
+
+        colors = np.tile(BAR_COLOR, (len(self.stat_data), 1))
+        if index is not None:
+            colors[index] = HIGHLIGHTED_BAR_COLOR
+        self.bars.set_facecolor(colors)
+        self.highlighted_index = index
+        return True
+
+    def bar_index_at(self, x, y):
+        """Return the index of the bar at data coordinates x, y, or None."""
+        if x is None or y is None or len(self.stat_data) == 0:
+            return None
+        index = int(np.floor(x + 0.5))
+        if index < 0 or index >= len(self.stat_data) or abs(x - index) > BAR_WIDTH / 2:
+            return None
+        height = self.stat_data.y[index]
+        if not min(0.0, height) <= y <= max(0.0, height):
+            return None
+        return index
+
+    def plot(self, stat_data: StatSeries | AggregatedStatSeries, control: ControlChartData | None = None):
         self.stat_data = stat_data
+        self.control = control
         self.ax.clear()
-        self.bars = []
+        self.bars = None
+        self.highlighted_index = None
         self.annot = self.ax.annotate("", xy=(0,0), xytext=(0,10),
                             textcoords="offset points",
                             bbox=dict(boxstyle="round", fc="w"))
         self.annot.set_visible(False)
 
-        if not stat_data:
+        if len(stat_data) == 0:
             self.empty_state_label.setText(_("NO_DATA_AVAILABLE"))
             self.empty_state_label.setVisible(True)
             self.canvas.setVisible(False)
@@ -89,9 +176,8 @@ class StatisticsAnalysisChart(QWidget):
         self.canvas.setVisible(True)
 
         # Use enumerated indices for x-axis instead of timestamps
-        x_indices = list(range(len(stat_data)))
-        y = [p['y'] for p in stat_data]
-        labels = [p['label'] for p in stat_data]
+        x_indices = np.arange(len(stat_data))
+        y = stat_data.y
 
         # Add alert limit ranges as shaded areas if available (draw behind bars)
         if hasattr(self.parent_widget, 'selected_stat'):
@@ -122,20 +208,33 @@ class StatisticsAnalysisChart(QWidget):
                 if matching_limit['max'] is not None:
                     self.ax.axhline(y=matching_limit['max'], color='grey', linestyle='--', alpha=0.7, linewidth=1, zorder=1)
 
-        # Convert to bar chart (draw bars on top with higher zorder)
-        bar_width = 0.7
-        self.bars = self.ax.bar(x_indices, y, width=bar_width, alpha=1, color='tab:blue', picker=5, zorder=2)
-
-        if self.highlighted_point:
-            for i, p in enumerate(stat_data):
-                if p['label'] == self.highlighted_point:
-                    # Highlight the specific bar
-                    self.bars[i].set_color('tab:orange')
-                    self.bars[i].set_alpha(1.0)
-                    break
+        # Draw all bars as one collection on top with higher zorder
+        left = x_indices - BAR_WIDTH / 2
+        right = x_indices + BAR_WIDTH / 2
+        zeros = np.zeros(len(stat_data))
+        vertices = np.stack([
+            np.column_stack([left, zeros]),
+            np.column_stack([left, y]),
+            np.column_stack([right, y]),
+            np.column_stack([right, zeros]),
+        ], axis=1)
+        self.bars = PolyCollection(vertices, facecolors=[BAR_COLOR], edgecolors='none', zorder=2)
+        # Bars start at the axis like with ax.bar
+        self.bars.sticky_edges.y.append(0)
+        self.ax.add_collection(self.bars)
+        self.ax.autoscale_view()
+        self._update_highlight()
+
+        if isinstance(stat_data, AggregatedStatSeries):
+            self._plot_spread(x_indices, stat_data)
+        elif control is not None:
+            self._plot_control(x_indices, stat_data, control)
 
         # Formatting
-        self.ax.set_xlabel(_("PLOT_TITLE_ROLL"))
+        if isinstance(stat_data, AggregatedStatSeries):
+            self.ax.set_xlabel(_(granularity_axis_labels[stat_data.granularity]))
+        else:
+            self.ax.set_xlabel(_("PLOT_TITLE_ROLL"))
         # Get the selected statistic name for y-axis label
         selected_stat_name = _("STATISTIC_VALUE")  # default
         if hasattr(self.parent_widget, 'selected_stat'):
@@ -147,8 +246,11 @@ class StatisticsAnalysisChart(QWidget):
 
         self.ax.grid(True, axis='y')  # Only show horizontal grid lines for bar charts
 
-        # Set x-axis ticks to show roll labels
-        self.ax.set_xticks(x_indices)
+        # Set x-axis ticks at the rolls, unless there are too many to tell apart
+        if len(stat_data) <= settings.STATISTICS_CHART_MAX_TICKS:
+            self.ax.set_xticks(x_indices)
+        else:
+            self.ax.set_xticks([])
 
         # Only show x-axis labels if there are 20 or fewer rolls
         self.ax.set_xticklabels([])  # Hide labels
@@ -157,6 +259,38 @@ class StatisticsAnalysisChart(QWidget):
 
         self.canvas.draw()
 
+    def _plot_spread(self, x_indices, stat_data: AggregatedStatSeries):
+        """Draw the min/max envelope and percentiles of each bin over the mean bars."""
+        self.ax.fill_between(
+            x_indices, stat_data.low, stat_data.high, step='mid',
+            color='grey', alpha=0.3, linewidth=0, zorder=3, label=_("STATISTICS_AGGREGATION_ENVELOPE"),
+        )
+        for percentile, values in stat_data.percentiles.items():
+            self.ax.plot(
+                x_indices, values, drawstyle='steps-mid', linestyle=':', linewidth=1, zorder=3,
+                label=_("STATISTICS_AGGREGATION_PERCENTILE").format(percentile=f"{percentile:g}"),
+            )
+        self.ax.legend(loc='upper left', fontsize=8)
+
+    def _plot_control(self, x_indices, stat_data: StatSeries, control: ControlChartData):
+        """Draw the process control lines and mark the rolls violating a rule."""
+        if control.centre is not None:
+            self.ax.axhline(control.centre, color='tab:green', linewidth=1, zorder=3, label=_("SPC_CENTRE_LINE"))
+            if control.sigma:
+                for sign in (1, -1):
+                    self.ax.axhline(
+                        control.centre + sign * 3 * control.sigma, color='tab:red', linestyle='--', linewidth=1,
+                        zorder=3, label=_("SPC_CONTROL_LIMITS") if sign > 0 else '_nolegend_',
+                    )
+        self.ax.plot(x_indices, control.rolling_mean, color='tab:purple', linestyle=':', linewidth=1, zorder=3,
+                     label=_("SPC_ROLLING_MEAN"))
+        self.ax.plot(x_indices, control.ewma, color='tab:green', linewidth=1.5, zorder=3, label=_("SPC_EWMA"))
+        violated = np.flatnonzero(control.violations)
+        if len(violated):
+            self.ax.plot(violated, stat_data.y[violated], linestyle='none', marker='o', markersize=4,
+                         color='tab:red', zorder=4, label=_("SPC_VIOLATIONS"))
+        self.ax.legend(loc='upper left', fontsize=8)
+
     def on_hover(self, event):
         vis = self.annot.get_visible()
         if event.inaxes != self.ax:
@@ -165,29 +299,32 @@ class StatisticsAnalysisChart(QWidget):
                 self.canvas.draw_idle()
             return
 
-        if not hasattr(self, 'bars'):
+        i = self.bar_index_at(event.xdata, event.ydata)
+        if i is not None:
+            self.annot.xy = (i, event.ydata)
+
+            # Check if the tooltip is too close to the right edge
+            if event.xdata / self.ax.get_xlim()[1] > 0.8:
+                self.annot.set_ha('right')
+            else:
+                self.annot.set_ha('left')
+
+            if isinstance(self.stat_data, AggregatedStatSeries):
+                count_str = _("STATISTICS_AGGREGATION_ROLL_COUNT").format(count=self.stat_data.counts[i])
+                text = f"{self.stat_data.labels[i]}\n{count_str}"
+            else:
+                date_str = datetime.fromtimestamp(self.stat_data.x[i]).strftime('%Y-%m-%d %H:%M')
+                text = f"{self.stat_data.labels[i]}\n{date_str}"
+                if self.control is not None and self.control.violations[i]:
+                    text += "".join(
+                        f"\n{_(label)}" for rule, label in spc_rule_labels.items()
+                        if self.control.violations[i] & rule
+                    )
+            self.annot.set_text(text)
+            self.annot.set_visible(True)
+            self.canvas.draw_idle()
             return
 
-        for i, bar in enumerate(self.bars):
-            cont, _ = bar.contains(event)
-            if cont:
-                point = self.stat_data[i]
-                x_pos = bar.get_x() + bar.get_width() / 2
-                self.annot.xy = (x_pos, event.ydata)
-
-                # Check if the tooltip is too close to the right edge
-                if event.xdata / self.ax.get_xlim()[1] > 0.8:
-                    self.annot.set_ha('right')
-                else:
-                    self.annot.set_ha('left')
-
-                date_str = datetime.fromtimestamp(point['x']).strftime('%Y-%m-%d %H:%M')
-                text = f"{point['label']}\n{date_str}"
-                self.annot.set_text(text)
-                self.annot.set_visible(True)
-                self.canvas.draw_idle()
-                return
-
         if vis:
             self.annot.set_visible(False)
             self.canvas.draw_idle()
@@ -215,6 +352,9 @@ class StatisticsAnalysisChart(QWidget):
         filter_text = ""
         if hasattr(self.parent_widget, 'filter_dropdown'):
             filter_text = self.parent_widget.filter_dropdown.currentText()
+        aggregation_dropdown = getattr(self.parent_widget, 'aggregation_dropdown', None)
+        if aggregation_dropdown is not None and aggregation_dropdown.granularity() is not None:
+            filter_text = f"{filter_text}, {aggregation_dropdown.currentText()}"
         if getattr(self.parent_widget, 'roll_filter_pattern', ""):
             filter_text = f"{filter_text}\n{_('STATISTICS_ROLL_FILTER_LABEL')}: {self.parent_widget.roll_filter_pattern}"
 
@@ -234,32 +374,37 @@ class StatisticsAnalysisChart(QWidget):
 
         return added_texts
 
-    def on_pick(self, event):
-        if event.artist not in self.bars:
-            return True
+    def on_click(self, event):
+        if event.inaxes != self.ax:
+            return
 
         # Find which bar was clicked
-        bar_index = list(self.bars).index(event.artist)
-        point = self.stat_data[bar_index]
-
-        self.highlight_point(point['label'])
-        self.point_selected.emit(point['path'])
+        bar_index = self.bar_index_at(event.xdata, event.ydata)
+        if bar_index is None:
+            return
+        self.highlight_point(str(self.stat_data.labels[bar_index]))
+        self.point_selected.emit(str(self.stat_data.paths[bar_index]))
 
 class StatisticsAnalysisWidget(QWidget):
     directory_selected = Signal(str)
+    roll_statistics_changed = Signal(object)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, roll_filter=None):
         super().__init__(parent)
         self.setLayout(QVBoxLayout())
 
         # Set to the key value, not the display name
         self.selected_stat = list(stat_label_map.values())[0]  # This will be "mean"
 
-        # Cache for processed roll data
-        self.cached_roll_data = []
+        # Cache for processed roll statistics
+        self.roll_statistics = RollStatistics()
         self.cache_valid = False
         self.roll_filter_pattern = ""
         self.roll_filter_regex = None
+        # The roll list passes its filter so both share the match results
+        self.roll_filter = roll_filter if roll_filter is not None else RollFilter()
+        # Control charts of the roll history, extended as new rolls come in
+        self.process_control = ProcessControl()
 
         # Create horizontal layout for dropdowns and refresh button
         # Wrap dropdowns in a container widget so they can be captured together
@@ -273,8 +418,17 @@ class StatisticsAnalysisWidget(QWidget):
         self.filter_dropdown = FilterDropdown(self)
         self.filter_dropdown.currentTextChanged.connect(self.on_filter_changed)
 
+        self.aggregation_dropdown = AggregationDropdown(self)
+        self.aggregation_dropdown.currentIndexChanged.connect(self.on_aggregation_changed)
+
         dropdown_layout.addWidget(self.stat_selection_dropdown)
         dropdown_layout.addWidget(self.filter_dropdown)
+        dropdown_layout.addWidget(self.aggregation_dropdown)
+
+        self.spc_checkbox = QCheckBox(_("SPC_OVERLAY_CHECKBOX"), self)
+        self.spc_checkbox.setChecked(settings.SPC_OVERLAY_DEFAULT)
+        self.spc_checkbox.toggled.connect(self.on_spc_toggled)
+        dropdown_layout.addWidget(self.spc_checkbox)
 
         # Add refresh button
         self.refresh_button_layout = QHBoxLayout()
@@ -318,9 +472,18 @@ class StatisticsAnalysisWidget(QWidget):
     def on_filter_changed(self, filter_option: str):
         self.update_chart()
 
+    @Slot(int)
+    def on_aggregation_changed(self, index: int):
+        self.update_chart()
+
+    @Slot(bool)
+    def on_spc_toggled(self, checked: bool):
+        self.update_chart()
+
     def set_roll_filter(self, pattern: str, compiled_regex):
         self.roll_filter_pattern = pattern
         self.roll_filter_regex = compiled_regex
+        self.roll_filter.set_pattern(pattern, compiled_regex)
         if self.cache_valid and self.isVisible():
             self.update_chart()
 
@@ -346,7 +509,7 @@ class StatisticsAnalysisWidget(QWidget):
             return
 
         # If cache is valid, just filter and update chart
-        if self.cache_valid and self.cached_roll_data:
+        if self.cache_valid and len(self.roll_statistics):
             self.update_chart()
             return
 
@@ -370,73 +533,63 @@ class StatisticsAnalysisWidget(QWidget):
             return
 
         # Apply filters to cached data
-        filtered_data = self.apply_filters(self.cached_roll_data)
+        rows = self.apply_filters(self.roll_statistics)
 
-        # Convert to chart format
-        chart_data = self.prepare_chart_data(filtered_data)
+        # Take the selected statistic of the remaining rolls
+        chart_data = self.prepare_chart_data(self.roll_statistics, rows)
+        control = self.prepare_control_data(chart_data)
 
         # Update chart
-        self.chart.plot(chart_data)
+        self.chart.plot(chart_data, control)
         self.stacked_widget.setCurrentWidget(self.chart)
 
-    def apply_filters(self, roll_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Apply roll-name and time filters to roll data."""
-        filtered_data = roll_data
-        if self.roll_filter_regex:
-            filtered_data = [
-                roll for roll in filtered_data
-                if self.roll_filter_regex.search(str(roll.get('label', '')))
-            ]
-
+    def time_filter_cutoff(self):
+        """Return the timestamp of the oldest roll the time filter shows, None to show all."""
         filter_text = self.filter_dropdown.currentText()
-
-        # No time filtering needed for "show all"
-        if filter_text == _("FILTER_SHOW_ALL_ROLLS"):
-            return filtered_data
-
-        # Calculate cutoff time
-        now = datetime.now()
         if filter_text == _("FILTER_LAST_7_DAYS"):
-            cutoff = now - timedelta(days=7)
-        elif filter_text == _("FILTER_LAST_30_DAYS"):
-            cutoff = now - timedelta(days=30)
-        else:
-            return filtered_data
-
-        cutoff_timestamp = cutoff.timestamp()
-
-        # Filter by timestamp
-        return [roll for roll in filtered_data if roll['timestamp'] >= cutoff_timestamp]
-
-    def prepare_chart_data(self, roll_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Convert roll data to chart format for the selected statistic."""
-        chart_data = []
-        stat_key = self.selected_stat
-
-        for roll in roll_data:
-            stat_value = roll['stats'].get(stat_key)
-            if stat_value is not None:
-                chart_data.append({
-                    'x': roll['timestamp'],
-                    'y': stat_value,
-                    'label': roll['label'],
-                    'path': roll['path']
-                })
-
-        return chart_data
+            return (datetime.now() - timedelta(days=7)).timestamp()
+        if filter_text == _("FILTER_LAST_30_DAYS"):
+            return (datetime.now() - timedelta(days=30)).timestamp()
+        return None
+
+    def apply_filters(self, roll_statistics: RollStatistics):
+        """Return the rows of roll_statistics passing the time and roll-name filters."""
+        rows = roll_statistics.since(self.time_filter_cutoff())
+        if self.roll_filter.regex is None:
+            return rows
+
+        labels = roll_statistics.labels[rows]
+        matches = np.fromiter((self.roll_filter.matches(label) for label in labels), dtype=bool, count=len(labels))
+        return np.arange(rows.start, rows.stop)[matches]
+
+    def prepare_chart_data(self, roll_statistics: RollStatistics, rows=None):
+        """Return the selected statistic of the rolls in rows for the chart, aggregated if selected."""
+        granularity = self.aggregation_dropdown.granularity()
+        if granularity is None:
+            return roll_statistics.series(self.selected_stat, rows)
+        return roll_statistics.aggregate(
+            self.selected_stat, granularity, rows, settings.STATISTICS_AGGREGATION_PERCENTILES)
+
+    def prepare_control_data(self, chart_data):
+        """Return the process control values of the rolls in chart_data, None if not shown."""
+        if not self.spc_checkbox.isChecked() or not isinstance(chart_data, StatSeries):
+            return None
+        self.process_control.sync(self.roll_statistics)
+        return self.process_control.chart(self.selected_stat).data().take(chart_data.rows)
 
     @Slot(int, str)
     def on_processing_progress(self, value: int, status_text: str):
         """Update loading widget with processing progress."""
         self.loading_widget.update_progress(value, status_text)
 
-    @Slot(list)
-    def on_processing_finished(self, roll_data: list):
+    @Slot(object)
+    def on_processing_finished(self, roll_statistics: RollStatistics):
         """Handle completion of statistics processing."""
-        # Cache the roll data
-        self.cached_roll_data = roll_data
+        # Cache the roll statistics
+        self.roll_statistics = roll_statistics
         self.cache_valid = True
         self.refresh_button.setEnabled(True)
+        self.roll_statistics_changed.emit(roll_statistics)
 
         # Update chart with filtered data
         self.update_chart()
@@ -4,6 +4,7 @@ from PySide6.QtCore import Qt
 import settings
 from utils.profile_stats import Stats
 from utils import preferences, profile_stats
+from utils.sectional_stats import calc_sectional_stats
 from utils.translation import _
 from .AlertLimitEditor import AlertLimitEditor
 
@@ -22,6 +23,7 @@ def has_stat_data(data):
 class StatsWidget(QWidget):
     def __init__(self, data):
         super().__init__()
+        self.data = data
         limit_map = self._get_limit_map()
 
         self.layout = QGridLayout()
@@ -88,6 +90,11 @@ class StatsWidget(QWidget):
         copy_action.triggered.connect(self.copy_stats_to_clipboard)
         context_menu.addAction(copy_action)
 
+        copy_sections_action = QAction(_("COPY_SECTION_STATS_TO_CLIPBOARD"), self)
+        copy_sections_action.setEnabled(isinstance(self.data, tuple) and has_stat_data(self.data))
+        copy_sections_action.triggered.connect(self.copy_section_stats_to_clipboard)
+        context_menu.addAction(copy_sections_action)
+
         context_menu.exec_(self.mapToGlobal(position))
 
     def copy_stats_to_clipboard(self):
@@ -103,10 +110,46 @@ class StatsWidget(QWidget):
         clipboard.setText("\n".join(stats_text))
         print("Statistics copied to clipboard.")
 
-    def update_data(self, data):
+    def get_section_stats_text(self):
+        """Return per-section statistics of the current data as tab separated text."""
+        if not isinstance(self.data, tuple) or not has_stat_data(self.data):
+            return ""
+
+        unit_info = preferences.get_distance_unit_info()
+        stat_names = [widget.func.name for widget in self.widgets]
+        header = [
+            f"{_('SECTION_START')} [{unit_info.unit}]",
+            f"{_('SECTION_END')} [{unit_info.unit}]",
+        ] + [
+            f"{profile_stats.stat_labels[name]} [{profile_stats.stat_units[name]}]"
+            for name in stat_names
+        ]
+
+        rows = ["\t".join(header)]
+        for section in calc_sectional_stats(self.data):
+            row = [
+                format_stat_value(section.start * unit_info.conversion_factor),
+                format_stat_value(section.end * unit_info.conversion_factor),
+            ] + [
+                format_stat_value(getattr(section, widget.func.analysis_key))
+                for widget in self.widgets
+            ]
+            rows.append("\t".join(row))
+        return "\n".join(rows)
+
+    def copy_section_stats_to_clipboard(self):
+        """Copy per-section statistics to clipboard as tab separated text."""
+        clipboard = QApplication.clipboard()
+        clipboard.setText(self.get_section_stats_text())
+        print("Section statistics copied to clipboard.")
+
+    def update_data(self, data, values=None):
+        """Show stats of data. values maps stat names to values already calculated from data."""
+        self.data = data
         self._refresh_limits()
+        values = values or {}
         for widget in self.widgets:
-            widget.update_data(data)
+            widget.update_data(data, values.get(getattr(widget.func, 'name', None)))
 
 
 class StatWidget(QWidget):
@@ -165,10 +208,10 @@ class StatWidget(QWidget):
             tooltip = _("ALERT_LIMITS_NOT_SET")
         self.setToolTip(tooltip)
 
-    def update_data(self, data):
+    def update_data(self, data, value=None):
         self.data = data
         if has_stat_data(self.data):
-            self.value = self.func(self.data)
+            self.value = value if value is not None else self.func(self.data)
             self.over_limit = False
 
             if self.limit is not None:
@@ -0,0 +1,99 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+from models.RollStatistics import RollStatistics
+from utils import profile_stats
+
+
+class AlertIndex:
+    """
+    Which rolls breach which alert limits, for all rolls with statistics.
+
+    Each limit is checked against its statistic's column in one vectorized
+    comparison. Changing limits only checks the limits that changed, and new
+    rolls after the previously indexed ones are checked on their own.
+    Statistics are in the units of the limits, see profile_stats.STAT_SPECS.
+    """
+
+    def __init__(self):
+        self.roll_statistics = RollStatistics()
+        # Alert limit name -> (min, max), limits without bounds are left out
+        self.limits: Dict[str, Tuple[float | None, float | None]] = {}
+        # Alert limit name -> whether each roll breaches it
+        self.violations: Dict[str, np.ndarray] = {}
+        self.out_of_limits = np.zeros(0, dtype=bool)
+
+    @staticmethod
+    def _check(values, bounds):
+        low, high = bounds
+        breached = np.zeros(len(values), dtype=bool)
+        # Rolls without a value, NaN, compare False and never breach a limit
+        if low is not None:
+            breached |= values < low
+        if high is not None:
+            breached |= values > high
+        return breached
+
+    def _values(self, name, roll_statistics, rows=slice(None)):
+        return roll_statistics.column(profile_stats.alert_to_analysis_name.get(name, name))[rows]
+
+    def set_limits(self, alert_limits) -> bool:
+        """Check the rolls against alert_limits, a list of preference limit dicts. Returns True if they changed."""
+        limits = {
+            limit['name']: (limit.get('min'), limit.get('max'))
+            for limit in alert_limits
+            if limit.get('min') is not None or limit.get('max') is not None
+        }
+        if limits == self.limits:
+            return False
+
+        for name in [name for name in self.violations if name not in limits]:
+            del self.violations[name]
+        for name, bounds in limits.items():
+            if self.limits.get(name) != bounds:
+                self.violations[name] = self._check(self._values(name, self.roll_statistics), bounds)
+        self.limits = limits
+        self._update_out_of_limits()
+        return True
+
+    def set_roll_statistics(self, roll_statistics: RollStatistics):
+        """Check the rolls of roll_statistics, keeping the results of rolls already checked."""
+        if roll_statistics is self.roll_statistics:
+            return
+        previous, self.roll_statistics = self.roll_statistics, roll_statistics
+
+        # The newest roll may have been receiving profiles, it is checked again
+        indexed = max(0, len(previous) - 1)
+        stat_names = [profile_stats.alert_to_analysis_name.get(name, name) for name in self.limits]
+        if not roll_statistics.has_same_rows(previous, indexed, stat_names):
+            indexed = 0
+        new_rows = slice(indexed, len(roll_statistics))
+        for name, bounds in self.limits.items():
+            self.violations[name] = np.concatenate([
+                self.violations[name][:indexed],
+                self._check(self._values(name, roll_statistics, new_rows), bounds),
+            ])
+        self._update_out_of_limits()
+
+    def _update_out_of_limits(self):
+        out_of_limits = np.zeros(len(self.roll_statistics), dtype=bool)
+        for breached in self.violations.values():
+            out_of_limits |= breached
+        self.out_of_limits = out_of_limits
+
+    def out_of_limit_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.out_of_limits)
+
+    def violations_by_path(self) -> Dict[str, List[str]]:
+        """Return the names of the limits each roll out of limits breaches, by roll path."""
+        by_path: Dict[str, List[str]] = {}
+        paths = self.roll_statistics.paths
+        for name, breached in self.violations.items():
+            for row in np.flatnonzero(breached):
+                by_path.setdefault(str(paths[row]), []).append(name)
+        return by_path
+
+    def clear(self):
+        self.roll_statistics = RollStatistics()
+        self.violations = {name: np.zeros(0, dtype=bool) for name in self.limits}
+        self.out_of_limits = np.zeros(0, dtype=bool)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import InitVar, dataclass, field, replace
 from numpy.typing import NDArray
 import numpy as np
 import struct
@@ -13,41 +13,43 @@ from typing import List
 from utils.profile_stats import calc_mean_profile
 from utils.file_utils import list_prof_files
 from utils import preferences
+from utils.numeric import nbytes, sample_dtype
+from utils.uniform_axis import UniformAxis
 
 PROF_FILE_HEADER_SIZE = 128
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProfileData:
-    distances: NDArray
+    distances: NDArray | UniformAxis
     hardnesses: NDArray
 
     @classmethod
     def frombytes(cls, data: bytes, sample_step):
-        hardnesses = []
-        offset = 0
-
-        # Read hardness values until we run out of data
-        while offset + 4 <= len(data):
-            chunk = data[offset:offset+4]
-            hardness = struct.unpack('f', chunk)[0]
-            hardnesses.append(hardness)
-            offset += 4
+        # Samples are little-endian float32, a trailing partial sample is ignored
+        hardnesses = np.frombuffer(data, dtype='<f4', count=len(data) // 4)
 
         if preferences.flip_profiles:
             hardnesses = hardnesses[::-1]
 
+        # Copy out of the file buffer in the configured sample precision
+        hardnesses = hardnesses.astype(sample_dtype())
+
         # Generate distances if we have valid sample step and hardness data
         if sample_step > 0 and len(hardnesses) > 0:
-            # Calculate the total distance traveled
-            current_distance = sample_step * len(hardnesses)
-            # Create a distance array from 0 to current_distance in steps of sample_step
-            distances = np.arange(0, current_distance, sample_step)[
-                :len(hardnesses)]
+            distances = UniformAxis.from_step(sample_step, len(hardnesses))
             return cls(distances=distances, hardnesses=hardnesses)
         else:
             return None
 
+    @property
+    def nbytes(self):
+        return nbytes(self.distances, self.hardnesses)
+
+    def reversed(self):
+        """Return the profile measured in the opposite direction."""
+        return ProfileData(distances=self.distances, hardnesses=self.hardnesses[::-1].copy())
+
     @property
     def x(self):
         return self.distances
@@ -57,7 +59,7 @@ class ProfileData:
         return self.hardnesses
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProfileHeader:
     prof_version: int   # File format version
     serial_number: str  # Measurement device serial number
@@ -97,7 +99,7 @@ class ProfileHeader:
             return profile_header
 
 
-@dataclass
+@dataclass(slots=True)
 class Profile:
     path: str
     data: ProfileData | None
@@ -144,20 +146,125 @@ class Profile:
         return self.data.distances[-1]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class RollMemoryUsage:
+    path: str
+    profile_count: int
+    profile_bytes: int       # Distances and hardnesses of all profiles
+    mean_profile_bytes: int  # Distances and values of the mean profile
+
+    @property
+    def total_bytes(self):
+        return self.profile_bytes + self.mean_profile_bytes
+
+
+def read_roll_signature(path):
+    """
+    Return a cheap fingerprint of a roll directory's profile files.
+
+    The signature changes whenever a profile file is added, removed or rewritten.
+    """
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith('.prof') or entry.name == 'mean.prof':
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    except OSError:
+        return None
+    return tuple(sorted(files))
+
+
+def _mean_profile_preferences():
+    return (preferences.continuous_mode, preferences.band_pass_low, preferences.band_pass_high)
+
+
+@dataclass(slots=True)
 class RollDirectory:
     path: str
     profiles: List['Profile'] = field(default_factory=list, init=False)
+    # Distances of the mean profile, set with it
+    distances: NDArray | UniformAxis | None = field(default=None, init=False)
     mean_profile: NDArray | None = field(default=None, init=False)
-
-    def __post_init__(self):
-        self.update()
+    signature: tuple | None = field(default=None, init=False)
+    flipped: bool = field(default=False, init=False)
+    mean_preferences: tuple | None = field(default=None, init=False)
+    # False to create an empty roll without reading the files, see copy()
+    load: InitVar[bool] = True
+
+    def __post_init__(self, load):
+        if load:
+            self.update()
+
+    def copy(self):
+        """Return a copy with Profile objects of its own, sharing the sample data."""
+        roll = RollDirectory(self.path, load=False)
+        roll.profiles = [replace(profile) for profile in self.profiles]
+        roll.distances = self.distances
+        roll.mean_profile = self.mean_profile
+        roll.signature = self.signature
+        roll.flipped = self.flipped
+        roll.mean_preferences = self.mean_preferences
+        return roll
 
     def update(self):
+        # Read the signature first so a change during parsing is seen as stale
+        self.signature = read_roll_signature(self.path)
+        self.flipped = preferences.flip_profiles
         prof_paths = list_prof_files(self.path)
-        self.profiles = [Profile.fromfile(path) for path in prof_paths]
+        profiles = [Profile.fromfile(path) for path in prof_paths]
+        self.profiles = [profile for profile in profiles if profile is not None]
+        self.update_mean_profile()
+
+    def update_mean_profile(self):
+        self.mean_preferences = _mean_profile_preferences()
         self.distances, self.mean_profile = calc_mean_profile(self.profiles)
 
+    def apply_preferences(self):
+        """
+        Bring the loaded profiles and mean profile in line with the current
+        preferences without reading the files again. Returns True if anything
+        changed.
+        """
+        flip_changed = self.flipped != preferences.flip_profiles
+        if flip_changed:
+            for profile in self.profiles:
+                if profile.data is not None:
+                    profile.data = profile.data.reversed()
+            self.flipped = preferences.flip_profiles
+
+        if flip_changed or self.mean_preferences != _mean_profile_preferences():
+            self.update_mean_profile()
+            return True
+        return False
+
+    def preferences_changed(self):
+        """Return True if apply_preferences would change the roll."""
+        return self.flipped != preferences.flip_profiles or self.mean_preferences != _mean_profile_preferences()
+
+    def is_stale(self):
+        """Return True if profile files were added, removed or rewritten since loading."""
+        return read_roll_signature(self.path) != self.signature
+
+    def memory_usage(self):
+        """Return the number of bytes of sample data held for this roll."""
+        profile_bytes = sum(
+            profile.data.nbytes
+            for profile in self.profiles
+            if profile is not None and profile.data is not None
+        )
+        return RollMemoryUsage(
+            path=self.path,
+            profile_count=len(self.profiles),
+            profile_bytes=profile_bytes,
+            mean_profile_bytes=nbytes(self.distances, self.mean_profile),
+        )
+
     @property
     def newest_timestamp(self):
         if len(self.profiles) > 0:
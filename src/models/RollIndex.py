@@ -0,0 +1,59 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+def roll_sort_key(path, name, modified):
+    """Return the key a roll is sorted by date with. Rolls without a date sort as oldest, ties are broken by name."""
+    return (modified if modified is not None else float('-inf'), name.casefold(), path)
+
+
+@dataclass(slots=True)
+class RollEntry:
+    """A roll folder in the roll list with the key it is sorted by."""
+    path: str
+    name: str
+    modified: float | None = None
+    sort_key: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.sort_key = roll_sort_key(self.path, self.name, self.modified)
+
+
+class RollIndex:
+    """
+    Roll folders of the roll list by path, with their sort keys computed once
+    when their dates are indexed. The roll list's proxy model sorts the rows
+    by these keys, the index itself keeps no order.
+    """
+
+    def __init__(self):
+        self._by_path: Dict[str, RollEntry] = {}
+
+    def __len__(self):
+        return len(self._by_path)
+
+    def __contains__(self, path):
+        return path in self._by_path
+
+    def get(self, path) -> RollEntry | None:
+        return self._by_path.get(path)
+
+    def sort_key(self, path):
+        """Return the precomputed sort key of path, or None if it is not indexed."""
+        entry = self._by_path.get(path)
+        return entry.sort_key if entry is not None else None
+
+    def update(self, path, name, modified=None):
+        """Add or replace the entry of path."""
+        entry = self._by_path[path] = RollEntry(path=path, name=name, modified=modified)
+        return entry
+
+    def remove(self, path):
+        self._by_path.pop(path, None)
+
+    def entries(self, descending=False):
+        """Return the entries oldest first, or newest first if descending."""
+        return sorted(self._by_path.values(), key=lambda entry: entry.sort_key, reverse=descending)
+
+    def clear(self):
+        self._by_path = {}
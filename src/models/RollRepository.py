@@ -0,0 +1,270 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+import os
+import threading
+from typing import Callable, Dict, List
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from models.Profile import RollDirectory
+from utils.cache_budget import CacheBudget
+
+CACHE_NAME = "Rolls"
+
+
+@dataclass
+class _RollEntry:
+    roll: RollDirectory
+    ref_count: int = 0
+    stale: bool = False
+    # Newer version built on a worker thread, swapped in on the repository's thread
+    pending: RollDirectory | None = None
+
+    @property
+    def latest(self):
+        return self.pending if self.pending is not None else self.roll
+
+
+class RollRepository(QObject):
+    """
+    Shared, reference-counted RollDirectory instances, one per roll path.
+
+    Views acquire a roll while they use it and release it afterwards. A roll
+    is parsed when first acquired and parsed again only after it has been
+    invalidated or its profile files changed on disk. Preference changes
+    (flip, mean profile filtering) are applied to the loaded profiles in
+    memory. The profile view, file list, statistics worker and
+    postprocessors all share one copy. Rolls nobody holds any more are kept
+    while they fit in the cache budget, so going back to a roll doesn't
+    parse it again. Without a budget they are dropped at once.
+
+    The repository is used from the GUI thread and from worker threads. A
+    roll is only changed on the thread the repository lives in, the GUI
+    thread. A worker that finds a roll out of date gets a new RollDirectory
+    built on its own thread, which replaces the shared one once the GUI
+    thread gets to it. Invalidation listeners are called on the GUI thread.
+    Files are read and preferences applied without holding the repository
+    lock, only callers for the same roll wait for each other.
+    """
+
+    _roll_changed = Signal(object, object, bool)
+
+    def __init__(self, budget: CacheBudget | None = None):
+        super().__init__()
+        self.budget = budget
+        self._entries: Dict[str, _RollEntry] = {}
+        # Keys being loaded or updated, set when done
+        self._loading: Dict[str, threading.Event] = {}
+        self._lock = threading.RLock()
+        self._invalidation_listeners: List[Callable[[str | None], None]] = []
+        # Queued when emitted from a worker thread, called at once on the GUI thread
+        self._roll_changed.connect(self._on_roll_changed)
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def _on_own_thread(self):
+        return QThread.currentThread() == self.thread()
+
+    def add_invalidation_listener(self, listener: Callable[[str | None], None]):
+        """Call listener(path) on the GUI thread when a roll changes; path is None when all rolls changed."""
+        with self._lock:
+            if listener not in self._invalidation_listeners:
+                self._invalidation_listeners.append(listener)
+
+    def remove_invalidation_listener(self, listener: Callable[[str | None], None]):
+        with self._lock:
+            if listener in self._invalidation_listeners:
+                self._invalidation_listeners.remove(listener)
+
+    def _notify_invalidated(self, path):
+        for listener in list(self._invalidation_listeners):
+            try:
+                listener(path)
+            except Exception as e:
+                print(f"Roll invalidation listener failed: {e}")
+
+    def _reserve(self, key):
+        """Wait until no other caller loads or updates key, then reserve it and return its entry."""
+        while True:
+            with self._lock:
+                loading = self._loading.get(key)
+                if loading is None:
+                    self._loading[key] = threading.Event()
+                    return self._entries.get(key)
+            loading.wait()
+
+    def _unreserve(self, key):
+        with self._lock:
+            self._loading.pop(key).set()
+
+    def _on_roll_changed(self, key, path, notify):
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            pending = entry.pending if entry is not None else None
+        if pending is not None:
+            roll = pending
+            if roll.preferences_changed():
+                # Preferences changed after the worker built it, the worker may still be reading it
+                roll = roll.copy()
+                roll.apply_preferences()
+            with self._lock:
+                # A newer version is swapped in by its own signal
+                if entry.pending is pending:
+                    entry.roll = roll
+                    entry.pending = None
+        if notify:
+            self._notify_invalidated(path)
+
+    @staticmethod
+    def _reloaded(roll: RollDirectory):
+        """Return roll read again from its files, keeping the hidden state of profiles that are still present."""
+        hidden_names = {profile.name for profile in roll.profiles if profile.hidden}
+        reloaded = RollDirectory(roll.path)
+        for profile in reloaded.profiles:
+            if profile.name in hidden_names:
+                profile.hidden = True
+        return reloaded
+
+    def acquire(self, path) -> RollDirectory:
+        """
+        Return the shared roll for path, loading it if needed, and hold a reference to it.
+
+        Off the GUI thread, a roll that is out of date is returned as a new
+        object, which replaces the shared one later on the GUI thread.
+        """
+        key = self._key(path)
+        on_own_thread = self._on_own_thread()
+        changed = False
+        replaced = False
+        hit = False
+        stale = False
+        entry = self._reserve(key)
+        try:
+            if entry is None:
+                roll = RollDirectory(path)
+            else:
+                with self._lock:
+                    stale, entry.stale = entry.stale, False
+                    roll = entry.latest
+                if stale or roll.is_stale():
+                    # Listeners were told when the roll was invalidated
+                    changed = not stale
+                    roll = self._reloaded(roll)
+                elif roll.preferences_changed():
+                    # Only the shared roll is updated in place, and only on the GUI thread
+                    if roll is not entry.roll or not on_own_thread:
+                        roll = roll.copy()
+                    changed = roll.apply_preferences()
+                    hit = True
+                else:
+                    hit = True
+
+            with self._lock:
+                published = self._entries.get(key)
+                if published is None:
+                    # Not loaded before, or evicted while it was read
+                    published = self._entries[key] = _RollEntry(roll)
+                elif roll is not published.latest:
+                    replaced = True
+                    if on_own_thread:
+                        published.roll = roll
+                        published.pending = None
+                    else:
+                        published.pending = roll
+                if published.ref_count <= 0 and self.budget is not None:
+                    # Rolls in use are not evicted
+                    self.budget.discard(CACHE_NAME, key)
+                published.ref_count += 1
+        except BaseException:
+            if stale:
+                with self._lock:
+                    entry.stale = True
+            raise
+        finally:
+            self._unreserve(key)
+
+        if self.budget is not None:
+            if hit:
+                self.budget.record_hit(CACHE_NAME)
+            else:
+                self.budget.record_miss(CACHE_NAME)
+
+        if changed or (replaced and not on_own_thread):
+            self._roll_changed.emit(key, roll.path, changed)
+        return roll
+
+    def release(self, path):
+        """Drop a reference taken with acquire; an unreferenced roll is left to the cache budget."""
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.ref_count <= 0:
+                return
+            entry.ref_count -= 1
+            if entry.ref_count > 0:
+                return
+            if self.budget is None:
+                del self._entries[key]
+            else:
+                # Added under the lock so a roll acquired again meanwhile is never accounted
+                self.budget.add(CACHE_NAME, key, entry.latest.memory_usage().total_bytes, self._evict)
+
+    def _evict(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.ref_count <= 0:
+                del self._entries[key]
+
+    @contextmanager
+    def borrow(self, path):
+        """Hold a roll for the duration of a with block."""
+        roll = self.acquire(path)
+        try:
+            yield roll
+        finally:
+            self.release(path)
+
+    def get(self, path) -> RollDirectory | None:
+        """Return the roll for path if it is held, without loading or referencing it."""
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+            return entry.roll if entry is not None and entry.ref_count > 0 else None
+
+    def apply_preferences(self):
+        """Apply changed preferences to all loaded rolls without reading their files. Called on the GUI thread."""
+        with self._lock:
+            # Released rolls catch up when acquired again, rolls built by workers when swapped in
+            keys = [key for key, entry in self._entries.items() if entry.ref_count > 0]
+
+        changed = []
+        for key in keys:
+            # Waits only for a worker reading this roll
+            entry = self._reserve(key)
+            try:
+                if entry is not None and entry.roll.apply_preferences():
+                    changed.append(entry.roll.path)
+            finally:
+                self._unreserve(key)
+
+        for path in changed:
+            self._notify_invalidated(path)
+
+    def invalidate(self, path=None):
+        """Mark one roll, or all rolls when path is None, to be reloaded on next acquire."""
+        with self._lock:
+            if path is None:
+                entries = list(self._entries.values())
+            else:
+                entry = self._entries.get(self._key(path))
+                entries = [entry] if entry is not None else []
+            for entry in entries:
+                entry.stale = True
+
+        self._roll_changed.emit(None, path, True)
+
+    def loaded_paths(self) -> List[str]:
+        """Return the paths of the rolls that are held, leaving out released rolls kept in the cache."""
+        with self._lock:
+            return [entry.roll.path for entry in self._entries.values() if entry.ref_count > 0]
@@ -0,0 +1,249 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+import numpy as np
+
+GRANULARITY_DAY = 'day'
+GRANULARITY_WEEK = 'week'
+GRANULARITY_MONTH = 'month'
+GRANULARITIES = (GRANULARITY_DAY, GRANULARITY_WEEK, GRANULARITY_MONTH)
+
+SECONDS_PER_DAY = 86400
+# 1970-01-01 was a Thursday, weeks start on Monday
+_EPOCH_WEEKDAY = 3
+
+
+class StatSeries(NamedTuple):
+    """Values of one statistic for a selection of rolls, as drawn by the statistics chart."""
+    x: np.ndarray
+    y: np.ndarray
+    labels: np.ndarray
+    paths: np.ndarray
+    # Row of each roll in RollStatistics
+    rows: np.ndarray
+
+    def __len__(self):
+        return len(self.y)
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            np.empty(0), np.empty(0), np.empty(0, dtype=str), np.empty(0, dtype=str), np.empty(0, dtype=np.int64))
+
+
+class AggregatedStatSeries(NamedTuple):
+    """
+    Values of one statistic summarized over days, weeks or months.
+
+    Bins are sorted by time and only bins with rolls are included. y is the
+    mean of each bin, x and paths are the timestamp and path of its newest
+    roll, and percentiles maps each percentile to its values.
+    """
+    granularity: str
+    x: np.ndarray
+    y: np.ndarray
+    low: np.ndarray
+    high: np.ndarray
+    percentiles: Dict[float, np.ndarray]
+    counts: np.ndarray
+    labels: np.ndarray
+    paths: np.ndarray
+
+    def __len__(self):
+        return len(self.y)
+
+    @classmethod
+    def empty(cls, granularity, percentiles=()):
+        return cls(
+            granularity, np.empty(0), np.empty(0), np.empty(0), np.empty(0),
+            {q: np.empty(0) for q in percentiles}, np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=str), np.empty(0, dtype=str),
+        )
+
+
+def _local_days(timestamps):
+    """Return the local calendar day of each timestamp as days since 1970-01-01."""
+    utc_days = np.floor(timestamps / SECONDS_PER_DAY).astype(np.int64)
+    unique_days, inverse = np.unique(utc_days, return_inverse=True)
+    # The UTC offset at noon of each day, so a daylight saving change costs one call per day, not per roll
+    offsets = np.array([
+        datetime.fromtimestamp(day * SECONDS_PER_DAY + SECONDS_PER_DAY / 2).astimezone().utcoffset().total_seconds()
+        for day in unique_days
+    ])
+    return np.floor((timestamps + offsets[inverse]) / SECONDS_PER_DAY).astype(np.int64)
+
+
+def bin_keys(timestamps, granularity):
+    """Return the day, week or month of each timestamp in local time as an increasing integer."""
+    days = _local_days(np.asarray(timestamps, dtype=float))
+    if granularity == GRANULARITY_DAY:
+        return days
+    if granularity == GRANULARITY_WEEK:
+        return (days + _EPOCH_WEEKDAY) // 7
+    if granularity == GRANULARITY_MONTH:
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def bin_labels(keys, granularity):
+    """Return the first day, or month, of each bin key as text."""
+    if granularity == GRANULARITY_DAY:
+        return np.datetime_as_string(np.asarray(keys).astype('datetime64[D]'), unit='D')
+    if granularity == GRANULARITY_WEEK:
+        return np.datetime_as_string((np.asarray(keys) * 7 - _EPOCH_WEEKDAY).astype('datetime64[D]'), unit='D')
+    if granularity == GRANULARITY_MONTH:
+        return np.datetime_as_string(np.asarray(keys).astype('datetime64[M]'), unit='M')
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class RollStatistics:
+    """
+    Statistics of all rolls as columns, one array per statistic, sorted by time.
+
+    Rows are rolls, oldest first. A statistic that could not be calculated for
+    a roll is NaN. Time windows are found with a binary search on the sorted
+    timestamps and a statistic is selected by taking its column, so changing
+    the chart's statistic or time range doesn't go through every roll.
+    """
+
+    def __init__(self, timestamps=None, labels=None, paths=None, columns=None, memory_bytes=None):
+        self.timestamps = np.asarray(timestamps if timestamps is not None else [], dtype=float)
+        count = len(self.timestamps)
+        self.labels = np.asarray(labels if labels is not None else [], dtype=str)
+        self.paths = np.asarray(paths if paths is not None else [], dtype=str)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.asarray(values, dtype=float) for name, values in (columns or {}).items()
+        }
+        self.memory_bytes = np.asarray(memory_bytes if memory_bytes is not None else np.zeros(count), dtype=np.int64)
+        if len(self.labels) != count or len(self.paths) != count or len(self.memory_bytes) != count \
+                or any(len(values) != count for values in self.columns.values()):
+            raise ValueError("All roll statistics columns must have one value per roll")
+        if count > 1 and np.any(np.diff(self.timestamps) < 0):
+            raise ValueError("Roll statistics must be sorted by timestamp")
+        # Granularity -> bin key of each roll
+        self._bin_keys: Dict[str, np.ndarray] = {}
+        # (stat name, granularity, percentiles) -> aggregate over all rolls
+        self._aggregates: Dict[Tuple[str, str, tuple], AggregatedStatSeries] = {}
+
+    @classmethod
+    def from_rolls(cls, roll_data: Iterable[Dict[str, Any]]):
+        """Build the columns from roll dicts with label, path, timestamp and stats, in any order."""
+        rolls: List[Dict[str, Any]] = sorted(roll_data, key=lambda roll: roll['timestamp'])
+        stat_names = list(dict.fromkeys(name for roll in rolls for name in roll.get('stats', {})))
+        columns = {
+            name: np.fromiter(
+                (np.nan if (value := roll['stats'].get(name)) is None else value for roll in rolls),
+                dtype=float,
+                count=len(rolls),
+            )
+            for name in stat_names
+        }
+        return cls(
+            timestamps=[roll['timestamp'] for roll in rolls],
+            labels=[str(roll.get('label', '')) for roll in rolls],
+            paths=[str(roll.get('path', '')) for roll in rolls],
+            columns=columns,
+            memory_bytes=[roll.get('memory_bytes', 0) for roll in rolls],
+        )
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def stat_names(self):
+        return list(self.columns)
+
+    def column(self, stat_name) -> np.ndarray:
+        """Return the values of stat_name for all rolls, NaN for all if it is unknown."""
+        values = self.columns.get(stat_name)
+        return values if values is not None else np.full(len(self), np.nan)
+
+    def since(self, timestamp=None) -> slice:
+        """Return the rows of rolls at or after timestamp, all rows if it is None."""
+        if timestamp is None:
+            return slice(0, len(self))
+        return slice(int(np.searchsorted(self.timestamps, timestamp, side='left')), len(self))
+
+    def has_same_rows(self, other, count, stat_names=()):
+        """Return True if the first count rolls, with their values of stat_names, are the same in other."""
+        if other is None or len(self) < count or len(other) < count:
+            return False
+        return np.array_equal(self.timestamps[:count], other.timestamps[:count]) \
+            and np.array_equal(self.paths[:count], other.paths[:count]) \
+            and all(np.array_equal(self.column(name)[:count], other.column(name)[:count], equal_nan=True)
+                    for name in stat_names)
+
+    def series(self, stat_name, rows=None) -> StatSeries:
+        """Return stat_name of the rolls in rows, a slice or index array, leaving out rolls without a value."""
+        rows = np.arange(len(self))[rows if rows is not None else slice(None)]
+        values = self.column(stat_name)[rows]
+        valid = ~np.isnan(values)
+        if not valid.all():
+            rows = rows[valid]
+            values = values[valid]
+        return StatSeries(self.timestamps[rows], values, self.labels[rows], self.paths[rows], rows)
+
+    def bin_keys(self, granularity) -> np.ndarray:
+        """Return the bin key of each roll for granularity, computed once per granularity."""
+        keys = self._bin_keys.get(granularity)
+        if keys is None:
+            keys = bin_keys(self.timestamps, granularity)
+            self._bin_keys[granularity] = keys
+        return keys
+
+    def aggregate(self, stat_name, granularity, rows=None, percentiles=()) -> AggregatedStatSeries:
+        """
+        Return the mean, min, max and percentiles of stat_name in each bin of
+        granularity over the rolls in rows, leaving out rolls without a value.
+        """
+        percentiles = tuple(percentiles)
+        whole = rows is None or (isinstance(rows, slice) and rows.indices(len(self)) == (0, len(self), 1))
+        cache_key = (stat_name, granularity, percentiles)
+        if whole and cache_key in self._aggregates:
+            return self._aggregates[cache_key]
+
+        if rows is None:
+            rows = slice(0, len(self))
+        values = self.column(stat_name)[rows]
+        keys = self.bin_keys(granularity)[rows]
+        timestamps = self.timestamps[rows]
+        paths = self.paths[rows]
+        valid = ~np.isnan(values)
+        if not valid.all():
+            values, keys, timestamps, paths = values[valid], keys[valid], timestamps[valid], paths[valid]
+
+        if len(values) == 0:
+            result = AggregatedStatSeries.empty(granularity, percentiles)
+        else:
+            # Rows are sorted by time, so the rolls of each bin are next to each other
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            ends = np.r_[starts[1:], len(values)]
+            counts = ends - starts
+
+            sorted_values = values
+            if percentiles:
+                groups = np.repeat(np.arange(len(starts)), counts)
+                sorted_values = values[np.lexsort((values, groups))]
+            result = AggregatedStatSeries(
+                granularity=granularity,
+                x=timestamps[ends - 1],
+                y=np.add.reduceat(values, starts) / counts,
+                low=np.minimum.reduceat(values, starts),
+                high=np.maximum.reduceat(values, starts),
+                percentiles={q: _group_percentile(sorted_values, starts, counts, q) for q in percentiles},
+                counts=counts,
+                labels=bin_labels(keys[starts], granularity),
+                paths=paths[ends - 1],
+            )
+
+        if whole:
+            self._aggregates[cache_key] = result
+        return result
+
+
+def _group_percentile(sorted_values, starts, counts, percentile):
+    """Return percentile of each group of sorted_values, interpolated linearly like np.percentile."""
+    position = starts + (counts - 1) * (percentile / 100)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts + counts - 1)
+    fraction = position - lower
+    return sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Tuple
+
+from numpy.typing import NDArray
+
+import settings
+from models.Profile import ProfileData, RollDirectory
+from utils import preferences
+from utils.decimation import DecimatedSeries
+from utils.numeric import nbytes
+from utils.profile_stats import Stats, calc_mean_profile, has_profile_samples
+from utils.spectrum import amplitude_spectrum, calc_spectrum
+
+stats = Stats()
+STAT_FUNCTIONS = [stats.mean, stats.std, stats.cv, stats.min, stats.max, stats.pp, stats.slope]
+
+
+def visible_profiles(profiles):
+    """Return the profiles the mean profile is calculated from."""
+    profiles = [profile for profile in profiles if has_profile_samples(profile)]
+    if preferences.recalculate_mean:
+        profiles = [profile for profile in profiles if not profile.hidden]
+    return profiles
+
+
+def spectrum_plot_data(mean_profile_values):
+    """Return the frequencies and amplitudes of the mean profile spectrum within the plotted range."""
+    f, amplitudes = amplitude_spectrum(calc_spectrum(mean_profile_values))
+    mask = (
+        (f >= settings.SPECTRUM_LOWER_LIMIT_1M) &
+        (f <= settings.SPECTRUM_UPPER_LIMIT_1M)
+    )
+    return f[mask], amplitudes[mask]
+
+
+@dataclass
+class RollView:
+    """
+    Everything the profile view draws for a roll, calculated off the GUI thread.
+
+    The roll is held in store.roll_repository on behalf of the owner of the
+    view, see RollViewCache. The mean profile, spectrum and statistics are only valid for the
+    profiles they were calculated from, see matches().
+    """
+    path: str
+    roll: RollDirectory
+    mean_profile_inputs: Tuple[ProfileData, ...] = ()
+    mean_profile_distances: NDArray | list = field(default_factory=list)
+    mean_profile: NDArray | list = field(default_factory=list)
+    mean_series: DecimatedSeries | None = None
+    spectrum: Tuple[NDArray, NDArray] | None = None
+    stat_values: Dict[str, float] = field(default_factory=dict)
+    # Profile path -> (data the series was built from, DecimatedSeries of it)
+    series: Dict[str, Tuple[ProfileData, DecimatedSeries]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, path, roll, profiles, is_cancelled: Callable[[], bool] = lambda: False):
+        """
+        Calculate the view of roll with profiles in display order. Returns None
+        as soon as is_cancelled() returns True.
+        """
+        view = cls(path=path, roll=roll)
+
+        mean_profiles = visible_profiles(profiles)
+        view.mean_profile_inputs = tuple(profile.data for profile in mean_profiles)
+        view.mean_profile_distances, view.mean_profile = calc_mean_profile(mean_profiles)
+        if is_cancelled():
+            return None
+
+        if len(view.mean_profile) > 0:
+            if preferences.show_spectrum:
+                view.spectrum = spectrum_plot_data(view.mean_profile)
+            data = (view.mean_profile_distances, view.mean_profile)
+            view.stat_values = {func.name: func(data) for func in STAT_FUNCTIONS}
+
+        if settings.PLOT_DECIMATION:
+            if len(view.mean_profile) > 0:
+                view.mean_series = DecimatedSeries(view.mean_profile_distances, view.mean_profile)
+            for profile in profiles:
+                if is_cancelled():
+                    return None
+                if has_profile_samples(profile):
+                    view.series[profile.path] = (
+                        profile.data,
+                        DecimatedSeries(profile.data.distances, profile.data.hardnesses),
+                    )
+
+        return None if is_cancelled() else view
+
+    @property
+    def nbytes(self):
+        """Bytes of sample data held by the view and its roll."""
+        series = [series for _, series in self.series.values()]
+        if self.mean_series is not None:
+            series.append(self.mean_series)
+        return (
+            self.roll.memory_usage().total_bytes
+            + nbytes(self.mean_profile_distances, self.mean_profile)
+            + sum(item.nbytes for item in series)
+        )
+
+    def matches(self, mean_profiles):
+        """Return True if the mean profile was calculated from exactly these profiles."""
+        return (
+            len(mean_profiles) == len(self.mean_profile_inputs)
+            and all(profile.data is data for profile, data in zip(mean_profiles, self.mean_profile_inputs))
+        )
+
+    def series_for(self, profile):
+        """Return the precomputed DecimatedSeries of profile, or None if its data changed."""
+        data, series = self.series.get(profile.path, (None, None))
+        return series if data is profile.data else None
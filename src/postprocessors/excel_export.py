@@ -1,6 +1,7 @@
 from utils.profile_stats import calc_mean_profile
+from utils.sectional_stats import calc_sectional_stats
 from utils.translation import _
-from models.Profile import Profile
+import store
 import pandas as pd
 import numpy as np
 import os
@@ -26,7 +27,7 @@ def run(folder_path) -> bool:
     The function performs the following steps:
     1. Extracts the folder name from the provided folder path to use as the Excel file name.
     2. Loops through all files in the specified folder and processes those with a '.prof' extension (excluding 'mean.prof').
-    3. Loads each '.prof' file using Profile.fromfile() to access header and measurement data.
+    3. Takes each profile's header and measurement data from the shared roll in store.roll_repository.
     4. Creates a pandas DataFrame for each file's data, including metadata such as sample step, serial number, and file version.
     5. Collects all DataFrames and writes them into separate sheets in an Excel file using `xlsxwriter`.
     6. Returns True if the Excel file is successfully created and contains at least one sheet; otherwise, returns False.
@@ -49,44 +50,51 @@ def run(folder_path) -> bool:
     profiles = []
     sheets = []
 
-    # Loop through all files in the specified folder
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith('.prof') and file_name != 'mean.prof':
-            # Create the full file path
-            file_path = os.path.join(folder_path, file_name)
-
-            try:
-                profile = Profile.fromfile(file_path)
-                header = profile.header
-                data = profile.data
-                if data is not None:
-                    profiles.append(profile)
-                columns = {
-                    'Distance': np.round(data.distances, EXPORT_FLOAT_NUM_DECIMAL_PLACES),
-                    'Hardness': np.round(data.hardnesses, EXPORT_FLOAT_NUM_DECIMAL_PLACES)
-                }
-                df = pd.DataFrame(columns)
-                df.loc[0, 'Roll ID']            = folder_name
-                df.loc[0, 'Sample step']        = header.sample_step
-                df.loc[0, 'Serial number']      = header.serial_number
-                df.loc[0, '.prof file version'] = header.prof_version
-
-                sheets.append((df, file_name))
-            except Exception as e:
-                print(f"Error reading {file_path}: {e}")
-                continue
+    with store.roll_repository.borrow(folder_path) as roll:
+        roll_profiles = list(roll.profiles)
+
+    # Loop through all profiles of the roll
+    for profile in roll_profiles:
+        file_name = profile.name
+        file_path = profile.path
+
+        try:
+            header = profile.header
+            data = profile.data
+            if data is not None:
+                profiles.append(profile)
+            columns = {
+                'Distance': np.round(data.distances, EXPORT_FLOAT_NUM_DECIMAL_PLACES),
+                'Hardness': np.round(np.asarray(data.hardnesses, dtype=float), EXPORT_FLOAT_NUM_DECIMAL_PLACES)
+            }
+            df = pd.DataFrame(columns)
+            df.loc[0, 'Roll ID']            = folder_name
+            df.loc[0, 'Sample step']        = header.sample_step
+            df.loc[0, 'Serial number']      = header.serial_number
+            df.loc[0, '.prof file version'] = header.prof_version
+
+            sheets.append((df, file_name))
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            continue
 
     # Create and add mean profile
     if profiles:
         mean_profile = calc_mean_profile(profiles)
         columns = {
             'Distance':      np.round(mean_profile[0], EXPORT_FLOAT_NUM_DECIMAL_PLACES),
-            'Mean hardness': np.round(mean_profile[1], EXPORT_FLOAT_NUM_DECIMAL_PLACES)
+            'Mean hardness': np.round(np.asarray(mean_profile[1], dtype=float), EXPORT_FLOAT_NUM_DECIMAL_PLACES)
         }
         df = pd.DataFrame(columns)
         df.loc[0, 'Roll ID'] = folder_name
         sheets.insert(0, (df, "Mean profile"))
 
+        sections = calc_sectional_stats(mean_profile)
+        if sections:
+            df = pd.DataFrame([section.to_dict() for section in sections])
+            df = df.round(EXPORT_FLOAT_NUM_DECIMAL_PLACES)
+            sheets.insert(1, (df, "Section statistics"))
+
     # Only create the Excel file if there are sheets to add
     if sheets:
         # Create an Excel writer object
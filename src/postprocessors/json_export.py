@@ -1,7 +1,8 @@
 from utils.profile_stats import calc_mean_profile
 from utils.translation import _
 from utils.profile_stats import Stats
-from models.Profile import Profile
+from utils.sectional_stats import calc_sectional_stats
+import store
 import numpy as np
 import os
 import json
@@ -26,38 +27,39 @@ def run(folder_path) -> bool:
     folder_name = os.path.basename(folder_path.rstrip('/\\'))
     profiles = []
 
-    # Loop through all files in the specified folder
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith('.prof') and file_name != 'mean.prof':
-            # Create the full file path
-            file_path = os.path.join(folder_path, file_name)
-
-            try:
-                profile = Profile.fromfile(file_path)
-                header = profile.header
-                data = profile.data
-                if data is not None:
-                    profiles.append(profile)
-
-                json_data = {
-                    'roll_id':            folder_name,
-                    'type':               'measurement',
-                    'device_sn':          header.serial_number,
-                    'prof_file_version':  header.prof_version,
-                    'sample_step':        header.sample_step,
-                    'distances':          np.round(data.distances, EXPORT_FLOAT_NUM_DECIMAL_PLACES).tolist(),
-                    'values':             np.round(data.hardnesses, EXPORT_FLOAT_NUM_DECIMAL_PLACES).tolist()
-                }
-
-                json_filename = f"{os.path.splitext(file_path)[0]}.json"
-                with open(json_filename, 'w') as fp:
-                    json.dump(json_data, fp)
-                    print(f"Exported profile '{file_name}' of roll '{
-                          folder_name}' to {json_filename}.")
-
-            except Exception as e:
-                print(f"Error processing {file_path}: {e}")
-                continue
+    with store.roll_repository.borrow(folder_path) as roll:
+        roll_profiles = list(roll.profiles)
+
+    # Loop through all profiles of the roll
+    for profile in roll_profiles:
+        file_name = profile.name
+        file_path = profile.path
+
+        try:
+            header = profile.header
+            data = profile.data
+            if data is not None:
+                profiles.append(profile)
+
+            json_data = {
+                'roll_id':            folder_name,
+                'type':               'measurement',
+                'device_sn':          header.serial_number,
+                'prof_file_version':  header.prof_version,
+                'sample_step':        header.sample_step,
+                'distances':          np.round(data.distances, EXPORT_FLOAT_NUM_DECIMAL_PLACES).tolist(),
+                'values':             np.round(np.asarray(data.hardnesses, dtype=float), EXPORT_FLOAT_NUM_DECIMAL_PLACES).tolist()
+            }
+
+            json_filename = f"{os.path.splitext(file_path)[0]}.json"
+            with open(json_filename, 'w') as fp:
+                json.dump(json_data, fp)
+                print(f"Exported profile '{file_name}' of roll '{
+                      folder_name}' to {json_filename}.")
+
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            continue
 
     # Create and add mean profile
     if profiles:
@@ -76,7 +78,7 @@ def run(folder_path) -> bool:
             'roll_id':    folder_name,
             'type':       'mean_profile',
             'distances':  np.round(mean_distances, EXPORT_FLOAT_NUM_DECIMAL_PLACES).tolist(),
-            'values':     np.round(mean_values, EXPORT_FLOAT_NUM_DECIMAL_PLACES).tolist(),
+            'values':     np.round(np.asarray(mean_values, dtype=float), EXPORT_FLOAT_NUM_DECIMAL_PLACES).tolist(),
             'stats': {
                 'mean_g':   round(stats.mean(mean_profile_data), EXPORT_FLOAT_NUM_DECIMAL_PLACES),
                 'min_g':    round(stats.min(mean_profile_data), EXPORT_FLOAT_NUM_DECIMAL_PLACES),
@@ -85,7 +87,11 @@ def run(folder_path) -> bool:
                 'cv_pct':   round(stats.cv(mean_profile_data), EXPORT_FLOAT_NUM_DECIMAL_PLACES),
                 'pp_g':     round(stats.pp(mean_profile_data), EXPORT_FLOAT_NUM_DECIMAL_PLACES),
                 'slope_deg': round(stats.slope(mean_profile_data), EXPORT_FLOAT_NUM_DECIMAL_PLACES),
-            }
+            },
+            'sections': [
+                {key: round(value, EXPORT_FLOAT_NUM_DECIMAL_PLACES) for key, value in section.to_dict().items()}
+                for section in calc_sectional_stats(mean_profile_data)
+            ]
         }
 
         json_filename = os.path.join(folder_path, 'mean_profile.json')
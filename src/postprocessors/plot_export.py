@@ -1,7 +1,8 @@
 from gui.widgets.ProfileWidget import ProfileWidget
 from utils.translation import _
 from utils.figure_export import export_figure_with_annotations
-from models.Profile import Profile
+import store
+import dataclasses
 import os
 
 description = _("POSTPROCESSOR_NAME_PLOT_EXPORT")
@@ -24,31 +25,21 @@ def run(folder_path) -> bool:
 
     Dependencies:
         - ProfileWidget: A widget class for creating and managing charts.
-        - read_prof_file: A utility function for reading `.prof` files.
+        - store.roll_repository: Shares the parsed profiles of the roll.
         - os: Standard library module used for path manipulations and file operations.
 
     Behavior:
         - Only `.prof` files are considered, excluding `mean.prof`.
-        - If an error occurs while reading a `.prof` file, it skips that file and continues processing.
+        - Profiles hidden in the profile view are still plotted.
         - If no valid `.prof` files are found, the function will return `False` and no image will be saved.
     """
     profile_widget = ProfileWidget()
-    profiles = []
     folder_name = os.path.basename(folder_path.rstrip('/\\'))
     save_path = os.path.join(folder_path, f"{folder_name}.png")
 
-    # Loop through all files in the specified folder
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith('.prof') and file_name != 'mean.prof':
-            # Create the full file path
-            file_path = os.path.join(folder_path, file_name)
-
-            try:
-                profile = Profile.fromfile(file_path)
-                profiles.append(profile)
-            except Exception as e:
-                print(f"Error reading {file_path}: {e}")
-                continue
+    # Copy the shared profiles so the hidden state of the profile view does not apply
+    with store.roll_repository.borrow(folder_path) as roll:
+        profiles = [dataclasses.replace(profile, hidden=False) for profile in roll.profiles]
 
     if profiles:
         profile_widget.figure.set_size_inches(*FIGURE_SIZE_INCHES)
@@ -41,6 +41,8 @@ GRID = True
 MEAN_PROFILE_LINE_WIDTH = 2.8
 MEAN_PROFILE_LINE_COLOR = "tab:purple"
 SELECTED_PROFILE_LINE_WIDTH = 2
+# Draw long profiles decimated to the plot width in pixels, keeping each pixel column's min and max
+PLOT_DECIMATION = True
 STAT_DECIMAL_PLACES = 1
 
 # See python strftime
@@ -51,6 +53,12 @@ SAMPLE_INTERVAL = 1000  # Samples per meter in raw data
 
 SAMPLE_INTERVAL_M = 0.001 # 1 mm sample interval
 
+# Precision of hardness samples held in memory. .prof files store float32
+# samples; NUMERIC_PRECISION_FLOAT64 doubles the memory held per roll.
+NUMERIC_PRECISION_FLOAT32 = "float32"
+NUMERIC_PRECISION_FLOAT64 = "float64"
+NUMERIC_PRECISION = NUMERIC_PRECISION_FLOAT32
+
 
 # Default filter length = 1 meter, but shorter filter is used for shorter data automatically
 FILTER_NUMTAPS = 1000
@@ -86,6 +94,9 @@ Y_AXIS_SCALING_START_AT_ZERO = "start_at_zero"
 Y_AXIS_SCALING_FIT_TO_DATA = "fit_to_data"
 Y_AXIS_SCALING_DEFAULT = Y_AXIS_SCALING_START_AT_ZERO
 
+# Wavelength bands for spectral RMS statistics as (shortest, longest) in meters
+SPECTRAL_BANDS_M = [(0.02, 0.1), (0.1, 1.0)]
+
 ALERT_LIMITS_DEFAULT = [
     {
         "name": "mean_g",
@@ -128,6 +139,22 @@ ALERT_LIMITS_DEFAULT = [
         "units": "g",
         "min": None,
         "max": None
+    },
+    # Band RMS statistics, named as in utils.spectral_stats.SPECTRAL_STAT_SPECS
+    *[
+        {
+            "name": f"rms_{shortest:g}_{longest:g}m_g",
+            "units": "g",
+            "min": None,
+            "max": None
+        }
+        for shortest, longest in SPECTRAL_BANDS_M
+    ],
+    {
+        "name": "dominant_wavelength_m",
+        "units": "m",
+        "min": None,
+        "max": None
     }
 ]
 
@@ -136,6 +163,35 @@ NOVERLAP = 0.75
 SPECTRUM_LOWER_LIMIT_1M = 0
 SPECTRUM_UPPER_LIMIT_1M = 60
 SPECTRUM_WAVELENGTH_TICKS = False
+# Number of mean profile spectra kept in memory
+SPECTRUM_CACHE_SIZE = 32
+# Rolls this many rows below and above the selected roll are loaded in the background
+ROLL_PREFETCH_NEIGHBOURS = 2
+# Time the roll selection has to stay put before neighbouring rolls are loaded
+ROLL_PREFETCH_DELAY_MS = 300
+# Loaded rolls kept ready for drawing, at most this many and this many bytes of sample data
+ROLL_VIEW_CACHE_SIZE = 8
+ROLL_VIEW_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Bytes of sample data all roll caches together keep, released rolls included, see utils.cache_budget
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# Cache memory use, hit rate and evictions are written to the log this often
+CACHE_TELEMETRY_INTERVAL_MS = 10 * 60 * 1000
+# Latest profile dates of roll folders, kept between sessions for sorting the roll list right away
+ROLL_DATE_INDEX_FILE_PATH = os.path.join(ROOT_DIRECTORY, 'roll_dates.json')
+ROLL_DATE_INDEX_MAX_ENTRIES = 20000
+# Roll dates indexed in the background are shown this many at a time
+ROLL_DATE_INDEX_BATCH_SIZE = 32
+ROLL_DATE_INDEX_SAVE_DELAY_MS = 2000
+# File system changes are handled once no more have come in for this long, at the latest after the max delay
+FILE_CHANGE_COALESCE_DELAY_MS = 300
+FILE_CHANGE_COALESCE_MAX_DELAY_MS = 2000
+# Folders the OS can't watch, e.g. over the inotify watch limit, are checked for changes this often
+DIRECTORY_POLL_INTERVAL_MS = 2000
+# Roll filter patterns whose match results are remembered
+ROLL_FILTER_CACHE_PATTERNS = 16
+
+# Section length for sectional statistics when no distance highlight regions are set
+SECTION_STATS_LENGTH_M = 0.1
 PINNED_SERIAL_PORTS_DEFAULT = set()
 ALLOWED_SERIAL_USB_IDS = {(0x16C0, 0x0483)}
 SERIAL_BLUETOOTH_PORT_MARKERS = ("bluetooth", "bthenum", "bthmodem", "rfcomm")
@@ -144,6 +200,23 @@ SERIAL_BLUETOOTH_PORT_MARKERS = ("bluetooth", "bthenum", "bthmodem", "rfcomm")
 PLOT_IMAGE_EXPORT_DPI = 300
 PLOT_IMAGE_EXPORT_SCALE = 1
 
+# Rolls in the statistics analysis chart up to which each bar gets an x-axis tick
+STATISTICS_CHART_MAX_TICKS = 100
+# Percentiles drawn for each day, week or month when the statistics analysis aggregates rolls
+STATISTICS_AGGREGATION_PERCENTILES = (10, 90)
+
+# Statistical process control of the roll history in the statistics analysis
+SPC_OVERLAY_DEFAULT = False
+# Rolls the centre line and sigma are calculated from
+SPC_BASELINE_ROLLS = 20
+# Rolls in the rolling mean and sigma
+SPC_ROLLING_WINDOW = 20
+SPC_EWMA_LAMBDA = 0.2
+SPC_EWMA_LIMIT_SIGMAS = 3
+# CUSUM allowance and decision interval in sigmas
+SPC_CUSUM_K = 0.5
+SPC_CUSUM_H = 5
+
 POSTPROCESSORS_RECENT_CUTOFF_TIME_DAYS = 10
 
 LOG_WINDOW_MAX_LINES = 1000
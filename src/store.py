@@ -1,7 +1,8 @@
 import settings
-from models.Profile import RollDirectory
-from typing import List
+from models.RollRepository import RollRepository
+from utils.cache_budget import CacheBudget
 from PySide6.QtCore import Qt
+from operator import attrgetter
 import os
 
 try:
@@ -21,15 +22,87 @@ root_directory = settings.ROOT_DIRECTORY
 current_sort_column = 3 # Default to date modified
 current_sort_order = Qt.SortOrder.DescendingOrder
 
-# Used in statistics analysis
-# TODO: Refactor this to be used also elsewhere (e.g. atm hidden state is duplicated)
-roll_directories: List[RollDirectory] = []
+# Memory budget of the roll caches, see utils.cache_budget
+cache_budget = CacheBudget()
+# Loaded rolls shared by the profile view, statistics analysis and postprocessors
+roll_repository = RollRepository(cache_budget)
+# Roll whose profiles are currently in `profiles`, held in roll_repository
+loaded_roll_path = None
+
+# Path and file name -> Profile index over `profiles`, see _get_profile_index
+_profile_index = {}
+_indexed_profiles = None
+_indexed_profile_count = 0
+
+
+def _build_profile_index(profile_list):
+    index = {}
+    # Iterate in reverse so that the first matching profile wins, as in a linear scan
+    for profile in reversed(profile_list):
+        index[profile.name] = profile
+        index[profile.path] = profile
+    return index
+
+
+def _get_profile_index():
+    """
+    Return the lookup index of `profiles`, rebuilding it if the list has been
+    replaced or profiles have been added or removed since it was built.
+    """
+    global _profile_index, _indexed_profiles, _indexed_profile_count
+
+    if _indexed_profiles is not profiles or _indexed_profile_count != len(profiles):
+        _profile_index = _build_profile_index(profiles)
+        _indexed_profiles = profiles
+        _indexed_profile_count = len(profiles)
+    return _profile_index
+
+
+def set_profiles(profile_list):
+    """Replace the loaded profiles and rebuild the lookup index."""
+    global profiles
+    profiles = profile_list
+    _get_profile_index()
+
+
+def load_roll(path):
+    """
+    Make the roll at path the current roll and return it.
+
+    The roll is held in roll_repository until another roll is loaded or
+    the current one is unloaded, and `profiles` shares its profile list.
+    """
+    return set_loaded_roll(path, roll_repository.acquire(path))
+
+
+def set_loaded_roll(path, roll):
+    """
+    Make a roll already acquired from roll_repository the current roll.
+
+    The caller's reference is taken over and released when another roll is
+    loaded or the current one is unloaded.
+    """
+    global loaded_roll_path
+
+    if loaded_roll_path is not None:
+        roll_repository.release(loaded_roll_path)
+    loaded_roll_path = path
+    set_profiles(roll.profiles)
+    return roll
+
+
+def unload_roll():
+    """Release the current roll and clear `profiles`."""
+    global loaded_roll_path
+
+    if loaded_roll_path is not None:
+        roll_repository.release(loaded_roll_path)
+        loaded_roll_path = None
+    set_profiles([])
+
 
 def get_profile_by_filename(filename):
-    for profile in profiles:
-        if profile.path == filename or profile.name == filename:
-            return profile
-    return None
+    return _get_profile_index().get(filename)
 
 def sort_profiles(column_index=None, sort_order=None):
     """
@@ -48,22 +121,31 @@ def sort_profiles(column_index=None, sort_order=None):
     if sort_order is not None:
         current_sort_order = sort_order
 
-    # Use current state for sorting
+    sorted_list = sorted_profiles(profiles)
+    if sorted_list is not None:
+        profiles[:] = sorted_list
+
+
+def sorted_profiles(profile_list):
+    """
+    Return profile_list sorted by the current sort criteria, or None if the
+    sort column is unknown.
+    """
     reverse = (current_sort_order == Qt.SortOrder.DescendingOrder)
 
-    # Define sort key functions for each column
+    # Define sort key functions for each column, attribute getters run without a Python call per profile
     sort_keys = {
         0: lambda p: os.path.basename(p.path).lower(),
-        1: lambda p: p.file_size,
-        3: lambda p: p.date_modified,
-        4: lambda p: p.profile_length,
-        5: lambda p: p.hidden,
+        1: attrgetter('file_size'),
+        3: attrgetter('date_modified'),
+        4: attrgetter('profile_length'),
+        5: attrgetter('hidden'),
     }
 
     # Get the appropriate sort key function
     key_func = sort_keys.get(current_sort_column)
 
     if key_func:
-        profiles.sort(key=key_func, reverse=reverse)
-    else:
-        print(f"Warning: Unknown sort column '{current_sort_column}', profiles not sorted")
+        return sorted(profile_list, key=key_func, reverse=reverse)
+    print(f"Warning: Unknown sort column '{current_sort_column}', profiles not sorted")
+    return None
@@ -0,0 +1,99 @@
+"""
+Benchmark of FileView repaint cost for a roll with many profiles.
+
+Times the model lookups a full repaint of the profile length (4) and
+hidden state (5) columns makes, once with the store's profile index and
+once with the previous linear scan over store.profiles.
+
+Run from the src directory:
+    python -m test.benchmark_file_view [profile_count]
+"""
+
+import os
+import struct
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication, Qt
+from PySide6.QtWidgets import QApplication
+
+import store
+from gui.widgets.FileView import CustomFileSystemModel
+from models.Profile import Profile
+from utils.file_utils import list_prof_files
+
+PROFILE_COUNT = 600
+SAMPLES_PER_PROFILE = 1000
+REPEATS = 5
+
+
+def write_roll(path, profile_count):
+    header = struct.pack("<I32sf", 1, b"benchmark", 1.0).ljust(128, b"\x00")
+    samples = np.full(SAMPLES_PER_PROFILE, 300.0, dtype="<f4").tobytes()
+    for index in range(profile_count):
+        with open(os.path.join(path, f"profile_{index:05d}.prof"), "wb") as file:
+            file.write(header + samples)
+
+
+def linear_get_profile_by_filename(filename):
+    for profile in store.profiles:
+        if profile.path == filename or profile.name == filename:
+            return profile
+    return None
+
+
+def load_model(path, profile_count):
+    model = CustomFileSystemModel()
+    model.setNameFilters(["*.prof"])
+    model.setNameFilterDisables(False)
+    root_index = model.setRootPath(path)
+
+    deadline = time.monotonic() + 30
+    while model.rowCount(root_index) < profile_count and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    return model, root_index
+
+
+def repaint(model, root_index):
+    for row in range(model.rowCount(root_index)):
+        model.data(model.index(row, 4, root_index), Qt.ItemDataRole.DisplayRole)
+        model.data(model.index(row, 5, root_index), Qt.ItemDataRole.CheckStateRole)
+
+
+def time_repaint(model, root_index):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        repaint(model, root_index)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main(profile_count=PROFILE_COUNT):
+    app = QApplication.instance() or QApplication([])
+
+    with tempfile.TemporaryDirectory() as roll_path:
+        write_roll(roll_path, profile_count)
+        store.set_profiles([Profile.fromfile(path) for path in list_prof_files(roll_path)])
+        model, root_index = load_model(roll_path, profile_count)
+
+        indexed = time_repaint(model, root_index)
+        original_lookup = store.get_profile_by_filename
+        store.get_profile_by_filename = linear_get_profile_by_filename
+        try:
+            linear = time_repaint(model, root_index)
+        finally:
+            store.get_profile_by_filename = original_lookup
+
+    rows = model.rowCount(root_index)
+    print(f"FileView repaint of {rows} rows:")
+    print(f"  indexed lookup: {indexed * 1000:8.2f} ms")
+    print(f"  linear scan:    {linear * 1000:8.2f} ms")
+    del app
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else PROFILE_COUNT)
@@ -0,0 +1,10 @@
+import struct
+
+import numpy as np
+
+
+def write_profile(path, values):
+    """Write values as a .prof file with a minimal header."""
+    header = struct.pack("<I32sf", 1, b"test", 1.0).ljust(128, b"\x00")
+    with open(path, "wb") as file:
+        file.write(header + np.asarray(values, dtype="<f4").tobytes())
@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from models.AlertIndex import AlertIndex
+from models.RollStatistics import RollStatistics
+
+
+def roll_statistics(means, stds=None):
+    stds = stds if stds is not None else [0.0] * len(means)
+    return RollStatistics.from_rolls(
+        {"label": f"roll-{i}", "path": f"/rolls/roll-{i}", "timestamp": float(i), "stats": {"mean": mean, "std": std}}
+        for i, (mean, std) in enumerate(zip(means, stds))
+    )
+
+
+def limits(mean=(None, None), std=(None, None)):
+    return [
+        {"name": "mean_g", "units": "g", "min": mean[0], "max": mean[1]},
+        {"name": "stdev_g", "units": "g", "min": std[0], "max": std[1]},
+    ]
+
+
+class TestAlertIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = AlertIndex()
+        self.index.set_limits(limits(mean=(1.0, 3.0)))
+
+    def test_rolls_breaching_limits_are_indexed(self):
+        self.index.set_roll_statistics(roll_statistics([0.5, 2.0, None, 3.5], stds=[0.0, 0.4, 0.0, 0.0]))
+        self.index.set_limits(limits(mean=(1.0, 3.0), std=(None, 0.3)))
+
+        np.testing.assert_array_equal(self.index.violations["mean_g"], [True, False, False, True])
+        np.testing.assert_array_equal(self.index.out_of_limit_rows(), [0, 1, 3])
+        self.assertEqual(self.index.violations_by_path(), {
+            "/rolls/roll-0": ["mean_g"],
+            "/rolls/roll-1": ["stdev_g"],
+            "/rolls/roll-3": ["mean_g"],
+        })
+
+    def test_only_changed_limits_are_checked(self):
+        self.index.set_roll_statistics(roll_statistics([0.5, 2.0, 3.5]))
+
+        with patch.object(AlertIndex, "_check", wraps=AlertIndex._check) as check:
+            self.assertFalse(self.index.set_limits(limits(mean=(1.0, 3.0))))
+            self.assertTrue(self.index.set_limits(limits(mean=(1.0, 3.0), std=(None, 1.0))))
+
+        self.assertEqual(check.call_count, 1)
+
+        self.index.set_limits(limits(std=(None, 1.0)))
+        self.assertNotIn("mean_g", self.index.violations)
+        self.assertEqual(len(self.index.out_of_limit_rows()), 0)
+
+    def test_new_rolls_are_checked_on_their_own(self):
+        self.index.set_roll_statistics(roll_statistics([0.5, 2.0, 2.5]))
+
+        with patch.object(AlertIndex, "_check", wraps=AlertIndex._check) as check:
+            self.index.set_roll_statistics(roll_statistics([0.5, 2.0, 2.5, 4.0, 2.0]))
+
+        # The newest previous roll and the two new ones
+        self.assertEqual(len(check.call_args.args[0]), 3)
+        np.testing.assert_array_equal(self.index.out_of_limit_rows(), [0, 3])
+
+    def test_changed_rolls_are_checked_again(self):
+        self.index.set_roll_statistics(roll_statistics([0.5, 2.0, 2.5]))
+
+        self.index.set_roll_statistics(roll_statistics([2.0, 2.0, 2.5, 2.0]))
+
+        self.assertEqual(len(self.index.out_of_limit_rows()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
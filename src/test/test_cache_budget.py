@@ -0,0 +1,57 @@
+import unittest
+
+from utils.cache_budget import CacheBudget
+
+
+class TestCacheBudget(unittest.TestCase):
+    def setUp(self):
+        self.budget = CacheBudget(max_bytes=100)
+        self.evicted = []
+
+    def add(self, cache_name, key, nbytes):
+        self.budget.add(cache_name, key, nbytes, lambda evicted_key: self.evicted.append((cache_name, evicted_key)))
+
+    def test_least_recently_used_entries_of_any_cache_are_evicted(self):
+        self.add("rolls", "a", 40)
+        self.add("views", "b", 40)
+        self.budget.touch("rolls", "a")
+
+        self.add("rolls", "c", 40)
+
+        self.assertEqual(self.evicted, [("views", "b")])
+        self.assertEqual(self.budget.total_bytes, 80)
+        stats = self.budget.stats()
+        self.assertEqual((stats["views"].entries, stats["views"].bytes, stats["views"].evictions), (0, 0, 1))
+        self.assertEqual((stats["rolls"].entries, stats["rolls"].bytes), (2, 80))
+
+    def test_big_entry_evicts_as_many_as_needed_and_stays(self):
+        for key in "abc":
+            self.add("rolls", key, 30)
+
+        self.add("rolls", "big", 150)
+
+        self.assertEqual(self.evicted, [("rolls", "a"), ("rolls", "b"), ("rolls", "c")])
+        self.assertEqual(self.budget.total_bytes, 150)
+
+    def test_discarded_and_replaced_entries_are_not_evicted(self):
+        self.add("rolls", "a", 60)
+        self.add("rolls", "a", 50)
+        self.budget.discard("rolls", "a")
+        self.budget.discard("rolls", "missing")
+
+        self.assertEqual(self.budget.total_bytes, 0)
+        self.assertEqual(self.evicted, [])
+
+    def test_hit_rate_is_summarized(self):
+        self.add("rolls", "a", 2048)
+        self.budget.record_hit("rolls")
+        self.budget.record_hit("rolls")
+        self.budget.record_hit("rolls")
+        self.budget.record_miss("rolls")
+
+        self.assertEqual(self.budget.stats()["rolls"].hit_rate, 0.75)
+        self.assertIn("rolls: 1 entries, 2.0 KiB, 75% hits of 4, 0 evicted", self.budget.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from utils.change_coalescer import ChangeCoalescer
+
+
+class TestChangeCoalescer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.batches = []
+
+    def make_coalescer(self, delay_ms, max_delay_ms):
+        coalescer = ChangeCoalescer(delay_ms, max_delay_ms)
+        coalescer.changes_ready.connect(self.batches.append)
+        return coalescer
+
+    def process_events_for(self, seconds):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            QApplication.processEvents()
+
+    def test_changes_are_reported_once_in_first_change_order(self):
+        coalescer = self.make_coalescer(20, 1000)
+        for path in ("/tmp/roll-2", "/tmp/roll-1", "/tmp/roll-2/", "/tmp/roll-1/../roll-1"):
+            coalescer.add(path)
+        self.assertEqual(self.batches, [])
+
+        self.process_events_for(0.2)
+
+        self.assertEqual(self.batches, [["/tmp/roll-2", "/tmp/roll-1"]])
+
+    def test_steady_changes_are_reported_after_max_delay(self):
+        coalescer = self.make_coalescer(100, 200)
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            coalescer.add("/tmp/roll-1")
+            self.process_events_for(0.02)
+
+        self.assertGreaterEqual(len(self.batches), 1)
+
+    def test_flush_and_clear(self):
+        coalescer = self.make_coalescer(1000, 1000)
+        coalescer.add("/tmp/roll-1")
+        coalescer.flush()
+        coalescer.add("/tmp/roll-2")
+        coalescer.clear()
+        coalescer.flush()
+
+        self.assertEqual(self.batches, [["/tmp/roll-1"]])
+        self.assertEqual(coalescer.pending_paths(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from utils.decimation import MAX_POINTS_PER_PIXEL, DecimatedSeries
+from utils.uniform_axis import UniformAxis
+
+
+def column_extremes(x, y, x_min, x_max, pixels):
+    """Min and max of y in each pixel column of x_min..x_max."""
+    columns = np.floor((x - x_min) / (x_max - x_min) * pixels).astype(int)
+    inside = (columns >= 0) & (columns < pixels)
+    extremes = {}
+    for column, value in zip(columns[inside], y[inside]):
+        low, high = extremes.get(column, (value, value))
+        extremes[column] = (min(low, value), max(high, value))
+    return extremes
+
+
+class TestDecimatedSeries(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.length = 100_003
+        self.x = UniformAxis.from_step(0.001, self.length)
+        self.y = rng.normal(300.0, 20.0, self.length).astype(np.float32)
+        self.series = DecimatedSeries(self.x, self.y)
+
+    def test_short_views_keep_all_samples(self):
+        x, y = self.series.view(1.0, 1.1, 1000)
+
+        np.testing.assert_array_equal(y, self.y[999:1102])
+        np.testing.assert_array_equal(x, np.asarray(self.x)[999:1102])
+
+    def test_output_size_depends_on_pixels_not_samples(self):
+        for pixels in (50, 800):
+            x, y = self.series.full_view(pixels)
+            self.assertLessEqual(len(x), MAX_POINTS_PER_PIXEL * pixels + 2)
+            self.assertEqual(len(x), len(y))
+
+    def test_full_view_keeps_extents(self):
+        x, y = self.series.full_view(300)
+
+        self.assertEqual(x[0], 0.0)
+        self.assertEqual(x[-1], self.x[-1])
+        self.assertEqual(y.min(), self.y.min())
+        self.assertEqual(y.max(), self.y.max())
+
+    def test_every_pixel_column_keeps_min_and_max(self):
+        x_min, x_max, pixels = 12.3456, 87.6543, 400
+        x, y = self.series.view(x_min, x_max, pixels)
+
+        expected = column_extremes(np.asarray(self.x), self.y, x_min, x_max, pixels)
+        actual = column_extremes(x, y, x_min, x_max, pixels)
+        self.assertEqual(actual, expected)
+        self.assertTrue(np.all(np.diff(x) > 0))
+
+    def test_narrow_series_is_decimated_to_the_columns_it_covers(self):
+        # 100k samples drawn over 10 of 1000 columns
+        x, y = self.series.view(0.0, 10000.0, 1000)
+
+        self.assertLessEqual(len(x), MAX_POINTS_PER_PIXEL * 11 + 2)
+        self.assertEqual(y.max(), self.y.max())
+
+    def test_array_x_matches_uniform_axis(self):
+        series = DecimatedSeries(np.asarray(self.x), self.y)
+
+        np.testing.assert_array_equal(series.view(3.0, 40.0, 500)[0], self.series.view(3.0, 40.0, 500)[0])
+
+    def test_with_x_shares_blocks_and_matches_new_series(self):
+        shifted_x = (self.x + 5.0) * 1000
+        shifted = self.series.with_x(shifted_x)
+
+        self.assertIs(shifted._argmin, self.series._argmin)
+        expected = DecimatedSeries(shifted_x, self.y).view(8000.0, 20000.0, 700)
+        for actual, wanted in zip(shifted.view(8000.0, 20000.0, 700), expected):
+            np.testing.assert_array_equal(actual, wanted)
+
+    def test_tiny_series(self):
+        series = DecimatedSeries(np.array([0.0]), np.array([1.0]))
+        x, y = series.full_view(100)
+        np.testing.assert_array_equal(y, [1.0])
+
+        empty = DecimatedSeries(np.array([]), np.array([]))
+        self.assertEqual(len(empty.full_view(100)[0]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ from gui.widgets.DirectoryView import (
     selection_flags,
 )
 from gui.widgets.RegexFilterLineEdit import RegexFilterLineEdit
+from utils import profile_stats
 from utils.translation import _
 
 
@@ -387,6 +388,105 @@ class TestDirectoryView(unittest.TestCase):
         finally:
             view.close()
 
+    def test_neighbour_directory_paths_follow_displayed_order_nearest_first(self):
+        view = DirectoryView()
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                rolls = [os.path.join(tmpdir, f"roll-{index}") for index in range(5)]
+                for index, roll in enumerate(rolls):
+                    os.mkdir(roll)
+                    os.utime(roll, (1_000_000 + index, 1_000_000 + index))
+
+                view.change_root_directory(tmpdir)
+                # Newest first, rows are re-sorted as their dates are indexed
+                self.assertTrue(self.wait_until(lambda: view.get_selected_directory_path() == rolls[4]))
+                self.assertTrue(self.wait_until(lambda: view.neighbour_directory_paths(4) == rolls[3::-1]))
+                self.assertEqual(view.neighbour_directory_paths(2), [rolls[3], rolls[2]])
+
+                root_index = view.treeView.rootIndex()
+                view.treeView.setCurrentIndex(view.proxy_model.index(2, 0, root_index))
+
+                self.assertEqual(view.neighbour_directory_paths(1), [rolls[1], rolls[3]])
+                self.assertEqual(view.neighbour_directory_paths(3), [rolls[1], rolls[3], rolls[0], rolls[4]])
+        finally:
+            view.close()
+
+    def test_rolls_with_equal_dates_are_ordered_by_name(self):
+        view = DirectoryView()
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                rolls = [os.path.join(tmpdir, name) for name in ("b", "C", "a")]
+                for roll in rolls:
+                    os.mkdir(roll)
+                    os.utime(roll, (1_000_000, 1_000_000))
+
+                view.change_root_directory(tmpdir)
+                self.assertTrue(self.wait_until(lambda: len(view.model.roll_index) == 3))
+
+                root_index = view.treeView.rootIndex()
+                view.proxy_model.sort(3, Qt.SortOrder.AscendingOrder)
+                self.assertEqual(
+                    [os.path.basename(view.proxy_model.index(row, 0, root_index).data()) for row in range(3)],
+                    ["a", "b", "C"],
+                )
+        finally:
+            view.close()
+
+    def test_roll_index_follows_indexed_rolls_of_the_root(self):
+        view = DirectoryView()
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                rolls = [os.path.join(tmpdir, f"roll-{index}") for index in range(3)]
+                for index, roll in enumerate(rolls):
+                    os.mkdir(roll)
+                    for profile_index in range(index):
+                        open(os.path.join(roll, f"{profile_index}.prof"), "wb").close()
+                        os.utime(os.path.join(roll, f"{profile_index}.prof"), (1_000_000 + index, 1_000_000 + index))
+                # Without profiles the folder time is used
+                os.utime(rolls[0], (1_000_000, 1_000_000))
+
+                view.change_root_directory(tmpdir)
+                roll_index = view.model.roll_index
+                self.assertTrue(self.wait_until(lambda: len(roll_index) == 3))
+
+                self.assertEqual([entry.path for entry in roll_index.entries()], rolls)
+                self.assertEqual([entry.path for entry in roll_index.entries(descending=True)][:2], [rolls[2], rolls[1]])
+                self.assertTrue(self.wait_until(lambda: view.get_selected_directory_path() == rolls[2]))
+        finally:
+            view.close()
+
+    def test_rolls_out_of_alert_limits_are_badged_and_filtered(self):
+        view = DirectoryView()
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                rolls = [os.path.join(tmpdir, f"roll-{index}") for index in range(3)]
+                for index, roll in enumerate(rolls):
+                    os.mkdir(roll)
+                    os.utime(roll, (1_000_000 + index, 1_000_000 + index))
+                view.change_root_directory(tmpdir)
+                self.assertTrue(self.wait_until(lambda: view.get_selected_directory_path() == rolls[2]))
+
+                view.set_alert_violations({rolls[1]: ["mean_g"]})
+
+                badge_index = view.model.index(rolls[1], 0)
+                self.assertIsNotNone(view.model.data(badge_index, Qt.ItemDataRole.DecorationRole))
+                self.assertIn(
+                    profile_stats.stat_labels["mean_g"], view.model.data(badge_index, Qt.ItemDataRole.ToolTipRole))
+                self.assertEqual(view.model.breached_alert_limits(rolls[0]), ())
+
+                view.outOfLimitsCheckBox.setChecked(True)
+                root_index = view.treeView.rootIndex()
+                self.assertEqual(view.proxy_model.rowCount(root_index), 1)
+                self.assertIsNone(view._get_visible_selected_directory_path())
+
+                view.set_alert_violations({rolls[1]: ["mean_g"], rolls[0]: ["stdev_g"]})
+                self.assertEqual(view.proxy_model.rowCount(root_index), 2)
+
+                view.outOfLimitsCheckBox.setChecked(False)
+                self.assertEqual(view.proxy_model.rowCount(root_index), 3)
+        finally:
+            view.close()
+
     def test_directory_date_refresh_paths_include_synced_folder_ancestors(self):
         view = DirectoryView()
         try:
@@ -437,7 +537,7 @@ class TestDirectoryView(unittest.TestCase):
         finally:
             view.close()
 
-    def test_directory_changed_uses_directory_date_refresh(self):
+    def test_directory_changes_are_refreshed_once_per_batch(self):
         view = DirectoryView()
         try:
             emitted = []
@@ -445,8 +545,13 @@ class TestDirectoryView(unittest.TestCase):
             view.directory_contents_changed.connect(lambda: emitted.append(True))
 
             view.on_directory_changed("/tmp/roll-1")
+            view.on_file_changed("/tmp/roll-1/a.prof")
+            view.on_directory_changed("/tmp/roll-2")
+            view.refresh_directory_dates.assert_not_called()
+
+            self.assertTrue(self.wait_until(lambda: emitted))
 
-            view.refresh_directory_dates.assert_called_once_with(["/tmp/roll-1"])
+            view.refresh_directory_dates.assert_called_once_with(["/tmp/roll-1", "/tmp/roll-2"])
             self.assertEqual(emitted, [True])
         finally:
             view.close()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from utils.directory_watcher import DirectoryWatcher
+
+
+class TestDirectoryWatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.rolls = [os.path.join(self.root, f"roll-{index}") for index in range(3)]
+        for roll in self.rolls:
+            os.mkdir(roll)
+        self.watcher = DirectoryWatcher(poll_interval_ms=20)
+
+    def tearDown(self):
+        self.watcher.clear()
+        self.temp_dir.cleanup()
+
+    def watched(self):
+        return sorted(os.path.normpath(path) for path in self.watcher.watched_directories())
+
+    def test_watches_root_and_immediate_subfolders(self):
+        os.mkdir(os.path.join(self.rolls[0], "nested"))
+
+        self.watcher.watch(self.root)
+
+        self.assertEqual(self.watched(), sorted([self.root] + self.rolls))
+
+    def test_rewatch_registers_only_added_and_removed_folders(self):
+        self.watcher.watch(self.root)
+        new_roll = os.path.join(self.root, "roll-new")
+        os.mkdir(new_roll)
+        os.rmdir(self.rolls[1])
+
+        with patch.object(self.watcher._watcher, "addPaths", wraps=self.watcher._watcher.addPaths) as add_paths, \
+                patch.object(self.watcher._watcher, "removePaths", wraps=self.watcher._watcher.removePaths) as remove_paths:
+            self.watcher.watch(self.root)
+            self.watcher.watch(self.root)
+
+        add_paths.assert_called_once_with([new_roll])
+        self.assertLessEqual(remove_paths.call_count, 1)
+        self.assertEqual(self.watched(), sorted([self.root, self.rolls[0], self.rolls[2], new_roll]))
+
+    def test_root_change_drops_old_watches(self):
+        self.watcher.watch(self.root)
+
+        self.watcher.watch(self.rolls[0])
+
+        self.assertEqual(self.watched(), [self.rolls[0]])
+
+    def test_folders_that_cant_be_watched_are_polled(self):
+        changed = []
+        self.watcher.directory_changed.connect(changed.append)
+        with patch.object(self.watcher._watcher, "addPaths", side_effect=lambda paths: list(paths)), \
+                self.assertLogs("utils.directory_watcher", level="WARNING"):
+            self.watcher.watch(self.root)
+        self.assertEqual(sorted(self.watcher.polled_directories()), sorted([self.root] + self.rolls))
+
+        time.sleep(0.02)
+        open(os.path.join(self.rolls[2], "a.prof"), "wb").close()
+        os.rmdir(self.rolls[0])
+        deadline = time.monotonic() + 2
+        while len(changed) < 3 and time.monotonic() < deadline:
+            QApplication.processEvents()
+
+        self.assertEqual(sorted(changed), sorted([self.root, self.rolls[0], self.rolls[2]]))
+        self.assertNotIn(self.rolls[0], self.watcher.polled_directories())
+
+
+if __name__ == "__main__":
+    unittest.main()
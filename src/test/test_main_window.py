@@ -1,18 +1,23 @@
 import copy
 import json
 import os
+import re
 import tempfile
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 
 os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 
+import numpy as np
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QApplication, QMessageBox, QWidget
 
 import store
 from utils import preferences
 from utils.postprocess import get_postprocessors
 from utils.translation import _
+from test.profile_files import write_profile
 
 
 class TestMainWindowSettingsFileLoading(unittest.TestCase):
@@ -40,8 +45,19 @@ class TestMainWindowSettingsFileLoading(unittest.TestCase):
         self.window.profile_widget.set_toolbar_visible = MagicMock()
         self.window.serial_widget.view.model.applyFilter = MagicMock()
 
+    def wait_for_roll_view(self):
+        deadline = time.monotonic() + 5
+        while self.window.roll_view_loader.is_loading() and time.monotonic() < deadline:
+            QApplication.processEvents()
+        QApplication.processEvents()
+        self.assertFalse(self.window.roll_view_loader.is_loading())
+
     def tearDown(self):
+        # Results of a cancelled load are released when their event is handled
+        self.window.roll_view_loader.stop()
+        QApplication.processEvents()
         self.window.close()
+        store.unload_roll()
         for widget in QApplication.topLevelWidgets():
             if widget is not self.window and isinstance(widget, QWidget):
                 widget.close()
@@ -57,6 +73,15 @@ class TestMainWindowSettingsFileLoading(unittest.TestCase):
         self.assertEqual(self.window.load_settings_file_action.text(), _("MENU_BAR_LOAD_SETTINGS_FILE"))
         self.assertIs(self.window.load_settings_file_action.parent(), self.window)
 
+    def test_roll_list_and_statistics_share_roll_filter(self):
+        shared_filter = self.window.directory_view.roll_filter
+
+        self.window.directory_view.set_roll_filter("roll", re.compile("roll", re.IGNORECASE))
+
+        self.assertIs(self.window.directory_view.proxy_model.roll_filter, shared_filter)
+        self.assertIs(self.window.statistics_analysis_widget.roll_filter, shared_filter)
+        self.assertEqual(shared_filter.pattern, "roll")
+
     def test_load_settings_file_from_missing_path_creates_defaults_and_refreshes(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             path = os.path.join(tmpdir, "new", "prefs.json")
@@ -154,6 +179,30 @@ class TestMainWindowSettingsFileLoading(unittest.TestCase):
             result = self.window.load_settings_file_from_path(path)
             self.assertEqual(result.status, preferences.LOAD_STATUS_CREATED_DEFAULTS)
 
+    def test_profile_state_change_redraws_without_reloading(self):
+        store.selected_directory = "/roll"
+        self.window.load_profiles = MagicMock()
+        self.window.profile_widget.update_profile_styles = MagicMock()
+
+        with patch.object(store, "loaded_roll_path", "/roll"):
+            self.window.fileView.profile_state_changed.emit()
+
+        self.window.load_profiles.assert_not_called()
+        self.window.profile_widget.update_profile_styles.assert_called_once_with(store.profiles, self.window.directory_name)
+
+    def test_refresh_plot_applies_preferences_without_reloading(self):
+        store.selected_directory = "/roll"
+        self.window.refresh_plot = self.main_window_class.refresh_plot.__get__(self.window)
+        self.window.load_profiles = MagicMock()
+        self.window.profile_widget.update_plot = MagicMock()
+
+        with patch.object(store.roll_repository, "apply_preferences") as apply_preferences:
+            self.window.refresh_plot()
+
+        apply_preferences.assert_called_once()
+        self.window.load_profiles.assert_not_called()
+        self.window.profile_widget.update_plot.assert_called_once()
+
     def test_statistics_directory_selection_updates_app_plot_and_tree(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             selected_directory = os.path.join(tmpdir, "roll-1")
@@ -211,16 +260,80 @@ class TestMainWindowSettingsFileLoading(unittest.TestCase):
             self.window.profile_widget.update_plot = MagicMock()
 
             self.window.on_root_directory_changed(tmpdir)
+            self.wait_for_roll_view()
 
             self.assertEqual(store.root_directory, tmpdir)
             self.assertEqual(store.selected_directory, tmpdir)
             self.assertIsNone(store.selected_profile)
             self.assertEqual(store.profiles, [])
             self.window.fileView.set_directory.assert_called_once_with(tmpdir)
-            self.window.profile_widget.update_plot.assert_called_once_with(
-                [],
-                os.path.basename(tmpdir),
-            )
+            self.window.profile_widget.update_plot.assert_called_once()
+            profiles, directory_name, view = self.window.profile_widget.update_plot.call_args.args
+            self.assertEqual(profiles, [])
+            self.assertEqual(directory_name, os.path.basename(tmpdir))
+            self.assertEqual(view.path, tmpdir)
+
+    def test_directory_selection_loads_roll_in_background(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rolls = [os.path.join(tmpdir, name) for name in ("roll-1", "roll-2", "roll-3")]
+            for roll in rolls:
+                os.mkdir(roll)
+                write_profile(os.path.join(roll, "a.prof"), np.arange(100.0))
+            self.window.fileView.set_directory = MagicMock()
+            self.window.profile_widget.update_plot = MagicMock()
+
+            # Moving quickly through the roll list only draws the last roll
+            for roll in rolls:
+                self.window.on_directory_selected(roll)
+            self.window.profile_widget.update_plot.assert_not_called()
+            self.wait_for_roll_view()
+
+            self.window.profile_widget.update_plot.assert_called_once()
+            profiles, directory_name, view = self.window.profile_widget.update_plot.call_args.args
+            self.assertEqual(directory_name, "roll-3")
+            self.assertIs(profiles, store.profiles)
+            self.assertEqual([profile.path for profile in profiles], [os.path.join(rolls[2], "a.prof")])
+            self.assertEqual(len(view.mean_profile), 100)
+            self.assertIn(rolls[2], store.roll_repository.loaded_paths())
+            self.assertNotIn(rolls[1], store.roll_repository.loaded_paths())
+
+    def test_hidden_checkbox_waits_for_roll_to_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first_roll = os.path.join(tmpdir, "roll-1")
+            second_roll = os.path.join(tmpdir, "roll-2")
+            for roll in (first_roll, second_roll):
+                os.mkdir(roll)
+                write_profile(os.path.join(roll, "a.prof"), np.arange(100.0))
+            self.window.profile_widget.update_plot = MagicMock()
+            # The file list knows both rolls, their profiles are loaded again below
+            for roll in (second_roll, first_roll):
+                self.window.on_directory_selected(roll)
+                self.wait_for_roll_view()
+            self.window.roll_view_loader.clear_cache()
+
+            file_view = self.window.fileView
+            refreshed = []
+            file_view.model.dataChanged.connect(lambda top_left, bottom_right, roles: refreshed.append(
+                (top_left.column(), bottom_right.column())))
+
+            def checkbox():
+                return file_view.proxy_model.index(0, 5, file_view.view.rootIndex())
+
+            # The list shows the second roll while its profiles are still loading
+            self.window.on_directory_selected(second_roll)
+            self.assertTrue(self.window.roll_view_loader.is_loading())
+            self.assertFalse(file_view.proxy_model.flags(checkbox()) & Qt.ItemFlag.ItemIsUserCheckable)
+            self.assertFalse(file_view.proxy_model.setData(
+                checkbox(), Qt.CheckState.Unchecked.value, Qt.ItemDataRole.CheckStateRole))
+            self.assertEqual(checkbox().siblingAtColumn(4).data(), "--")
+
+            self.wait_for_roll_view()
+            self.assertIn((4, 5), refreshed)
+            self.assertNotEqual(checkbox().siblingAtColumn(4).data(), "--")
+            self.assertTrue(file_view.proxy_model.flags(checkbox()) & Qt.ItemFlag.ItemIsUserCheckable)
+            self.assertTrue(file_view.proxy_model.setData(
+                checkbox(), Qt.CheckState.Unchecked.value, Qt.ItemDataRole.CheckStateRole))
+            self.assertTrue(store.get_profile_by_filename(os.path.join(second_roll, "a.prof")).hidden)
 
     def test_root_directory_change_selects_root_when_root_has_profile_files(self):
         with tempfile.TemporaryDirectory() as tmpdir:
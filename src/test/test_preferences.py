@@ -25,6 +25,18 @@ class TestPreferences(unittest.TestCase):
             preferences.__dict__[key] = value
         preferences.preferences_file_path = self.original_preferences_file_path
 
+    def test_update_preferences_notifies_change_listeners(self):
+        changes = []
+        preferences.add_change_listener(changes.append)
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                preferences.preferences_file_path = os.path.join(temp_dir, "preferences.json")
+                preferences.update_preferences({"alert_limits": preferences.alert_limits})
+        finally:
+            preferences.remove_change_listener(changes.append)
+
+        self.assertEqual(changes, [{"alert_limits"}])
+
     def test_missing_alert_limit_defaults_are_restored(self):
         legacy_limits = [
             {
@@ -1,10 +1,14 @@
+import os
+import struct
+import tempfile
 import unittest
 import warnings
 
 import numpy as np
 
-from models.Profile import Profile, ProfileData, ProfileHeader
-from utils.profile_stats import Stats, calc_mean_profile
+import settings
+from models.Profile import Profile, ProfileData, ProfileHeader, RollDirectory
+from utils.profile_stats import LinearFitSums, Stats, calc_mean_profile, linear_fit_slope
 
 
 class TestProfileStats(unittest.TestCase):
@@ -36,6 +40,87 @@ class TestProfileStats(unittest.TestCase):
 
         self.assertTrue(np.isnan(value))
 
+    def test_slope_matches_least_squares_fit(self):
+        rng = np.random.default_rng(0)
+        distances = np.arange(500) * 0.001
+        values = 300 + 5 * distances + rng.normal(size=len(distances))
+        positions = distances / distances[-1]
+
+        expected, _ = np.polyfit(positions, values, 1)
+
+        self.assertAlmostEqual(Stats().slope((distances, values)), expected, places=9)
+        self.assertAlmostEqual(linear_fit_slope(positions, values), expected, places=9)
+
+    def test_linear_fit_sums_answers_window_slopes(self):
+        rng = np.random.default_rng(1)
+        positions = np.linspace(0.0, 1.0, 200)
+        values = 250 + 10 * positions ** 2 + rng.normal(size=len(positions))
+        fit_sums = LinearFitSums(positions, values)
+
+        for start, end in [(0, 200), (10, 50), (150, 200)]:
+            expected, _ = np.polyfit(positions[start:end], values[start:end], 1)
+            self.assertAlmostEqual(fit_sums.slope(start, end), expected, places=9)
+
+        self.assertEqual(fit_sums.slope(5, 6), 0.0)
+        self.assertEqual(fit_sums.slope(300, 400), 0.0)
+
+    def test_profile_samples_are_loaded_in_configured_precision(self):
+        samples = np.array([300.5, 301.25, 299.75], dtype="<f4")
+
+        data = ProfileData.frombytes(samples.tobytes() + b"\x00\x00", 0.001)
+
+        self.assertEqual(data.hardnesses.dtype, np.dtype(settings.NUMERIC_PRECISION))
+        np.testing.assert_array_equal(data.hardnesses, samples)
+        np.testing.assert_allclose(data.distances, [0.0, 0.001, 0.002])
+        self.assertEqual(data.nbytes, data.distances.nbytes + data.hardnesses.nbytes)
+
+    def test_float32_mean_profile_stats_match_float64(self):
+        rng = np.random.default_rng(2)
+        distances = np.arange(2000) * 0.001
+        profiles = [
+            Profile(
+                path=f"{index}.prof",
+                data=ProfileData(
+                    distances=distances,
+                    hardnesses=(300 + rng.normal(scale=5, size=len(distances))).astype(np.float32),
+                ),
+                header=ProfileHeader(prof_version=1, serial_number="test", sample_step=1.0),
+                file_size=128,
+                date_modified=0.0,
+            )
+            for index in range(4)
+        ]
+        reference = [
+            Profile(profile.path, ProfileData(distances, profile.data.hardnesses.astype(np.float64)),
+                    profile.header, profile.file_size, profile.date_modified)
+            for profile in profiles
+        ]
+
+        mean_profile = calc_mean_profile(profiles)
+        reference_profile = calc_mean_profile(reference)
+        stats = Stats()
+
+        self.assertEqual(mean_profile[1].dtype, np.float32)
+        for stat in (stats.mean, stats.std, stats.cv, stats.pp):
+            self.assertAlmostEqual(stat(mean_profile), stat(reference_profile), places=3)
+
+    def test_roll_memory_usage_counts_profile_and_mean_samples(self):
+        with tempfile.TemporaryDirectory() as roll_path:
+            header = struct.pack("<I32sf", 1, b"test", 1.0).ljust(128, b"\x00")
+            for index in range(3):
+                samples = np.full(500, 300 + index, dtype="<f4")
+                with open(os.path.join(roll_path, f"{index}.prof"), "wb") as file:
+                    file.write(header + samples.tobytes())
+
+            usage = RollDirectory(roll_path).memory_usage()
+
+        sample_bytes = np.dtype(settings.NUMERIC_PRECISION).itemsize
+        self.assertEqual(usage.profile_count, 3)
+        # Distance axes are implicit and hold no sample arrays
+        self.assertEqual(usage.profile_bytes, 3 * 500 * sample_bytes)
+        self.assertEqual(usage.mean_profile_bytes, 500 * sample_bytes)
+        self.assertEqual(usage.total_bytes, usage.profile_bytes + usage.mean_profile_bytes)
+
 
 if __name__ == "__main__":
     unittest.main()
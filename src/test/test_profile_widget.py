@@ -7,6 +7,7 @@ import settings
 from PySide6.QtWidgets import QApplication
 
 from models.Profile import Profile, ProfileData, ProfileHeader
+from models.RollView import RollView
 from gui.widgets.ProfileWidget import ProfileWidget
 from utils.highlighted_regions import (
     AbsoluteMeanOffsetHardnessHighlightRegion,
@@ -15,6 +16,24 @@ from utils.highlighted_regions import (
     DistanceHighlightRegion,
 )
 from utils import preferences
+from utils.uniform_axis import UniformAxis
+import store
+
+
+def make_roll_profiles(count=3, samples=2000):
+    return [
+        Profile(
+            path=f"/roll/p{index}.prof",
+            data=ProfileData(
+                distances=UniformAxis.from_step(0.01, samples),
+                hardnesses=np.full(samples, 10.0 * (index + 1), dtype=np.float32),
+            ),
+            header=ProfileHeader(prof_version=1, serial_number="test", sample_step=10.0),
+            file_size=0,
+            date_modified=0.0,
+        )
+        for index in range(count)
+    ]
 
 
 class TestProfileWidget(unittest.TestCase):
@@ -349,5 +368,111 @@ class TestProfileWidget(unittest.TestCase):
             widget.close()
 
 
+class TestProfileWidgetIncrementalUpdates(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.original_selected_profile = store.selected_profile
+        self.original_recalculate_mean = preferences.recalculate_mean
+        self.original_continuous_mode = preferences.continuous_mode
+        preferences.continuous_mode = False
+        preferences.recalculate_mean = True
+        store.selected_profile = None
+
+        self.profiles = make_roll_profiles()
+        self.widget = ProfileWidget()
+        self.widget.update_plot(self.profiles, "roll")
+
+    def tearDown(self):
+        # Run idle redraws while the canvas still exists
+        QApplication.processEvents()
+        self.widget.close()
+        store.selected_profile = self.original_selected_profile
+        preferences.recalculate_mean = self.original_recalculate_mean
+        preferences.continuous_mode = self.original_continuous_mode
+
+    def test_artists_are_registered_by_profile_path(self):
+        self.assertEqual(list(self.widget._profile_lines), [p.path for p in self.profiles])
+
+    def test_selection_change_within_roll_is_blitted(self):
+        store.selected_profile = "p0.prof"
+        self.widget.update_profile_styles(self.profiles, "roll")
+
+        store.selected_profile = "p2.prof"
+        with patch.object(self.widget, "update_plot") as update_plot, \
+             patch.object(self.widget.canvas, "blit") as blit:
+            self.widget.update_profile_styles(self.profiles, "roll")
+
+        update_plot.assert_not_called()
+        blit.assert_called_once()
+        selected_line = self.widget._profile_lines["/roll/p2.prof"]
+        np.testing.assert_array_equal(self.widget._selection_line.get_ydata(), selected_line.get_ydata())
+        self.assertEqual(selected_line.get_alpha(), 0.2)
+
+    def test_hidden_change_updates_visibility_and_mean_without_replotting(self):
+        self.profiles[2].hidden = True
+        with patch.object(self.widget, "update_plot") as update_plot:
+            self.widget.update_profile_styles(self.profiles, "roll")
+
+        update_plot.assert_not_called()
+        self.assertFalse(self.widget._profile_lines["/roll/p2.prof"].get_visible())
+        self.assertAlmostEqual(float(np.mean(self.widget.mean_profile)), 15.0, places=3)
+
+    def test_hidden_change_in_continuous_mode_replots(self):
+        preferences.continuous_mode = True
+        self.widget.update_plot(self.profiles, "roll")
+
+        self.profiles[0].hidden = True
+        with patch.object(self.widget, "update_plot") as update_plot:
+            self.widget.update_profile_styles(self.profiles, "roll")
+
+        update_plot.assert_called_once_with(self.profiles, "roll")
+
+    def test_long_profiles_are_drawn_decimated_and_refined_on_zoom(self):
+        profiles = make_roll_profiles(count=1, samples=200_000)
+        profiles[0].data.hardnesses[123_456] = 500.0
+        self.widget.update_plot(profiles, "long-roll")
+        line = self.widget._profile_lines[profiles[0].path]
+        self.widget.canvas.draw()
+
+        width = self.widget.profile_ax.bbox.width
+        self.assertLess(len(line.get_xdata()), 4 * width + 4)
+        self.assertEqual(max(line.get_ydata()), 500.0)
+
+        self.widget.profile_ax.set_xlim(1234.0, 1235.0)
+        self.widget.canvas.draw()
+
+        np.testing.assert_allclose(line.get_xdata(), np.arange(123_399, 123_502) * 0.01)
+
+    def test_precomputed_roll_view_is_drawn_without_recalculating(self):
+        view = RollView.build("/roll", roll=None, profiles=self.profiles)
+
+        with patch("gui.widgets.ProfileWidget.calc_mean_profile") as calc_mean_profile, \
+             patch("gui.widgets.ProfileWidget.DecimatedSeries") as decimated_series:
+            self.widget.update_plot(self.profiles, "roll", view)
+
+        calc_mean_profile.assert_not_called()
+        decimated_series.assert_not_called()
+        self.assertIs(self.widget.mean_profile, view.mean_profile)
+        self.assertEqual(self.widget.stats_widget.widgets[0].value, view.stat_values["mean_g"])
+
+    def test_roll_view_of_other_profiles_is_recalculated(self):
+        view = RollView.build("/roll", roll=None, profiles=self.profiles)
+        self.profiles[2].hidden = True
+
+        self.widget.update_plot(self.profiles, "roll", view)
+
+        self.assertAlmostEqual(float(np.mean(self.widget.mean_profile)), 15.0, places=3)
+        self.assertAlmostEqual(self.widget.stats_widget.widgets[0].value, 15.0, places=3)
+
+    def test_other_roll_replots(self):
+        with patch.object(self.widget, "update_plot") as update_plot:
+            self.widget.update_profile_styles(self.profiles, "other-roll")
+
+        update_plot.assert_called_once_with(self.profiles, "other-roll")
+
+
 if __name__ == "__main__":
     unittest.main()
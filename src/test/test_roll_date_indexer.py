@@ -0,0 +1,183 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from workers.roll_date_indexer import (
+    CUSTOM_SORT_FILES_IN_DIRECTORY_LIMIT,
+    IndexedRoll,
+    RollDateIndex,
+    RollDateIndexer,
+    folder_signature,
+    index_roll,
+    latest_profile_mtime,
+    scan_profile_files,
+)
+
+
+def touch(path, mtime):
+    with open(path, "wb") as file:
+        file.write(b"data")
+    os.utime(path, (mtime, mtime))
+
+
+class TestRollDates(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.roll = os.path.join(self.temp_dir.name, "roll-1")
+        os.makedirs(os.path.join(self.roll, "nested"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_latest_profile_mtime_includes_subfolders_and_skips_mean(self):
+        touch(os.path.join(self.roll, "a.prof"), 1_700_000_000)
+        touch(os.path.join(self.roll, "nested", "b.PROF"), 1_700_000_100)
+        touch(os.path.join(self.roll, "mean.prof"), 1_700_000_200)
+        touch(os.path.join(self.roll, "notes.txt"), 1_700_000_300)
+
+        self.assertEqual(latest_profile_mtime(self.roll), 1_700_000_100)
+        # Only profiles in the roll folder itself belong to the roll
+        self.assertEqual(scan_profile_files(self.roll), (1_700_000_100, 1))
+
+    def test_latest_profile_mtime_gives_up_on_large_folders(self):
+        for index in range(CUSTOM_SORT_FILES_IN_DIRECTORY_LIMIT + 1):
+            touch(os.path.join(self.roll, f"{index}.prof"), 1_700_000_000)
+
+        self.assertIsNone(latest_profile_mtime(self.roll))
+
+    def test_index_roll_falls_back_to_folder_time(self):
+        os.utime(self.roll, (1_600_000_000, 1_600_000_000))
+
+        indexed = index_roll(self.roll)
+
+        self.assertEqual(indexed.timestamp, 1_600_000_000)
+        self.assertEqual(indexed.signature, os.stat(os.path.join(self.roll, "nested")).st_mtime_ns)
+        self.assertEqual(indexed.profile_count, 0)
+        self.assertEqual(index_roll(os.path.join(self.roll, "missing")), IndexedRoll(None, None, None))
+
+    def test_signature_follows_nested_folders(self):
+        nested = os.path.join(self.roll, "nested")
+        os.utime(self.roll, (1_600_000_000, 1_600_000_000))
+        os.utime(nested, (1_600_000_000, 1_600_000_000))
+        before = folder_signature(self.roll)
+
+        os.utime(nested, (1_600_000_100, 1_600_000_100))
+
+        self.assertEqual(before, 1_600_000_000 * 10**9)
+        self.assertEqual(folder_signature(self.roll), 1_600_000_100 * 10**9)
+
+    def test_index_roll_skips_scan_of_unchanged_folder(self):
+        touch(os.path.join(self.roll, "a.prof"), 1_700_000_000)
+        indexed = index_roll(self.roll)
+        self.assertEqual(indexed.profile_count, 1)
+
+        with patch("workers.roll_date_indexer.scan_profile_files", return_value=(1.0, 1)) as scan:
+            self.assertEqual(index_roll(self.roll, indexed), indexed)
+            scan.assert_not_called()
+
+            index_roll(self.roll, indexed._replace(signature=indexed.signature - 1))
+            scan.assert_called_once_with(self.roll)
+
+    def test_index_is_saved_and_loaded(self):
+        file_path = os.path.join(self.temp_dir.name, "index", "roll_dates.json")
+        index = RollDateIndex(file_path)
+        index.set(self.roll, IndexedRoll(123, 1_700_000_000.5, 4))
+        index.save()
+
+        loaded = RollDateIndex(file_path)
+        loaded.load()
+        self.assertEqual(loaded.get(self.roll), IndexedRoll(123, 1_700_000_000.5, 4))
+
+        loaded.invalidate(self.roll)
+        self.assertEqual(loaded.get(self.roll), IndexedRoll(None, 1_700_000_000.5, 4))
+
+    def test_corrupt_index_is_ignored(self):
+        file_path = os.path.join(self.temp_dir.name, "roll_dates.json")
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write("{not json")
+
+        index = RollDateIndex(file_path)
+        with self.assertLogs("workers.roll_date_indexer", level="WARNING"):
+            index.load()
+        self.assertIsNone(index.get(self.roll))
+
+    def test_index_drops_oldest_entries(self):
+        index = RollDateIndex(os.path.join(self.temp_dir.name, "roll_dates.json"))
+        with patch("settings.ROLL_DATE_INDEX_MAX_ENTRIES", 2):
+            for path in ("a", "b", "c"):
+                index.set(path, IndexedRoll(1, 1.0, 0))
+
+        self.assertIsNone(index.get("a"))
+        self.assertEqual(index.get("c"), IndexedRoll(1, 1.0, 0))
+
+
+class TestRollDateIndexer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.temp_dir.name, "roll_dates.json")
+        self.rolls = []
+        for index in range(5):
+            roll = os.path.join(self.temp_dir.name, f"roll-{index}")
+            os.mkdir(roll)
+            touch(os.path.join(roll, "a.prof"), 1_700_000_000 + index)
+            self.rolls.append(roll)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def index_all(self, indexer):
+        results = []
+        idle = []
+        indexer.dates_indexed.connect(results.extend)
+        indexer.idle.connect(lambda: idle.append(True))
+        for roll in self.rolls:
+            indexer.request(roll)
+        deadline = time.monotonic() + 5
+        while not idle and time.monotonic() < deadline:
+            QApplication.processEvents()
+        self.assertTrue(idle)
+        self.assertFalse(indexer.is_busy())
+        return results
+
+    def test_dates_are_reported_in_batches_and_persisted(self):
+        indexer = RollDateIndexer(self.index_path)
+        with patch("settings.ROLL_DATE_INDEX_BATCH_SIZE", 2):
+            results = self.index_all(indexer)
+        indexer.save()
+
+        self.assertEqual(
+            [(path, indexed.timestamp, indexed.profile_count) for path, indexed in results],
+            [(roll, 1_700_000_000 + index, 1) for index, roll in enumerate(self.rolls)],
+        )
+
+        next_session = RollDateIndexer(self.index_path)
+        self.assertEqual(next_session.known_date(self.rolls[3]), 1_700_000_003)
+        with patch("workers.roll_date_indexer.scan_profile_files") as scan:
+            self.index_all(next_session)
+            scan.assert_not_called()
+
+    def test_invalidated_roll_is_rescanned(self):
+        indexer = RollDateIndexer(self.index_path)
+        self.index_all(indexer)
+        touch(os.path.join(self.rolls[0], "a.prof"), 1_800_000_000)
+
+        indexer.invalidate(self.rolls[0])
+        # The old date is shown until the rescan is done
+        self.assertEqual(indexer.known_date(self.rolls[0]), 1_700_000_000)
+        results = self.index_all(indexer)
+
+        self.assertIn((self.rolls[0], 1_800_000_000), [(path, indexed.timestamp) for path, indexed in results])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import re
+import unittest
+from unittest.mock import MagicMock
+
+from utils.roll_filter import RollFilter, is_literal
+
+
+def compile_filter(pattern):
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class TestRollFilter(unittest.TestCase):
+    def setUp(self):
+        self.names = ["roll-1", "Roll-12", "roll-2", "other"]
+        self.roll_filter = RollFilter(max_patterns=4)
+
+    def set_pattern(self, pattern):
+        return self.roll_filter.set_pattern(pattern, compile_filter(pattern) if pattern else None)
+
+    def test_no_pattern_matches_everything(self):
+        self.assertFalse(self.set_pattern(""))
+        self.assertEqual(self.roll_filter.filter(self.names), self.names)
+
+    def test_filter_matches_regex(self):
+        self.assertTrue(self.set_pattern(r"roll-\d$"))
+
+        self.assertEqual(self.roll_filter.filter(self.names), ["roll-1", "roll-2"])
+        self.assertFalse(self.set_pattern(r"roll-\d$"))
+
+    def test_results_are_memoized_per_pattern(self):
+        regex = MagicMock(wraps=compile_filter("roll"), pattern="roll", flags=compile_filter("").flags)
+        self.roll_filter.set_pattern("roll", regex)
+        self.roll_filter.filter(self.names)
+        self.set_pattern("other")
+        self.roll_filter.set_pattern("roll", regex)
+
+        self.assertEqual(self.roll_filter.filter(self.names), ["roll-1", "Roll-12", "roll-2"])
+        self.assertEqual(regex.search.call_count, len(self.names))
+
+    def test_extended_literal_pattern_searches_only_previous_matches(self):
+        self.set_pattern("roll-1")
+        self.roll_filter.filter(self.names)
+
+        regex = MagicMock(wraps=compile_filter("ROLL-12"), pattern="ROLL-12", flags=compile_filter("").flags)
+        self.roll_filter.set_pattern("ROLL-12", regex)
+
+        self.assertEqual(self.roll_filter.filter(self.names), ["Roll-12"])
+        self.assertEqual([call.args[0] for call in regex.search.call_args_list], ["roll-1", "Roll-12"])
+
+    def test_extended_regex_pattern_is_searched_in_full(self):
+        self.set_pattern("roll-1")
+        self.roll_filter.filter(self.names)
+        self.set_pattern("roll-1|roll-2")
+
+        self.assertEqual(self.roll_filter.filter(self.names), ["roll-1", "Roll-12", "roll-2"])
+
+    def test_literal_patterns(self):
+        self.assertTrue(is_literal("roll-1 2024_a"))
+        self.assertFalse(is_literal("roll.1"))
+        self.assertFalse(is_literal("a|b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from models.RollIndex import RollIndex
+
+
+class TestRollIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RollIndex()
+        for name, modified in (("b", 20.0), ("a", 10.0), ("c", 30.0), ("undated", None)):
+            self.index.update(f"/rolls/{name}", name, modified=modified)
+
+    def paths(self, descending=False):
+        return [entry.path for entry in self.index.entries(descending)]
+
+    def test_entries_are_sorted_by_date(self):
+        self.assertEqual(self.paths(), ["/rolls/undated", "/rolls/a", "/rolls/b", "/rolls/c"])
+        self.assertEqual(self.paths(descending=True)[0], "/rolls/c")
+        self.assertEqual(len(self.index), 4)
+
+    def test_update_replaces_entry_and_its_sort_key(self):
+        self.index.update("/rolls/a", "a", modified=40.0)
+
+        self.assertEqual(self.paths()[-1], "/rolls/a")
+        self.assertEqual(self.index.get("/rolls/a").modified, 40.0)
+        self.assertEqual(self.index.sort_key("/rolls/a"), (40.0, "a", "/rolls/a"))
+        self.assertEqual(len(self.index), 4)
+
+    def test_equal_dates_are_ordered_by_name(self):
+        self.index.update("/rolls/B2", "B2", modified=20.0)
+
+        self.assertEqual(self.paths()[2:4], ["/rolls/b", "/rolls/B2"])
+
+    def test_remove_and_clear(self):
+        self.index.remove("/rolls/b")
+        self.index.remove("/rolls/missing")
+
+        self.assertNotIn("/rolls/b", self.index)
+        self.assertIsNone(self.index.sort_key("/rolls/b"))
+        self.assertEqual(self.paths(), ["/rolls/undated", "/rolls/a", "/rolls/c"])
+
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
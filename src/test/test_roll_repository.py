@@ -0,0 +1,261 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+from models.Profile import RollDirectory
+from models.RollRepository import RollRepository
+from utils.cache_budget import CacheBudget
+from utils import preferences
+from test.profile_files import write_profile
+
+
+class TestRollRepository(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.roll_path = self.temp_dir.name
+        write_profile(os.path.join(self.roll_path, "a.prof"), [1.0, 2.0, 3.0])
+        write_profile(os.path.join(self.roll_path, "b.prof"), [3.0, 4.0, 5.0])
+        self.repository = RollRepository()
+        self.original_flip = preferences.flip_profiles
+        self.original_continuous_mode = preferences.continuous_mode
+
+    def tearDown(self):
+        preferences.flip_profiles = self.original_flip
+        preferences.continuous_mode = self.original_continuous_mode
+        self.temp_dir.cleanup()
+
+    def test_acquire_shares_one_roll_per_path(self):
+        roll = self.repository.acquire(self.roll_path)
+        again = self.repository.acquire(os.path.join(self.roll_path, "."))
+
+        self.assertIs(roll, again)
+        self.assertEqual([p.name for p in roll.profiles], ["a.prof", "b.prof"])
+
+    def test_roll_is_dropped_when_last_reference_is_released(self):
+        self.repository.acquire(self.roll_path)
+        self.repository.acquire(self.roll_path)
+
+        self.repository.release(self.roll_path)
+        self.assertIsNotNone(self.repository.get(self.roll_path))
+
+        self.repository.release(self.roll_path)
+        self.assertIsNone(self.repository.get(self.roll_path))
+        self.assertEqual(self.repository.loaded_paths(), [])
+
+    def test_released_roll_is_kept_within_the_cache_budget(self):
+        budget = CacheBudget(max_bytes=10**6)
+        repository = RollRepository(budget)
+        roll = repository.acquire(self.roll_path)
+        repository.release(self.roll_path)
+
+        self.assertIsNone(repository.get(self.roll_path))
+        self.assertEqual(budget.total_bytes, roll.memory_usage().total_bytes)
+        with patch("models.Profile.Profile.fromfile") as fromfile:
+            self.assertIs(repository.acquire(self.roll_path), roll)
+            fromfile.assert_not_called()
+        self.assertEqual(budget.total_bytes, 0)
+        self.assertEqual((budget.stats()["Rolls"].hits, budget.stats()["Rolls"].misses), (1, 1))
+
+    def test_released_roll_is_dropped_when_evicted(self):
+        other_roll_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(other_roll_dir.cleanup)
+        write_profile(os.path.join(other_roll_dir.name, "a.prof"), [1.0, 2.0, 3.0])
+        budget = CacheBudget(max_bytes=1)
+        repository = RollRepository(budget)
+
+        roll = repository.acquire(self.roll_path)
+        repository.release(self.roll_path)
+        with repository.borrow(other_roll_dir.name):
+            pass
+
+        self.assertNotIn(self.repository._key(self.roll_path), repository._entries)
+        self.assertIsNot(repository.acquire(self.roll_path), roll)
+
+    def test_borrow_releases_after_block(self):
+        with self.repository.borrow(self.roll_path) as roll:
+            self.assertEqual(len(roll.profiles), 2)
+            self.assertIs(self.repository.get(self.roll_path), roll)
+        self.assertIsNone(self.repository.get(self.roll_path))
+
+    def test_changed_files_reload_and_keep_hidden_state(self):
+        invalidated = []
+        self.repository.add_invalidation_listener(invalidated.append)
+        roll = self.repository.acquire(self.roll_path)
+        roll.profiles[0].hidden = True
+
+        write_profile(os.path.join(self.roll_path, "c.prof"), [5.0, 6.0, 7.0])
+        again = self.repository.acquire(self.roll_path)
+
+        # The reloaded roll is a new object, the one already handed out stays as it was
+        self.assertIsNot(again, roll)
+        self.assertEqual([p.name for p in roll.profiles], ["a.prof", "b.prof"])
+        self.assertEqual([p.name for p in again.profiles], ["a.prof", "b.prof", "c.prof"])
+        self.assertEqual([p.hidden for p in again.profiles], [True, False, False])
+        self.assertIs(self.repository.get(self.roll_path), again)
+        self.assertEqual(invalidated, [roll.path])
+
+    def test_unchanged_roll_is_not_parsed_again(self):
+        roll = self.repository.acquire(self.roll_path)
+        profiles = roll.profiles
+
+        self.repository.acquire(self.roll_path)
+
+        self.assertIs(roll.profiles, profiles)
+
+    def test_flip_preference_change_reverses_profiles_in_memory(self):
+        preferences.flip_profiles = False
+        roll = self.repository.acquire(self.roll_path)
+        profiles = list(roll.profiles)
+        self.assertEqual(roll.profiles[0].data.hardnesses[0], 1.0)
+
+        preferences.flip_profiles = True
+        with patch("models.Profile.Profile.fromfile") as fromfile:
+            self.repository.acquire(self.roll_path)
+            fromfile.assert_not_called()
+
+        self.assertEqual(roll.profiles, profiles)
+        self.assertIs(roll.profiles[0], profiles[0])
+        np.testing.assert_array_equal(roll.profiles[0].data.hardnesses, [3.0, 2.0, 1.0])
+
+    def test_apply_preferences_updates_mean_profile(self):
+        invalidated = []
+        self.repository.add_invalidation_listener(invalidated.append)
+        preferences.continuous_mode = False
+        roll = self.repository.acquire(self.roll_path)
+        self.assertEqual(len(roll.mean_profile), 3)
+
+        self.repository.apply_preferences()
+        self.assertEqual(invalidated, [])
+
+        preferences.continuous_mode = True
+        self.repository.apply_preferences()
+
+        self.assertEqual(len(roll.mean_profile), 6)
+        self.assertEqual(invalidated, [roll.path])
+
+    def test_invalidate_forces_reload(self):
+        invalidated = []
+        self.repository.add_invalidation_listener(invalidated.append)
+        roll = self.repository.acquire(self.roll_path)
+        profiles = roll.profiles
+
+        self.repository.invalidate()
+        again = self.repository.acquire(self.roll_path)
+
+        self.assertIsNot(again, roll)
+        self.assertIs(roll.profiles, profiles)
+        self.assertEqual(invalidated, [None])
+
+        self.repository.remove_invalidation_listener(invalidated.append)
+        self.repository.invalidate(self.roll_path)
+        self.assertEqual(invalidated, [None])
+
+
+
+class TestRollRepositoryWorkerThreads(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.roll_path = self.temp_dir.name
+        write_profile(os.path.join(self.roll_path, "a.prof"), [1.0, 2.0, 3.0])
+        self.repository = RollRepository()
+        self.original_flip = preferences.flip_profiles
+        self.invalidated = []
+        self.repository.add_invalidation_listener(
+            lambda path: self.invalidated.append((path, threading.current_thread() is threading.main_thread())))
+
+    def tearDown(self):
+        preferences.flip_profiles = self.original_flip
+        self.temp_dir.cleanup()
+
+    def acquire_on_worker(self):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(self.repository.acquire(self.roll_path)))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_worker_reload_is_swapped_in_on_gui_thread(self):
+        roll = self.repository.acquire(self.roll_path)
+        roll.profiles[0].hidden = True
+        write_profile(os.path.join(self.roll_path, "b.prof"), [3.0, 4.0, 5.0])
+
+        reloaded = self.acquire_on_worker()
+
+        self.assertIsNot(reloaded, roll)
+        self.assertEqual([p.name for p in reloaded.profiles], ["a.prof", "b.prof"])
+        self.assertEqual([p.hidden for p in reloaded.profiles], [True, False])
+        # The roll the GUI holds is left alone until the GUI thread swaps the new one in
+        self.assertEqual([p.name for p in roll.profiles], ["a.prof"])
+        self.assertIs(self.repository.get(self.roll_path), roll)
+        self.assertEqual(self.invalidated, [])
+
+        QApplication.processEvents()
+
+        self.assertIs(self.repository.get(self.roll_path), reloaded)
+        self.assertEqual(self.invalidated, [(reloaded.path, True)])
+
+    def test_worker_preference_change_copies_roll(self):
+        preferences.flip_profiles = False
+        roll = self.repository.acquire(self.roll_path)
+
+        preferences.flip_profiles = True
+        flipped = self.acquire_on_worker()
+
+        self.assertIsNot(flipped, roll)
+        np.testing.assert_array_equal(roll.profiles[0].data.hardnesses, [1.0, 2.0, 3.0])
+        np.testing.assert_array_equal(flipped.profiles[0].data.hardnesses, [3.0, 2.0, 1.0])
+        QApplication.processEvents()
+        self.assertIs(self.repository.get(self.roll_path), flipped)
+        self.assertEqual(self.invalidated, [(flipped.path, True)])
+
+    def test_other_rolls_are_not_held_up_while_a_worker_reads_a_roll(self):
+        other_path = os.path.join(self.roll_path, "other")
+        os.mkdir(other_path)
+        write_profile(os.path.join(other_path, "b.prof"), [3.0, 4.0, 5.0])
+        reading = threading.Event()
+        proceed = threading.Event()
+        waits = []
+
+        def read_slowly(path):
+            if path == self.roll_path:
+                reading.set()
+                # Times out if the GUI thread is blocked until the read is done
+                waits.append(proceed.wait(5))
+            return RollDirectory(path)
+
+        results = []
+        with patch("models.RollRepository.RollDirectory", side_effect=read_slowly):
+            workers = [
+                threading.Thread(target=lambda: results.append(self.repository.acquire(self.roll_path)))
+                for _ in range(2)
+            ]
+            for worker in workers:
+                worker.start()
+            self.assertTrue(reading.wait(5))
+
+            other = self.repository.acquire(other_path)
+            self.assertIs(self.repository.get(other_path), other)
+            self.repository.release(other_path)
+            self.assertEqual(self.repository.loaded_paths(), [])
+
+            proceed.set()
+            for worker in workers:
+                worker.join()
+
+        # The second worker waited for the first one's roll instead of reading it again
+        self.assertEqual(waits, [True])
+        self.assertIs(results[0], results[1])
+        self.assertEqual(self.repository.loaded_paths(), [self.roll_path])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from models.RollStatistics import (
+    GRANULARITY_DAY,
+    GRANULARITY_MONTH,
+    GRANULARITY_WEEK,
+    RollStatistics,
+    bin_keys,
+)
+
+
+def local_timestamp(*args):
+    return datetime(*args).timestamp()
+
+
+class TestRollStatistics(unittest.TestCase):
+    def setUp(self):
+        self.statistics = RollStatistics.from_rolls([
+            {"label": "roll-3", "path": "/rolls/roll-3", "timestamp": 30.0, "stats": {"mean": 3.0, "cv": None}},
+            {"label": "roll-1", "path": "/rolls/roll-1", "timestamp": 10.0, "stats": {"mean": 1.0, "cv": 0.1}},
+            {"label": "roll-2", "path": "/rolls/roll-2", "timestamp": 20.0, "stats": {"mean": 2.0, "cv": 0.2}},
+        ])
+
+    def test_rolls_are_stored_as_columns_sorted_by_time(self):
+        self.assertEqual(len(self.statistics), 3)
+        self.assertEqual(list(self.statistics.timestamps), [10.0, 20.0, 30.0])
+        self.assertEqual(list(self.statistics.labels), ["roll-1", "roll-2", "roll-3"])
+        np.testing.assert_array_equal(self.statistics.column("mean"), [1.0, 2.0, 3.0])
+        np.testing.assert_array_equal(self.statistics.column("cv"), [0.1, 0.2, np.nan])
+        self.assertTrue(np.isnan(self.statistics.column("unknown")).all())
+
+    def test_since_finds_time_window_by_binary_search(self):
+        self.assertEqual(self.statistics.since(20.0), slice(1, 3))
+        self.assertEqual(self.statistics.since(15.0), slice(1, 3))
+        self.assertEqual(self.statistics.since(31.0), slice(3, 3))
+        self.assertEqual(self.statistics.since(None), slice(0, 3))
+
+    def test_series_leaves_out_rolls_without_value(self):
+        series = self.statistics.series("cv", self.statistics.since(20.0))
+
+        self.assertEqual(list(series.labels), ["roll-2"])
+        self.assertEqual(list(series.paths), ["/rolls/roll-2"])
+        self.assertEqual(list(series.x), [20.0])
+        self.assertEqual(list(series.y), [0.2])
+
+        series = self.statistics.series("mean", np.array([0, 2]))
+        self.assertEqual(list(series.y), [1.0, 3.0])
+
+    def test_empty_statistics(self):
+        statistics = RollStatistics.from_rolls([])
+
+        self.assertEqual(len(statistics), 0)
+        self.assertEqual(len(statistics.series("mean", statistics.since(0.0))), 0)
+
+    def test_columns_must_match_rolls(self):
+        with self.assertRaises(ValueError):
+            RollStatistics(timestamps=[1.0, 2.0], labels=["a"], paths=["a", "b"])
+        with self.assertRaises(ValueError):
+            RollStatistics(timestamps=[2.0, 1.0], labels=["a", "b"], paths=["a", "b"])
+
+
+
+class TestRollStatisticsAggregation(unittest.TestCase):
+    def setUp(self):
+        rolls = [
+            # Monday and Tuesday of one week, then Monday of the next week and a month later
+            (local_timestamp(2025, 3, 3, 8), 1.0),
+            (local_timestamp(2025, 3, 3, 23, 30), 3.0),
+            (local_timestamp(2025, 3, 4, 0, 30), 8.0),
+            (local_timestamp(2025, 3, 4, 12), None),
+            (local_timestamp(2025, 3, 10, 9), 4.0),
+            (local_timestamp(2025, 4, 1, 9), 6.0),
+        ]
+        self.statistics = RollStatistics.from_rolls(
+            {"label": f"roll-{i}", "path": f"/rolls/roll-{i}", "timestamp": timestamp, "stats": {"mean": value}}
+            for i, (timestamp, value) in enumerate(rolls)
+        )
+
+    def test_bins_follow_local_calendar(self):
+        timestamps = self.statistics.timestamps
+
+        days = bin_keys(timestamps, GRANULARITY_DAY)
+        self.assertEqual(list(np.diff(days)), [0, 1, 0, 6, 22])
+        weeks = bin_keys(timestamps, GRANULARITY_WEEK)
+        self.assertEqual(list(np.diff(weeks)), [0, 0, 0, 1, 3])
+        months = bin_keys(timestamps, GRANULARITY_MONTH)
+        self.assertEqual(list(np.diff(months)), [0, 0, 0, 0, 1])
+
+    def test_daily_mean_and_envelope(self):
+        daily = self.statistics.aggregate("mean", GRANULARITY_DAY)
+
+        self.assertEqual(list(daily.labels), ["2025-03-03", "2025-03-04", "2025-03-10", "2025-04-01"])
+        self.assertEqual(list(daily.y), [2.0, 8.0, 4.0, 6.0])
+        self.assertEqual(list(daily.low), [1.0, 8.0, 4.0, 6.0])
+        self.assertEqual(list(daily.high), [3.0, 8.0, 4.0, 6.0])
+        # Rolls without a value are not counted
+        self.assertEqual(list(daily.counts), [2, 1, 1, 1])
+        self.assertEqual(list(daily.paths), ["/rolls/roll-1", "/rolls/roll-2", "/rolls/roll-4", "/rolls/roll-5"])
+
+    def test_weekly_percentiles_match_numpy(self):
+        weekly = self.statistics.aggregate("mean", GRANULARITY_WEEK, percentiles=(10, 50, 90))
+
+        self.assertEqual(list(weekly.labels), ["2025-03-03", "2025-03-10", "2025-03-31"])
+        for percentile in (10, 50, 90):
+            np.testing.assert_allclose(
+                weekly.percentiles[percentile],
+                [np.percentile([8.0, 1.0, 3.0], percentile), 4.0, 6.0],
+            )
+
+    def test_monthly_aggregate_of_rows(self):
+        monthly = self.statistics.aggregate("mean", GRANULARITY_MONTH, np.array([1, 4, 5]))
+
+        self.assertEqual(list(monthly.labels), ["2025-03", "2025-04"])
+        self.assertEqual(list(monthly.y), [3.5, 6.0])
+
+    def test_aggregate_of_all_rolls_is_cached(self):
+        first = self.statistics.aggregate("mean", GRANULARITY_MONTH)
+
+        self.assertIs(self.statistics.aggregate("mean", GRANULARITY_MONTH, self.statistics.since(None)), first)
+        self.assertIsNot(self.statistics.aggregate("mean", GRANULARITY_MONTH, slice(1, 6)), first)
+
+    def test_aggregate_without_values(self):
+        aggregated = self.statistics.aggregate("unknown", GRANULARITY_DAY, percentiles=(10,))
+
+        self.assertEqual(len(aggregated), 0)
+        self.assertEqual(len(aggregated.percentiles[10]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
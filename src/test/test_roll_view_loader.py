@@ -0,0 +1,195 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+import store
+from models.RollView import RollView
+from utils.cache_budget import CacheBudget
+from workers.roll_view_loader import RollViewCache, RollViewLoader
+from test.profile_files import write_profile
+
+
+class TestRollViewLoader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.rolls = []
+        for index in range(3):
+            roll_path = os.path.join(self.temp_dir.name, f"roll-{index}")
+            os.mkdir(roll_path)
+            write_profile(os.path.join(roll_path, "a.prof"), np.full(100, 10.0 * (index + 1)))
+            write_profile(os.path.join(roll_path, "b.prof"), np.full(100, 10.0 * (index + 2)))
+            self.rolls.append(roll_path)
+
+        self.loader = RollViewLoader()
+        self.views = []
+        self.loader.loaded.connect(self.views.append)
+
+    def tearDown(self):
+        self.loader.stop()
+        QApplication.processEvents()
+        for view in self.views:
+            store.roll_repository.release(view.path)
+        self.temp_dir.cleanup()
+
+    def wait_until_loaded(self):
+        deadline = time.monotonic() + 5
+        while (
+            self.loader.is_loading() or self.loader._prefetch_timer.isActive()
+        ) and time.monotonic() < deadline:
+            QApplication.processEvents()
+        QApplication.processEvents()
+        self.assertFalse(self.loader.is_loading())
+
+    def test_loaded_view_holds_roll_and_calculations(self):
+        self.loader.load(self.rolls[0])
+        self.wait_until_loaded()
+
+        self.assertEqual(len(self.views), 1)
+        view = self.views[0]
+        self.assertEqual(view.path, self.rolls[0])
+        self.assertIs(store.roll_repository.get(self.rolls[0]), view.roll)
+        self.assertAlmostEqual(float(np.mean(view.mean_profile)), 15.0, places=3)
+        self.assertAlmostEqual(view.stat_values["mean_g"], 15.0, places=3)
+        self.assertTrue(view.matches(store.sorted_profiles(view.roll.profiles)))
+        for profile in view.roll.profiles:
+            self.assertIsNotNone(view.series_for(profile))
+
+    def test_superseded_requests_are_not_delivered_or_held(self):
+        for roll_path in self.rolls:
+            self.loader.load(roll_path)
+        self.wait_until_loaded()
+
+        self.assertEqual([view.path for view in self.views], [self.rolls[2]])
+        # The first load may have completed into the cache, the second never started
+        self.assertNotIn(self.rolls[1], store.roll_repository.loaded_paths())
+        self.assertEqual(
+            set(store.roll_repository.loaded_paths()) - {self.rolls[0]}, {self.rolls[2]})
+
+    def test_cancel_drops_request(self):
+        self.loader.load(self.rolls[0])
+        self.loader.cancel()
+        self.wait_until_loaded()
+
+        self.assertEqual(self.views, [])
+        self.assertEqual(store.roll_repository.loaded_paths(), [])
+
+    @patch("settings.ROLL_PREFETCH_DELAY_MS", 0)
+    def test_prefetched_rolls_are_delivered_from_cache(self):
+        self.loader.load(self.rolls[0])
+        self.wait_until_loaded()
+        self.loader.prefetch(self.rolls[1:])
+        self.wait_until_loaded()
+        self.assertIn(self.rolls[1], self.loader.cache)
+        self.assertIn(self.rolls[2], self.loader.cache)
+
+        self.loader.load(self.rolls[2])
+
+        # Delivered before returning, nothing is loaded
+        self.assertFalse(self.loader.is_loading())
+        self.assertEqual([view.path for view in self.views], [self.rolls[0], self.rolls[2]])
+        self.assertIs(self.views[1], self.loader.cache.get(self.rolls[2]))
+
+    @patch("settings.ROLL_PREFETCH_DELAY_MS", 0)
+    def test_changed_roll_is_loaded_again(self):
+        self.loader.prefetch([self.rolls[1]])
+        self.wait_until_loaded()
+        write_profile(os.path.join(self.rolls[1], "c.prof"), np.full(100, 50.0))
+
+        self.loader.load(self.rolls[1])
+        self.assertTrue(self.loader.is_loading())
+        self.wait_until_loaded()
+
+        self.assertEqual(len(self.views), 1)
+        self.assertEqual(len(self.views[0].roll.profiles), 3)
+
+    @patch("settings.ROLL_PREFETCH_DELAY_MS", 10_000)
+    def test_selection_change_cancels_waiting_prefetch(self):
+        self.loader.prefetch(self.rolls[1:])
+        self.loader.load(self.rolls[0])
+        self.wait_until_loaded()
+
+        self.assertEqual(len(self.loader.cache), 1)
+        self.assertEqual(store.roll_repository.loaded_paths(), [self.rolls[0]])
+
+    def test_stop_releases_cached_rolls(self):
+        self.loader.load(self.rolls[0])
+        self.wait_until_loaded()
+        store.roll_repository.release(self.views.pop().path)
+
+        self.loader.stop()
+
+        self.assertEqual(store.roll_repository.loaded_paths(), [])
+
+
+class TestRollViewCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.rolls = []
+        for index in range(3):
+            roll_path = os.path.join(self.temp_dir.name, f"roll-{index}")
+            os.mkdir(roll_path)
+            write_profile(os.path.join(roll_path, "a.prof"), np.full(1000, 10.0))
+            self.rolls.append(roll_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def build_view(self, path):
+        roll = store.roll_repository.acquire(path)
+        return RollView.build(path, roll, roll.profiles)
+
+    def test_least_recently_used_view_is_evicted_and_released(self):
+        cache = RollViewCache(max_count=2)
+        cache.put(self.build_view(self.rolls[0]))
+        cache.put(self.build_view(self.rolls[1]))
+        cache.get(self.rolls[0])
+
+        cache.put(self.build_view(self.rolls[2]))
+
+        self.assertNotIn(self.rolls[1], cache)
+        self.assertIsNone(store.roll_repository.get(self.rolls[1]))
+        cache.clear()
+        self.assertEqual(store.roll_repository.loaded_paths(), [])
+        self.assertEqual(cache.total_bytes, 0)
+
+    def test_shared_budget_evicts_views_and_counts_hits(self):
+        view = self.build_view(self.rolls[0])
+        budget = CacheBudget(max_bytes=view.nbytes + 1)
+        cache = RollViewCache(budget=budget)
+        cache.put(view)
+        self.assertIs(cache.get(self.rolls[0]), view)
+        self.assertIsNone(cache.get(self.rolls[1]))
+
+        cache.put(self.build_view(self.rolls[1]))
+
+        self.assertNotIn(self.rolls[0], cache)
+        self.assertIsNone(store.roll_repository.get(self.rolls[0]))
+        stats = budget.stats()["Roll views"]
+        self.assertEqual((stats.entries, stats.hits, stats.misses, stats.evictions), (1, 1, 1, 1))
+        cache.clear()
+        self.assertEqual(budget.total_bytes, 0)
+
+    def test_byte_limit_keeps_newest_view(self):
+        view = self.build_view(self.rolls[0])
+        cache = RollViewCache(max_bytes=view.nbytes + 1)
+        cache.put(view)
+        cache.put(self.build_view(self.rolls[1]))
+
+        self.assertEqual(len(cache), 1)
+        self.assertIn(self.rolls[1], cache)
+        cache.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+
+import settings
+from utils import preferences
+from utils.highlighted_regions import DISTANCE_HIGHLIGHT_MODE_RELATIVE, DistanceHighlightRegion
+from utils.sectional_stats import SectionalStats, calc_sectional_stats
+
+
+class TestSectionalStats(unittest.TestCase):
+    def setUp(self):
+        self.original_excluded_regions_mode = preferences.excluded_regions_mode
+        self.original_excluded_regions = preferences.excluded_regions
+        self.original_distance_highlight_regions = preferences.distance_highlight_regions
+        preferences.excluded_regions_mode = settings.EXCLUDED_REGIONS_MODE_NONE
+        preferences.excluded_regions = ""
+        preferences.distance_highlight_regions = []
+
+        rng = np.random.default_rng(0)
+        self.distances = np.arange(1000) * 0.001
+        self.values = 300 + 20 * np.sin(self.distances * 20) + rng.normal(size=len(self.distances))
+
+    def tearDown(self):
+        preferences.excluded_regions_mode = self.original_excluded_regions_mode
+        preferences.excluded_regions = self.original_excluded_regions
+        preferences.distance_highlight_regions = self.original_distance_highlight_regions
+
+    def test_window_matches_direct_calculation(self):
+        engine = SectionalStats(self.distances, self.values)
+
+        for start, end in [(0, 1000), (3, 4), (10, 70), (63, 129), (130, 999)]:
+            window_values = self.values[start:end]
+            section = engine.window(start, end)
+
+            self.assertEqual(section.count, end - start)
+            self.assertAlmostEqual(section.mean, np.mean(window_values), places=9)
+            self.assertAlmostEqual(section.std, np.std(window_values), places=9)
+            self.assertAlmostEqual(section.cv, np.std(window_values) / np.mean(window_values) * 100, places=9)
+            self.assertEqual(section.min, np.min(window_values))
+            self.assertEqual(section.max, np.max(window_values))
+            self.assertAlmostEqual(section.start, self.distances[start])
+            self.assertAlmostEqual(section.end, self.distances[end - 1])
+            if end - start > 1:
+                window_positions = np.linspace(0.0, 1.0, end - start)
+                expected_slope, _ = np.polyfit(window_positions, window_values, 1)
+                self.assertAlmostEqual(section.slope, expected_slope, places=6)
+
+    def test_window_skips_excluded_samples(self):
+        mask = np.ones(len(self.values), dtype=bool)
+        mask[100:200] = False
+        engine = SectionalStats(self.distances, self.values, mask)
+
+        section = engine.window(50, 250)
+        included_values = np.concatenate((self.values[50:100], self.values[200:250]))
+
+        self.assertEqual(section.count, 100)
+        self.assertAlmostEqual(section.mean, np.mean(included_values), places=9)
+        self.assertEqual(section.max, np.max(included_values))
+        self.assertIsNone(engine.window(120, 180))
+
+    def test_fixed_length_sections_cover_profile(self):
+        sections = calc_sectional_stats((self.distances, self.values), section_length=0.1)
+
+        self.assertEqual(len(sections), 10)
+        self.assertEqual(sum(section.count for section in sections), len(self.values))
+        self.assertAlmostEqual(sections[1].mean, np.mean(self.values[100:200]), places=9)
+
+    def test_sections_follow_distance_highlight_regions(self):
+        preferences.distance_highlight_regions = [
+            DistanceHighlightRegion(start=0.0, end=50.0, mode=DISTANCE_HIGHLIGHT_MODE_RELATIVE, color="tab:blue"),
+        ]
+
+        sections = calc_sectional_stats((self.distances, self.values))
+
+        self.assertEqual(len(sections), 1)
+        self.assertAlmostEqual(sections[0].start, 0.0)
+        self.assertAlmostEqual(sections[0].end, self.distances[499])
+        self.assertAlmostEqual(sections[0].mean, np.mean(self.values[:500]), places=9)
+
+    def test_empty_profile_has_no_sections(self):
+        self.assertEqual(calc_sectional_stats(([], [])), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from models.RollStatistics import RollStatistics
+from utils.spc import (
+    RULE_8_ON_ONE_SIDE,
+    RULE_BEYOND_3_SIGMA,
+    RULE_CUSUM,
+    ControlChart,
+    ProcessControl,
+)
+
+BASELINE = [10.0, 11.0, 9.0, 10.0, 11.0, 9.0, 10.0, 10.0]
+
+
+def roll_statistics(values):
+    return RollStatistics.from_rolls(
+        {"label": f"roll-{i}", "path": f"/rolls/roll-{i}", "timestamp": float(i), "stats": {"mean": value}}
+        for i, value in enumerate(values)
+    )
+
+
+def chart_of(values, **options):
+    chart = ControlChart(baseline_rolls=len(BASELINE), window=4, **options)
+    for value in values:
+        chart.add(value)
+    return chart
+
+
+class TestControlChart(unittest.TestCase):
+    def test_baseline_sets_centre_and_sigma(self):
+        data = chart_of(BASELINE).data()
+
+        self.assertAlmostEqual(data.centre, np.mean(BASELINE))
+        self.assertAlmostEqual(data.sigma, np.std(BASELINE, ddof=1))
+        # Rules are not checked within the baseline
+        self.assertFalse(data.violations.any())
+        self.assertTrue(np.isnan(data.ewma).all())
+
+    def test_rolling_mean_and_sigma_of_latest_rolls(self):
+        data = chart_of(BASELINE + [14.0]).data()
+
+        np.testing.assert_allclose(data.rolling_mean[-1], np.mean([9.0, 10.0, 10.0, 14.0]))
+        np.testing.assert_allclose(data.rolling_sigma[-1], np.std([9.0, 10.0, 10.0, 14.0], ddof=1))
+
+    def test_point_beyond_three_sigma(self):
+        sigma = np.std(BASELINE, ddof=1)
+        data = chart_of(BASELINE + [10.0 + 3.5 * sigma, 10.0]).data()
+
+        self.assertTrue(data.violations[-2] & RULE_BEYOND_3_SIGMA)
+        self.assertFalse(data.violations[-1] & RULE_BEYOND_3_SIGMA)
+
+    def test_eight_in_a_row_on_one_side(self):
+        data = chart_of(BASELINE + [10.2] * 8).data()
+
+        self.assertFalse(data.violations[-2] & RULE_8_ON_ONE_SIDE)
+        self.assertTrue(data.violations[-1] & RULE_8_ON_ONE_SIDE)
+
+    def test_cusum_detects_small_sustained_shift(self):
+        sigma = np.std(BASELINE, ddof=1)
+        data = chart_of(BASELINE + [10.0 + sigma] * 15).data()
+
+        flagged = np.flatnonzero(data.violations & RULE_CUSUM)
+        self.assertGreater(len(flagged), 0)
+        self.assertFalse((data.violations & RULE_BEYOND_3_SIGMA).any())
+        self.assertGreater(data.cusum_high[flagged[0]], 5 * sigma)
+
+    def test_rolls_without_value_are_skipped(self):
+        data = chart_of(BASELINE + [np.nan, 10.0]).data()
+
+        self.assertTrue(np.isnan(data.ewma[-2]))
+        self.assertFalse(np.isnan(data.ewma[-1]))
+        self.assertEqual(len(data.ewma), len(BASELINE) + 2)
+
+
+class TestProcessControl(unittest.TestCase):
+    def setUp(self):
+        self.values = BASELINE + [10.5, 9.5, 12.0, 8.0, 10.0]
+        self.control = ProcessControl(baseline_rolls=len(BASELINE), window=4)
+
+    def test_incremental_sync_matches_full_calculation(self):
+        for count in (3, 9, 10, len(self.values)):
+            self.control.sync(roll_statistics(self.values[:count]))
+            self.control.chart("mean")
+
+        incremental = self.control.chart("mean").data()
+        full = chart_of(self.values).data()
+        for field in ("rolling_mean", "rolling_sigma", "ewma", "ewma_limit", "cusum_high", "cusum_low", "violations"):
+            np.testing.assert_array_equal(getattr(incremental, field), getattr(full, field), err_msg=field)
+
+    def test_sync_only_processes_new_rolls(self):
+        self.control.sync(roll_statistics(self.values[:10]))
+        self.control.chart("mean")
+
+        with patch.object(ControlChart, "_step", autospec=True, side_effect=ControlChart._step) as step:
+            self.control.sync(roll_statistics(self.values))
+            self.control.chart("mean")
+
+        # The provisional newest roll is committed, three rolls are added and one is provisional
+        self.assertEqual(step.call_count, len(self.values) - 10 + 1)
+
+    def test_newest_roll_is_provisional(self):
+        values = list(self.values)
+        self.control.sync(roll_statistics(values))
+        self.control.chart("mean")
+
+        values[-1] = 20.0
+        with patch.object(ControlChart, "_step", autospec=True, side_effect=ControlChart._step) as step:
+            self.control.sync(roll_statistics(values))
+            data = self.control.chart("mean").data()
+
+        self.assertEqual(step.call_count, 1)
+        self.assertTrue(data.violations[-1] & RULE_BEYOND_3_SIGMA)
+        self.assertEqual(len(data.violations), len(values))
+
+    def test_changed_history_is_recalculated(self):
+        self.control.sync(roll_statistics(self.values))
+        self.control.chart("mean")
+
+        values = list(self.values)
+        values[len(BASELINE) + 1] = 30.0
+        self.control.sync(roll_statistics(values))
+
+        np.testing.assert_array_equal(self.control.chart("mean").data().violations, chart_of(values).data().violations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+import settings
+from utils import profile_stats
+from utils.spectral_stats import (
+    DOMINANT_WAVELENGTH_KEY,
+    calc_spectral_stat,
+    calc_spectral_stats,
+    spectral_band_stat_key,
+)
+from utils.spectrum import clear_spectrum_cache
+
+
+class TestSpectralStats(unittest.TestCase):
+    def setUp(self):
+        clear_spectrum_cache()
+        self.short_band_key = spectral_band_stat_key(settings.SPECTRAL_BANDS_M[0])
+        self.long_band_key = spectral_band_stat_key(settings.SPECTRAL_BANDS_M[1])
+        self.distances = np.arange(9000) * settings.SAMPLE_INTERVAL_M
+
+    def tearDown(self):
+        clear_spectrum_cache()
+
+    def sine_profile(self, amplitude, wavelength):
+        return 300 + amplitude * np.sin(2 * np.pi * self.distances / wavelength)
+
+    def test_band_rms_and_dominant_wavelength_of_sine(self):
+        stats = calc_spectral_stats([self.sine_profile(4.0, 0.05)])[0]
+
+        self.assertAlmostEqual(stats[self.short_band_key], 4.0 / np.sqrt(2), delta=0.05)
+        self.assertLess(stats[self.long_band_key], 0.1)
+        self.assertAlmostEqual(stats[DOMINANT_WAVELENGTH_KEY], 0.05, places=3)
+
+    def test_band_rms_of_white_noise_matches_filtered_variance(self):
+        rng = np.random.default_rng(0)
+        noise = rng.normal(scale=2.0, size=len(self.distances))
+
+        rms = calc_spectral_stat(noise, self.short_band_key)
+
+        shortest, longest = settings.SPECTRAL_BANDS_M[0]
+        nyquist = 0.5 / settings.SAMPLE_INTERVAL_M
+        band_fraction = (1 / shortest - 1 / longest) / nyquist
+        self.assertAlmostEqual(rms, 2.0 * np.sqrt(band_fraction), delta=0.1)
+
+    def test_batch_matches_single_profile_stats(self):
+        profiles = [self.sine_profile(2.0, 0.5), self.sine_profile(1.0, 0.04), self.sine_profile(3.0, 0.25)[:5000], []]
+
+        batch = calc_spectral_stats(profiles)
+        clear_spectrum_cache()
+
+        for values, stats in zip(profiles[:3], batch):
+            single = calc_spectral_stats([values])[0]
+            self.assertEqual(stats.keys(), single.keys())
+            for key, value in single.items():
+                self.assertAlmostEqual(stats[key], value, places=9)
+        self.assertTrue(all(np.isnan(value) for value in batch[3].values()))
+
+    def test_spectral_stats_are_listed_with_alert_limits(self):
+        alert_names = {limit["name"] for limit in settings.ALERT_LIMITS_DEFAULT}
+
+        for key in (self.short_band_key, self.long_band_key, DOMINANT_WAVELENGTH_KEY):
+            self.assertIn(key, profile_stats.analysis_display_labels)
+            self.assertIn(profile_stats.analysis_to_alert_name[key], alert_names)
+
+
+if __name__ == "__main__":
+    unittest.main()
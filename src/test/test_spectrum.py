@@ -0,0 +1,109 @@
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from scipy.signal import welch
+
+import settings
+from utils import spectrum
+from utils.spectrum import WelchParams, calc_spectra, calc_spectrum, clear_spectrum_cache
+
+
+class TestSpectrum(unittest.TestCase):
+    def setUp(self):
+        clear_spectrum_cache()
+        rng = np.random.default_rng(0)
+        distances = np.arange(7000) * settings.SAMPLE_INTERVAL_M
+        self.values = 300 + 5 * np.sin(2 * np.pi * 12 * distances) + rng.normal(size=len(distances))
+
+    def tearDown(self):
+        clear_spectrum_cache()
+
+    def assert_matches_welch(self, values, frequencies, power, nperseg=settings.NPERSEG, noverlap=settings.NOVERLAP):
+        expected_frequencies, expected_power = welch(
+            values,
+            fs=1 / settings.SAMPLE_INTERVAL_M,
+            window='hann',
+            nperseg=nperseg,
+            noverlap=noverlap,
+            scaling='spectrum',
+        )
+        np.testing.assert_allclose(frequencies, expected_frequencies)
+        np.testing.assert_allclose(power, expected_power, rtol=1e-9, atol=1e-12)
+
+    def test_spectrum_matches_scipy_welch(self):
+        self.assert_matches_welch(self.values, *calc_spectrum(self.values))
+
+        overlapping = WelchParams(fs=1 / settings.SAMPLE_INTERVAL_M, nperseg=1001, noverlap=500)
+        self.assert_matches_welch(self.values, *calc_spectrum(self.values, overlapping), nperseg=1001, noverlap=500)
+
+    def test_short_profile_uses_whole_profile_as_segment(self):
+        short_values = self.values[:1200]
+
+        with self.assertWarns(UserWarning):
+            self.assert_matches_welch(short_values, *calc_spectrum(short_values))
+
+    def test_spectrum_is_cached_by_content(self):
+        first = calc_spectrum(self.values)
+
+        with patch.object(spectrum, '_welch_rows', wraps=spectrum._welch_rows) as welch_rows:
+            self.assertIs(calc_spectrum(self.values.copy()), first)
+            changed = self.values.copy()
+            changed[0] += 1
+            calc_spectrum(changed)
+
+        self.assertEqual(welch_rows.call_count, 1)
+
+    def test_batch_spectra_match_single_spectra(self):
+        values_list = [self.values, self.values[::-1], self.values[:4000], []]
+
+        with patch.object(spectrum, '_welch_rows', wraps=spectrum._welch_rows) as welch_rows:
+            spectra = calc_spectra(values_list)
+
+        # Equal length profiles share one batched computation
+        self.assertEqual(welch_rows.call_count, 2)
+        for values, (frequencies, power) in zip(values_list[:3], spectra):
+            self.assert_matches_welch(values, frequencies, power)
+        self.assertEqual(len(spectra[3][0]), 0)
+
+
+    def test_cache_is_shared_between_threads(self):
+        params = WelchParams(fs=1 / settings.SAMPLE_INTERVAL_M, nperseg=16, noverlap=8)
+        profiles = [self.values[offset:offset + 64] for offset in range(12)]
+        expected = [spectrum._welch_rows([values], params)[1][0] for values in profiles]
+        errors = []
+
+        def run(thread_index):
+            try:
+                for round_index in range(300):
+                    index = (thread_index + round_index) % len(profiles)
+                    if round_index % 2:
+                        results = calc_spectra([profiles[index], profiles[index - 1]], params)
+                        pairs = zip((index, index - 1), results)
+                    else:
+                        pairs = [(index, calc_spectrum(profiles[index], params))]
+                    for row, (_, power) in pairs:
+                        np.testing.assert_allclose(power, expected[row])
+            except Exception as e:
+                errors.append(e)
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with patch.object(settings, 'SPECTRUM_CACHE_SIZE', 3):
+                threads = [threading.Thread(target=run, args=(index,)) for index in range(6)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(spectrum._cache), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
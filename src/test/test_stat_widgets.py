@@ -220,5 +220,24 @@ class TestStatWidgets(unittest.TestCase):
 
         self.assertAlmostEqual(short_widget.value, long_widget.value)
 
+    def test_section_stats_text_has_row_per_section(self):
+        original_distance_unit = preferences.distance_unit
+        original_distance_highlight_regions = preferences.distance_highlight_regions
+        preferences.distance_unit = "m"
+        preferences.distance_highlight_regions = []
+        try:
+            distances = np.arange(300) * 0.001
+            values = np.concatenate((np.full(100, 10.0), np.full(100, 20.0), np.full(100, 30.0)))
+            widget = StatsWidget((distances, values))
+
+            lines = widget.get_section_stats_text().splitlines()
+
+            self.assertEqual(len(lines), 4)
+            self.assertEqual(lines[2].split("\t")[:3], ["0.1", "0.2", "20.0"])
+            self.assertEqual(StatsWidget(self.data).get_section_stats_text(), "")
+        finally:
+            preferences.distance_unit = original_distance_unit
+            preferences.distance_highlight_regions = original_distance_highlight_regions
+
 if __name__ == "__main__":
     unittest.main()
@@ -10,10 +10,20 @@ os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 from matplotlib.colors import to_rgba
 from PySide6.QtWidgets import QApplication
 
+import settings
+from utils import spc
 from gui.widgets.StatisticsAnalysis import StatisticsAnalysisChart, StatisticsAnalysisWidget
+from models.RollStatistics import RollStatistics, StatSeries
 from utils.translation import _
 
 
+def series(points):
+    return RollStatistics.from_rolls(
+        {"timestamp": x, "label": label, "path": path, "stats": {"mean": y}}
+        for x, y, label, path in points
+    ).series("mean")
+
+
 class TestStatisticsAnalysisChart(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -22,12 +32,12 @@ class TestStatisticsAnalysisChart(unittest.TestCase):
     def test_plot_without_data_shows_message_outside_plot(self):
         chart = StatisticsAnalysisChart()
         try:
-            chart.plot([])
+            chart.plot(StatSeries.empty())
 
             self.assertTrue(chart.canvas.isHidden())
             self.assertFalse(chart.empty_state_label.isHidden())
             self.assertEqual(chart.empty_state_label.text(), _("NO_DATA_AVAILABLE"))
-            self.assertEqual(len(chart.bars), 0)
+            self.assertIsNone(chart.bars)
             axis_texts = [text.get_text() for text in chart.ax.texts]
             self.assertNotIn(_("NO_DATA_AVAILABLE"), axis_texts)
         finally:
@@ -36,15 +46,13 @@ class TestStatisticsAnalysisChart(unittest.TestCase):
     def test_plot_with_data_restores_canvas_after_empty_state(self):
         chart = StatisticsAnalysisChart()
         try:
-            chart.plot([])
-            chart.plot([
-                {"x": 1, "y": 10.0, "label": "roll-1", "path": "/tmp/roll-1"},
-            ])
+            chart.plot(StatSeries.empty())
+            chart.plot(series([(1, 10.0, "roll-1", "/tmp/roll-1")]))
 
             self.assertFalse(chart.canvas.isHidden())
             self.assertTrue(chart.empty_state_label.isHidden())
             self.assertEqual(chart.empty_state_label.text(), "")
-            self.assertEqual(len(chart.bars), 1)
+            self.assertEqual(len(chart.bars.get_paths()), 1)
         finally:
             chart.close()
 
@@ -53,16 +61,56 @@ class TestStatisticsAnalysisChart(unittest.TestCase):
         try:
             emitted_paths = []
             chart.point_selected.connect(emitted_paths.append)
-            chart.plot([
-                {"x": 1, "y": 10.0, "label": "roll-1", "path": "/tmp/roll-1"},
-                {"x": 2, "y": 20.0, "label": "roll-2", "path": "/tmp/roll-2"},
-            ])
+            chart.plot(series([
+                (1, 10.0, "roll-1", "/tmp/roll-1"),
+                (2, 20.0, "roll-2", "/tmp/roll-2"),
+            ]))
 
-            chart.on_pick(SimpleNamespace(artist=chart.bars[1]))
+            chart.on_click(SimpleNamespace(inaxes=chart.ax, xdata=1.2, ydata=15.0))
 
             self.assertEqual(emitted_paths, ["/tmp/roll-2"])
             self.assertEqual(chart.highlighted_point, "roll-2")
-            self.assertEqual(chart.bars[1].get_facecolor(), to_rgba("tab:orange"))
+            self.assertEqual(tuple(chart.bars.get_facecolor()[1]), to_rgba("tab:orange"))
+            self.assertEqual(tuple(chart.bars.get_facecolor()[0]), to_rgba("tab:blue"))
+        finally:
+            chart.close()
+
+    def test_bars_are_hit_by_position(self):
+        chart = StatisticsAnalysisChart()
+        try:
+            chart.plot(series([
+                (1, 10.0, "roll-1", "/tmp/roll-1"),
+                (2, -5.0, "roll-2", "/tmp/roll-2"),
+            ]))
+
+            self.assertEqual(chart.bar_index_at(0.3, 9.0), 0)
+            self.assertEqual(chart.bar_index_at(0.9, -1.0), 1)
+            self.assertIsNone(chart.bar_index_at(0.5, 5.0))
+            self.assertIsNone(chart.bar_index_at(0.0, 11.0))
+            self.assertIsNone(chart.bar_index_at(2.0, 1.0))
+        finally:
+            chart.close()
+
+    def test_highlight_recolors_bars_without_redrawing_axes(self):
+        chart = StatisticsAnalysisChart()
+        try:
+            chart.plot(series([
+                (1, 10.0, "roll-1", "/tmp/roll-1"),
+                (2, 20.0, "roll-2", "/tmp/roll-2"),
+            ]))
+            bars = chart.bars
+
+            chart.highlight_point("roll-1")
+            chart.highlight_point("roll-2")
+
+            self.assertIs(chart.bars, bars)
+            self.assertEqual(chart.highlighted_index, 1)
+            self.assertEqual(tuple(bars.get_facecolor()[0]), to_rgba("tab:blue"))
+            self.assertEqual(tuple(bars.get_facecolor()[1]), to_rgba("tab:orange"))
+
+            # A highlight set before plotting is kept when the data changes
+            chart.plot(series([(2, 20.0, "roll-2", "/tmp/roll-2")]))
+            self.assertEqual(tuple(chart.bars.get_facecolor()[0]), to_rgba("tab:orange"))
         finally:
             chart.close()
 
@@ -80,13 +128,93 @@ class TestStatisticsAnalysisWidget(unittest.TestCase):
             widget.set_roll_filter("roll-[13]", re.compile(r"roll-[13]", re.IGNORECASE))
             widget.filter_dropdown.setCurrentText(_("FILTER_LAST_7_DAYS"))
 
-            filtered = widget.apply_filters([
+            statistics = RollStatistics.from_rolls([
                 {"label": "roll-1", "timestamp": now, "stats": {}},
                 {"label": "roll-2", "timestamp": now, "stats": {}},
                 {"label": "roll-3", "timestamp": old, "stats": {}},
             ])
 
-            self.assertEqual([roll["label"] for roll in filtered], ["roll-1"])
+            rows = widget.apply_filters(statistics)
+
+            self.assertEqual(list(statistics.labels[rows]), ["roll-1"])
+        finally:
+            widget.close()
+
+    def test_chart_shows_selected_statistic_of_filtered_rolls(self):
+        widget = StatisticsAnalysisWidget()
+        try:
+            now = datetime.now().timestamp()
+            old = (datetime.now() - timedelta(days=10)).timestamp()
+            widget.filter_dropdown.setCurrentText(_("FILTER_LAST_7_DAYS"))
+            widget.roll_statistics = RollStatistics.from_rolls([
+                {"label": "roll-1", "path": "/tmp/roll-1", "timestamp": now, "stats": {"mean": 1.0, "std": None}},
+                {"label": "roll-2", "path": "/tmp/roll-2", "timestamp": old, "stats": {"mean": 2.0, "std": 0.2}},
+                {"label": "roll-3", "path": "/tmp/roll-3", "timestamp": now + 1, "stats": {"mean": 3.0, "std": 0.3}},
+            ])
+            widget.cache_valid = True
+
+            widget.selected_stat = "std"
+            widget.update_chart()
+            self.assertEqual(list(widget.chart.stat_data.paths), ["/tmp/roll-3"])
+
+            widget.filter_dropdown.setCurrentText(_("FILTER_SHOW_ALL_ROLLS"))
+            self.assertEqual(list(widget.chart.stat_data.labels), ["roll-2", "roll-3"])
+            self.assertEqual(list(widget.chart.stat_data.y), [0.2, 0.3])
+        finally:
+            widget.close()
+
+    def test_aggregation_shows_bins_with_spread(self):
+        widget = StatisticsAnalysisWidget()
+        try:
+            now = datetime.now()
+            widget.filter_dropdown.setCurrentText(_("FILTER_SHOW_ALL_ROLLS"))
+            widget.roll_statistics = RollStatistics.from_rolls(
+                {"label": f"roll-{i}", "path": f"/tmp/roll-{i}", "timestamp": timestamp, "stats": {"mean": value}}
+                for i, (timestamp, value) in enumerate([
+                    ((now - timedelta(days=1)).timestamp(), 1.0),
+                    ((now - timedelta(days=1)).timestamp() + 1, 3.0),
+                    (now.timestamp(), 5.0),
+                ])
+            )
+            widget.cache_valid = True
+
+            widget.aggregation_dropdown.setCurrentText(_("AGGREGATION_DAILY"))
+
+            self.assertEqual(list(widget.chart.stat_data.y), [2.0, 5.0])
+            self.assertEqual(list(widget.chart.stat_data.counts), [2, 1])
+            self.assertEqual(widget.chart.ax.get_xlabel(), _("PLOT_TITLE_DAY"))
+            self.assertEqual(len(widget.chart.ax.collections), 2)
+            self.assertEqual(len(widget.chart.ax.lines), len(settings.STATISTICS_AGGREGATION_PERCENTILES))
+
+            widget.aggregation_dropdown.setCurrentText(_("AGGREGATION_EACH_ROLL"))
+            self.assertEqual(list(widget.chart.stat_data.labels), ["roll-0", "roll-1", "roll-2"])
+        finally:
+            widget.close()
+
+    def test_process_control_overlay_follows_shown_rolls(self):
+        widget = StatisticsAnalysisWidget()
+        try:
+            now = datetime.now().timestamp()
+            values = [10.0, 11.0, 9.0] * 7 + [30.0]
+            widget.filter_dropdown.setCurrentText(_("FILTER_SHOW_ALL_ROLLS"))
+            widget.set_roll_filter("roll-2", re.compile(r"roll-2", re.IGNORECASE))
+            widget.roll_statistics = RollStatistics.from_rolls(
+                {"label": f"roll-{i}", "path": f"/tmp/roll-{i}", "timestamp": now - len(values) + i,
+                 "stats": {"mean": value}}
+                for i, value in enumerate(values)
+            )
+            widget.cache_valid = True
+
+            widget.spc_checkbox.setChecked(True)
+
+            # roll-2 and roll-20 to roll-21
+            self.assertEqual(list(widget.chart.stat_data.labels), ["roll-2", "roll-20", "roll-21"])
+            self.assertEqual(len(widget.chart.control.violations), 3)
+            self.assertTrue(widget.chart.control.violations[-1] & spc.RULE_BEYOND_3_SIGMA)
+            self.assertIn(_("SPC_EWMA"), [line.get_label() for line in widget.chart.ax.lines])
+
+            widget.spc_checkbox.setChecked(False)
+            self.assertIsNone(widget.chart.control)
         finally:
             widget.close()
 
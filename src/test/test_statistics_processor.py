@@ -0,0 +1,89 @@
+import os
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+import store
+from workers.roll_view_loader import RollViewLoader
+from workers.statistics_processor import StatisticsProcessor
+from test.profile_files import write_profile
+
+
+class TestStatisticsProcessor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        # Idle redraws queued by charts of earlier tests fail once their canvas is deleted
+        try:
+            QApplication.processEvents()
+        except RuntimeError:
+            pass
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.rolls = []
+        for index in range(4):
+            roll_path = os.path.join(self.temp_dir.name, f"roll-{index}")
+            os.mkdir(roll_path)
+            write_profile(os.path.join(roll_path, "a.prof"), np.full(2000, 10.0 * (index + 1)))
+            write_profile(os.path.join(roll_path, "b.prof"), np.full(2000, 10.0 * (index + 2)))
+            self.rolls.append(roll_path)
+
+        self.processor = StatisticsProcessor()
+        self.loader = RollViewLoader()
+        self.results = []
+        self.views = []
+        self.errors = []
+        self.processor.finished.connect(self.results.append)
+        self.processor.error.connect(self.errors.append)
+        self.loader.loaded.connect(self.views.append)
+        self.loader.error.connect(self.errors.append)
+
+    def tearDown(self):
+        self.processor.stop()
+        self.loader.stop()
+        QApplication.processEvents()
+        for view in self.views:
+            store.roll_repository.release(view.path)
+        self.temp_dir.cleanup()
+
+    def wait_until(self, condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            QApplication.processEvents()
+            time.sleep(0.001)
+        QApplication.processEvents()
+        return condition()
+
+    def test_statistics_run_while_roll_view_loads(self):
+        shown = store.roll_repository.acquire(self.rolls[0])
+        try:
+            # The shown roll changes on disk, both workers find it out of date
+            write_profile(os.path.join(self.rolls[0], "c.prof"), np.full(2000, 40.0))
+
+            self.processor.start(self.temp_dir.name)
+            self.loader.load(self.rolls[0])
+
+            self.assertTrue(self.wait_until(lambda: self.results and self.views and not self.loader.is_loading()))
+            self.assertEqual(self.errors, [])
+
+            roll_statistics = self.results[0]
+            self.assertEqual(sorted(roll_statistics.paths), self.rolls)
+            row = list(roll_statistics.paths).index(self.rolls[0])
+            self.assertAlmostEqual(roll_statistics.column('mean')[row], 70 / 3, places=4)
+
+            # The workers never changed the roll the GUI holds, the reloaded one replaced it
+            self.assertEqual([profile.name for profile in shown.profiles], ["a.prof", "b.prof"])
+            self.assertEqual(len(self.views[0].roll.profiles), 3)
+            self.assertIs(store.roll_repository.get(self.rolls[0]), self.views[0].roll)
+        finally:
+            store.roll_repository.release(self.rolls[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from PySide6.QtCore import Qt
+
+import store
+from models.Profile import Profile, ProfileHeader
+
+
+def make_profile(path, date_modified=0.0):
+    return Profile(
+        path=path,
+        data=None,
+        header=ProfileHeader(prof_version=1, serial_number="test", sample_step=1.0),
+        file_size=128,
+        date_modified=date_modified,
+    )
+
+
+class TestStoreProfileIndex(unittest.TestCase):
+    def setUp(self):
+        self.original_profiles = store.profiles
+        self.original_sort = (store.current_sort_column, store.current_sort_order)
+
+    def tearDown(self):
+        store.set_profiles(self.original_profiles)
+        store.current_sort_column, store.current_sort_order = self.original_sort
+
+    def test_lookup_by_path_and_name(self):
+        first = make_profile("/roll/a.prof")
+        second = make_profile("/roll/b.prof")
+        store.set_profiles([first, second])
+
+        self.assertIs(store.get_profile_by_filename("/roll/b.prof"), second)
+        self.assertIs(store.get_profile_by_filename("a.prof"), first)
+        self.assertIsNone(store.get_profile_by_filename("/roll/c.prof"))
+
+    def test_index_follows_sort_and_list_changes(self):
+        older = make_profile("/roll/a.prof", date_modified=1.0)
+        newer = make_profile("/roll/b.prof", date_modified=2.0)
+        store.set_profiles([older, newer])
+
+        store.sort_profiles(3, Qt.SortOrder.DescendingOrder)
+        self.assertIs(store.get_profile_by_filename("/roll/a.prof"), older)
+
+        added = make_profile("/roll/c.prof")
+        store.profiles.append(added)
+        self.assertIs(store.get_profile_by_filename("c.prof"), added)
+
+        replaced = make_profile("/other/a.prof")
+        store.profiles = [replaced]
+        self.assertIs(store.get_profile_by_filename("a.prof"), replaced)
+        self.assertIsNone(store.get_profile_by_filename("/roll/a.prof"))
+
+
+    def test_sort_keeps_order_of_equal_profiles(self):
+        first = make_profile("/roll/b.prof", date_modified=1.0)
+        second = make_profile("/roll/A.prof", date_modified=1.0)
+        newest = make_profile("/roll/c.prof", date_modified=2.0)
+        store.set_profiles([first, second, newest])
+
+        store.sort_profiles(3, Qt.SortOrder.DescendingOrder)
+        self.assertEqual(store.profiles, [newest, first, second])
+
+        store.sort_profiles(0, Qt.SortOrder.AscendingOrder)
+        self.assertEqual(store.profiles, [second, first, newest])
+
+    def test_profiles_have_no_instance_dict(self):
+        profile = make_profile("/roll/a.prof")
+
+        with self.assertRaises(AttributeError):
+            profile.distances = None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+from models.Profile import Profile, ProfileData, ProfileHeader
+from utils.profile_stats import calc_mean_profile
+from utils.range_utils import NumericRange, absolute_ranges_to_indices
+from utils.uniform_axis import UniformAxis, concatenate_axes, mean_axis
+
+
+class TestUniformAxis(unittest.TestCase):
+    def setUp(self):
+        self.axis = UniformAxis.from_step(0.001, 1000)
+        self.materialized = np.arange(1000) * 0.001
+
+    def test_behaves_like_materialized_array(self):
+        np.testing.assert_array_equal(np.asarray(self.axis), self.materialized)
+        self.assertEqual(len(self.axis), 1000)
+        self.assertEqual(self.axis[-1], self.materialized[-1])
+        np.testing.assert_allclose(np.asarray(self.axis[10:500:3]), self.materialized[10:500:3])
+        np.testing.assert_allclose(np.asarray(self.axis * 1000 + 5), self.materialized * 1000 + 5)
+        with self.assertRaises(IndexError):
+            self.axis[1000]
+
+    def test_integer_array_indexing_matches_materialized_array(self):
+        indices = np.array([0, 5, 999, -1, -1000], dtype=np.int32)
+        np.testing.assert_array_equal(self.axis[indices], self.materialized[indices])
+        with self.assertRaises(IndexError):
+            self.axis[np.array([1000])]
+
+    def test_searchsorted_matches_materialized_array(self):
+        rng = np.random.default_rng(0)
+        values = np.concatenate((rng.uniform(-0.1, 1.1, 500), self.materialized[::37], [0.0, 0.999, 1.0]))
+
+        for value in values:
+            for side in ("left", "right"):
+                self.assertEqual(
+                    self.axis.searchsorted(value, side=side),
+                    self.materialized.searchsorted(value, side=side),
+                )
+        for side in ("left", "right"):
+            np.testing.assert_array_equal(
+                self.axis.searchsorted(values, side=side),
+                self.materialized.searchsorted(values, side=side),
+            )
+
+    def test_absolute_ranges_to_indices_accepts_axis(self):
+        ranges = [NumericRange(0.1, 0.2), NumericRange(0.5005, 0.9)]
+
+        self.assertEqual(
+            absolute_ranges_to_indices(self.axis, ranges),
+            absolute_ranges_to_indices(self.materialized, ranges),
+        )
+
+    def test_mean_and_concatenate_stay_implicit(self):
+        shifted = UniformAxis(1.0, 0.001, 500)
+
+        self.assertIsInstance(mean_axis([self.axis, self.axis], 500), UniformAxis)
+        self.assertEqual(concatenate_axes([self.axis, shifted]), UniformAxis(0.0, 0.001, 1500))
+        gapped = concatenate_axes([self.axis, UniformAxis(2.0, 0.001, 10)])
+        self.assertIsInstance(gapped, np.ndarray)
+        self.assertEqual(len(gapped), 1010)
+
+    def test_mean_profile_distances_match_materialized_distances(self):
+        header = ProfileHeader(prof_version=1, serial_number="test", sample_step=1.0)
+        hardnesses = np.full(1000, 300.0, dtype=np.float32)
+        implicit = [Profile("a.prof", ProfileData(self.axis, hardnesses), header, 128, 0.0)]
+        explicit = [Profile("a.prof", ProfileData(self.materialized, hardnesses), header, 128, 0.0)]
+
+        np.testing.assert_allclose(
+            np.asarray(calc_mean_profile(implicit)[0]),
+            calc_mean_profile(explicit)[0],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
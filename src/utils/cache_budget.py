@@ -0,0 +1,131 @@
+"""
+One memory budget shared by the caches of loaded rolls.
+
+Caches account the bytes of each entry they keep in a CacheBudget. When the
+total goes over the budget the least recently used entries are evicted,
+whichever cache they belong to, so a cache in heavy use can take room from
+an idle one without the total growing. Big entries count by their size, so
+one big roll pushes out as many small ones as it needs. Hits, misses and
+evictions of each cache are counted for the log.
+
+The budget is used from the GUI thread and from worker threads. Eviction
+callbacks are called after the budget's lock is released, from the thread
+that added the entry, and must not assume the entry is still cached.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Tuple
+
+import settings
+
+
+@dataclass
+class CacheStats:
+    entries: int = 0
+    bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+def format_bytes(count):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(count) < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GiB"
+
+
+class CacheBudget:
+    """Least recently used entries of all registered caches, limited by bytes in total."""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        # (cache name, key) -> (bytes, evict callback), least recently used first
+        self._entries: Dict[Tuple[str, Hashable], Tuple[int, Callable[[Hashable], None]]] = OrderedDict()
+        self._stats: Dict[str, CacheStats] = {}
+        self.total_bytes = 0
+
+    def _cache_stats(self, cache_name):
+        stats = self._stats.get(cache_name)
+        if stats is None:
+            stats = self._stats[cache_name] = CacheStats()
+        return stats
+
+    def add(self, cache_name, key, nbytes, evict: Callable[[Hashable], None]):
+        """
+        Account nbytes for key of cache_name as most recently used and evict
+        least recently used entries until the total is within the budget.
+        The added entry stays even if it alone is over the budget.
+        """
+        with self._lock:
+            self._pop(cache_name, key)
+            self._entries[(cache_name, key)] = (nbytes, evict)
+            stats = self._cache_stats(cache_name)
+            stats.entries += 1
+            stats.bytes += nbytes
+            self.total_bytes += nbytes
+
+            evicted = []
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                (evicted_cache, evicted_key), (_, evicted_callback) = next(iter(self._entries.items()))
+                self._pop(evicted_cache, evicted_key)
+                self._cache_stats(evicted_cache).evictions += 1
+                evicted.append((evicted_callback, evicted_key))
+
+        for callback, evicted_key in evicted:
+            callback(evicted_key)
+
+    def touch(self, cache_name, key):
+        """Mark key of cache_name as most recently used."""
+        with self._lock:
+            if (cache_name, key) in self._entries:
+                self._entries.move_to_end((cache_name, key))
+
+    def discard(self, cache_name, key):
+        """Stop accounting key of cache_name, which its cache has dropped or taken back into use."""
+        with self._lock:
+            self._pop(cache_name, key)
+
+    def _pop(self, cache_name, key):
+        entry = self._entries.pop((cache_name, key), None)
+        if entry is not None:
+            stats = self._stats[cache_name]
+            stats.entries -= 1
+            stats.bytes -= entry[0]
+            self.total_bytes -= entry[0]
+
+    def record_hit(self, cache_name):
+        with self._lock:
+            self._cache_stats(cache_name).hits += 1
+
+    def record_miss(self, cache_name):
+        with self._lock:
+            self._cache_stats(cache_name).misses += 1
+
+    def stats(self) -> Dict[str, CacheStats]:
+        """Return a copy of the counters of each cache."""
+        with self._lock:
+            return {name: CacheStats(**vars(stats)) for name, stats in self._stats.items()}
+
+    def summary(self):
+        """Return the memory use, hit rate and evictions of each cache as one line of text."""
+        parts = []
+        for name, stats in self.stats().items():
+            hit_rate = f"{stats.hit_rate:.0%}" if stats.hit_rate is not None else "-"
+            parts.append(
+                f"{name}: {stats.entries} entries, {format_bytes(stats.bytes)}, "
+                f"{hit_rate} hits of {stats.hits + stats.misses}, {stats.evictions} evicted"
+            )
+        return (
+            f"Cache memory {format_bytes(self.total_bytes)} of {format_bytes(self.max_bytes)}"
+            + "".join(f"; {part}" for part in parts)
+        )
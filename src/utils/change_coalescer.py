@@ -0,0 +1,65 @@
+"""
+Batching of file system change notifications.
+
+A file transfer writing many profiles makes the file system watcher report
+each of them separately. ChangeCoalescer collects the changed paths until no
+new change has come in for a short while and reports them once, without
+duplicates.
+"""
+
+import os
+import time
+from PySide6.QtCore import QObject, Signal, QTimer
+import settings
+
+
+class ChangeCoalescer(QObject):
+    """
+    Collects changed paths and emits changes_ready(list) with each path once,
+    in the order they first changed, delay_ms after the latest change. A
+    steady stream of changes is still reported every max_delay_ms.
+    """
+    changes_ready = Signal(list)
+
+    def __init__(self, delay_ms=None, max_delay_ms=None, parent=None):
+        super().__init__(parent)
+        self.delay_ms = delay_ms if delay_ms is not None else settings.FILE_CHANGE_COALESCE_DELAY_MS
+        self.max_delay_ms = max_delay_ms if max_delay_ms is not None else settings.FILE_CHANGE_COALESCE_MAX_DELAY_MS
+        # Normalized path -> path as reported
+        self._paths = {}
+        self._first_change_time = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+    def add(self, path):
+        if not path:
+            return
+        if not self._paths:
+            self._first_change_time = time.monotonic()
+        self._paths.setdefault(self._key(path), path)
+
+        waited_ms = (time.monotonic() - self._first_change_time) * 1000
+        self._timer.start(max(0, int(min(self.delay_ms, self.max_delay_ms - waited_ms))))
+
+    def pending_paths(self):
+        return list(self._paths.values())
+
+    def flush(self):
+        """Report the collected changes now."""
+        self._timer.stop()
+        paths = self.pending_paths()
+        self.clear()
+        if paths:
+            self.changes_ready.emit(paths)
+
+    def clear(self):
+        """Forget the collected changes without reporting them."""
+        self._timer.stop()
+        self._paths = {}
+        self._first_change_time = None
@@ -0,0 +1,184 @@
+"""
+Min/max preserving decimation of long profiles for plotting.
+
+A line can't show more detail than the pixel columns it is drawn into. For
+each column it is enough to draw the samples where the line enters and
+leaves the column and its minimum and maximum (M4 aggregation); the
+rendered line then looks the same as with all samples.
+
+DecimatedSeries precomputes the index of the minimum and maximum of every
+aligned block of 4, 8, 16, ... samples. The extremes of a pixel column are
+found among the few blocks its sample range decomposes into, so the cost
+of a view depends on the plot width in pixels, not on the number of samples.
+"""
+
+import copy
+
+import numpy as np
+
+# Views with fewer samples per pixel are drawn with all samples
+MAX_POINTS_PER_PIXEL = 4
+_FIRST_LEVEL_BLOCK_SIZE = 4
+
+
+def _reduce_pairs(indices, values, pick_min):
+    """Pick the min or max of each pair of neighbouring blocks."""
+    left = indices[0:len(indices) - 1:2]
+    right = indices[1::2]
+    if pick_min:
+        chosen = np.where(values[left] <= values[right], left, right)
+    else:
+        chosen = np.where(values[left] >= values[right], left, right)
+    if len(indices) % 2:
+        # The last block has no pair, it is carried over as is
+        chosen = np.append(chosen, indices[-1])
+    return chosen
+
+
+class DecimatedSeries:
+    """x, y samples of a line with x increasing, viewable at any resolution."""
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = np.asarray(y)
+
+        # Argmin and argmax of each aligned block for block sizes 4, 8, 16, ...,
+        # one level after another; level n (block size 2**n) starts at _offsets[n - 2]
+        argmins, argmaxs = [], []
+        argmin = argmax = np.arange(len(self.y), dtype=np.int32)
+        block_size = 1
+        while len(argmin) > 1:
+            argmin = _reduce_pairs(argmin, self.y, pick_min=True)
+            argmax = _reduce_pairs(argmax, self.y, pick_min=False)
+            block_size *= 2
+            if block_size >= _FIRST_LEVEL_BLOCK_SIZE:
+                argmins.append(argmin)
+                argmaxs.append(argmax)
+
+        self._level_count = len(argmins)
+        self._offsets = np.cumsum([0] + [len(level) for level in argmins])
+        self._argmin = np.concatenate(argmins) if argmins else np.array([], dtype=np.int32)
+        self._argmax = np.concatenate(argmaxs) if argmaxs else np.array([], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.y)
+
+    def with_x(self, x):
+        """Return the same samples at other x positions, sharing the precomputed blocks."""
+        series = copy.copy(self)
+        series.x = x
+        return series
+
+    @property
+    def nbytes(self):
+        return self._argmin.nbytes + self._argmax.nbytes
+
+    def _visible_range(self, x_min, x_max):
+        start = int(self.x.searchsorted(x_min, side="left"))
+        stop = int(self.x.searchsorted(x_max, side="right"))
+        return start, stop
+
+    def _range_candidates(self, starts, stops):
+        """
+        Return (sample index, range number) pairs that include the min and
+        max of each sample range starts[i]:stops[i].
+
+        Each range is split into the largest aligned blocks that fit in it,
+        at most two per block size, and the extremes of those blocks are
+        returned. All block sizes are handled at once as rows of 2D arrays.
+        """
+        longest = int(np.max(stops - starts))
+        level_count = min(longest.bit_length(), self._level_count + 2)
+        levels = np.arange(level_count)[:, np.newaxis]
+        block_sizes = np.left_shift(1, levels)
+
+        first = -(-starts // block_sizes)
+        end = stops // block_sizes
+        # Blocks covered by a fully contained block of the next size are skipped
+        parent_first = -(-starts // (2 * block_sizes))
+        parent_end = stops // (2 * block_sizes)
+        has_parent = parent_first < parent_end
+        covered_first = np.where(has_parent, 2 * parent_first, 0)
+        covered_end = np.where(has_parent, 2 * parent_end, 0)
+
+        blocks = np.stack((first, first + 1, end - 1))
+        valid = (
+            (blocks >= first) & (blocks < end)
+            & ~((blocks >= covered_first) & (blocks < covered_end))
+        )
+        shape = blocks.shape
+        block_levels = np.broadcast_to(levels, shape)[valid]
+        range_numbers = np.broadcast_to(np.arange(len(starts)), shape)[valid]
+        blocks = blocks[valid]
+
+        # Single samples and pairs of samples are taken as is
+        singles = block_levels == 0
+        pairs = block_levels == 1
+        larger = block_levels >= 2
+        flat = self._offsets[block_levels[larger] - 2] + blocks[larger]
+        indices = np.concatenate((
+            blocks[singles],
+            2 * blocks[pairs],
+            2 * blocks[pairs] + 1,
+            self._argmin[flat],
+            self._argmax[flat],
+        ))
+        numbers = np.concatenate((
+            range_numbers[singles],
+            range_numbers[pairs],
+            range_numbers[pairs],
+            range_numbers[larger],
+            range_numbers[larger],
+        ))
+        return indices, numbers
+
+    def indices(self, x_min, x_max, pixels):
+        """Return the sorted indices of samples to draw for x_min..x_max over pixels columns."""
+        start, stop = self._visible_range(x_min, x_max)
+        # One sample beyond each edge keeps the line running to the plot border
+        before, after = max(start - 1, 0), min(stop + 1, len(self.y))
+        pixels = max(int(pixels), 1)
+        if stop <= start or x_max <= x_min or self._level_count == 0:
+            return np.arange(before, after)
+
+        # Pixel columns the visible samples fall into
+        first_column, last_column = np.floor(
+            (np.array([self.x[start], self.x[stop - 1]]) - x_min) / (x_max - x_min) * pixels
+        ).astype(int)
+        if stop - start <= MAX_POINTS_PER_PIXEL * (last_column - first_column + 1):
+            return np.arange(before, after)
+
+        edges = x_min + (x_max - x_min) * np.arange(first_column + 1, last_column + 1) / pixels
+        bounds = np.clip(self.x.searchsorted(edges, side="left"), start, stop)
+        bounds = np.concatenate(([start], bounds, [stop]))
+        starts, stops = bounds[:-1], bounds[1:]
+        nonempty = starts < stops
+        starts, stops = starts[nonempty], stops[nonempty]
+
+        candidates, columns = self._range_candidates(starts, stops)
+
+        # Min and max of each column: sort by column, then by value
+        order = np.lexsort((self.y[candidates], columns))
+        sorted_columns = columns[order]
+        group_first = np.flatnonzero(np.diff(sorted_columns, prepend=-1))
+        group_last = np.append(group_first[1:], len(order)) - 1
+
+        return np.unique(np.concatenate((
+            np.arange(before, start),
+            np.arange(stop, after),
+            starts,
+            stops - 1,
+            candidates[order[group_first]],
+            candidates[order[group_last]],
+        )))
+
+    def view(self, x_min, x_max, pixels):
+        """Return (x, y) arrays to draw for the x range x_min..x_max."""
+        indices = self.indices(x_min, x_max, pixels)
+        return np.asarray(self.x[indices], dtype=float), self.y[indices]
+
+    def full_view(self, pixels):
+        """Return (x, y) for the whole series, keeping its x and y extents."""
+        if len(self.y) == 0:
+            return np.array([], dtype=float), self.y
+        return self.view(self.x[0], self.x[-1], pixels)
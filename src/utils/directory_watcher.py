@@ -0,0 +1,123 @@
+"""
+Watching of the roll folder tree for changes.
+
+QFileSystemWatcher registers an OS watch for every path. DirectoryWatcher
+keeps the set of watched folders in sync with the folder tree by adding and
+removing only the folders that appeared or disappeared, and polls the
+modification times of folders the OS refused to watch, e.g. when the inotify
+watch limit is reached.
+"""
+
+import logging
+import os
+from PySide6.QtCore import QObject, Signal, QFileSystemWatcher, QTimer
+import settings
+
+log = logging.getLogger(__name__)
+
+
+def _path_key(path):
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+def _modified_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class DirectoryWatcher(QObject):
+    """
+    Watches a root folder and its immediate subfolders.
+
+    Signals:
+        directory_changed(str): A watched folder was modified, removed or renamed.
+        file_changed(str): A watched file was modified, removed or renamed.
+    """
+    directory_changed = Signal(str)
+    file_changed = Signal(str)
+
+    def __init__(self, poll_interval_ms=None, parent=None):
+        super().__init__(parent)
+        self.root_directory = None
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self.directory_changed)
+        self._watcher.fileChanged.connect(self.file_changed)
+
+        # Path key -> (path, modification time) of folders watched by polling
+        self._polled = {}
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(
+            poll_interval_ms if poll_interval_ms is not None else settings.DIRECTORY_POLL_INTERVAL_MS)
+        self._poll_timer.timeout.connect(self._poll)
+
+    def watch(self, directory):
+        """
+        Watch directory and its immediate subfolders, keeping the watches of
+        folders already watched. Raises OSError if directory can't be listed.
+        """
+        if self.root_directory is None or _path_key(self.root_directory) != _path_key(directory):
+            self.clear()
+        self.root_directory = directory
+
+        wanted = {_path_key(directory): directory}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    wanted.setdefault(_path_key(entry.path), entry.path)
+
+        watched = {_path_key(path): path for path in self._watcher.directories()}
+        removed = [path for key, path in watched.items() if key not in wanted]
+        if removed:
+            self._watcher.removePaths(removed)
+        for key in [key for key in self._polled if key not in wanted]:
+            del self._polled[key]
+
+        added = [path for key, path in wanted.items() if key not in watched and key not in self._polled]
+        failed = self._watcher.addPaths(added) if added else []
+        if failed:
+            log.warning(f"Could not watch {len(failed)} folders, checking them for changes by polling instead.")
+        for path in failed:
+            self._polled[_path_key(path)] = (path, _modified_ns(path))
+        self._update_poll_timer()
+
+    def watched_directories(self):
+        return self._watcher.directories() + [path for path, _ in self._polled.values()]
+
+    def polled_directories(self):
+        return [path for path, _ in self._polled.values()]
+
+    def clear(self):
+        """Stop watching all folders."""
+        directories = self._watcher.directories()
+        if directories:
+            self._watcher.removePaths(directories)
+        files = self._watcher.files()
+        if files:
+            self._watcher.removePaths(files)
+        self._polled = {}
+        self.root_directory = None
+        self._update_poll_timer()
+
+    def _update_poll_timer(self):
+        if self._polled and not self._poll_timer.isActive():
+            self._poll_timer.start()
+        elif not self._polled:
+            self._poll_timer.stop()
+
+    def _poll(self):
+        changed = []
+        for key, (path, modified) in list(self._polled.items()):
+            current = _modified_ns(path)
+            if current == modified:
+                continue
+            if current is None:
+                # Removed folders are no longer watched, like with QFileSystemWatcher
+                del self._polled[key]
+            else:
+                self._polled[key] = (path, current)
+            changed.append(path)
+        self._update_poll_timer()
+        for path in changed:
+            self.directory_changed.emit(path)
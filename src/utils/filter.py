@@ -35,7 +35,7 @@ def bandpass_filter(data, lowcut, highcut, fs, numtaps=settings.FILTER_NUMTAPS,
     if len(data) == 0:
         return data
 
-    original_mean = np.mean(data)
+    original_mean = float(np.mean(data, dtype=np.float64))
 
     data_length = len(data)
     # Adjust number of taps if data is too short
@@ -60,6 +60,10 @@ def bandpass_filter(data, lowcut, highcut, fs, numtaps=settings.FILTER_NUMTAPS,
         hamming_window = np.hamming(numtaps)
         fir_coeff *= hamming_window
 
+    # Filter in the precision of the data so float32 input stays float32
+    if np.issubdtype(data.dtype, np.floating):
+        fir_coeff = fir_coeff.astype(data.dtype)
+
     if False:
         w, h = freqz(fir_coeff, worN=8000)
         # Convert w to cy/m
@@ -95,7 +99,7 @@ def bandpass_filter(data, lowcut, highcut, fs, numtaps=settings.FILTER_NUMTAPS,
     if correct_mean:
         if len(filtered_data) == 0:
             return filtered_data
-        filtered_data = filtered_data - np.mean(filtered_data)
+        filtered_data = filtered_data - float(np.mean(filtered_data, dtype=np.float64))
         filtered_data += original_mean
 
     return filtered_data
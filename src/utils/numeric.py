@@ -0,0 +1,37 @@
+"""
+Numeric precision helpers for hardness samples.
+
+Hardness samples are kept in the precision configured by
+settings.NUMERIC_PRECISION through loading, averaging and filtering.
+Reductions that accumulate many samples (means, variances, prefix sums)
+upcast to float64 so that the lower storage precision does not leak into
+the reported statistics.
+"""
+
+import numpy as np
+
+import settings
+
+ACCUMULATOR_DTYPE = np.float64
+
+
+def sample_dtype():
+    """Return the dtype used for hardness samples held in memory."""
+    return np.dtype(settings.NUMERIC_PRECISION)
+
+
+def as_samples(values):
+    """Return values as a float array, keeping float32 and float64 input as is."""
+    values = np.asarray(values)
+    if values.dtype in (np.float32, np.float64):
+        return values
+    return values.astype(sample_dtype())
+
+
+def nbytes(*arrays):
+    """Return the number of bytes held by the given arrays, ignoring None."""
+    return sum(
+        array.nbytes if hasattr(array, "nbytes") else np.asarray(array).nbytes
+        for array in arrays
+        if array is not None
+    )
@@ -355,6 +355,28 @@ band_pass_low = _default_value('band_pass_low')
 band_pass_high = _default_value('band_pass_high')
 
 
+# Called with the set of changed preference keys after preferences are updated or loaded
+_change_listeners = []
+
+
+def add_change_listener(listener):
+    if listener not in _change_listeners:
+        _change_listeners.append(listener)
+
+
+def remove_change_listener(listener):
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+
+def _notify_changed(keys):
+    for listener in list(_change_listeners):
+        try:
+            listener(set(keys))
+        except Exception as error:
+            print(f"Preference change listener failed: {error}")
+
+
 def get_preferences_file_path():
     return preferences_file_path
 
@@ -395,6 +417,7 @@ def update_preferences(updates):
 
     _sanitize_cross_field_preferences()
     save_preferences_to_file()
+    _notify_changed(updates.keys())
 
 
 def get_distance_unit_info():
@@ -420,6 +443,7 @@ def load_preferences_from_file(path):
                 raise OSError(f"Could not create '{target_path}'")
             globals()['preferences_file_path'] = target_path
             print(f"Created preferences file with defaults at {target_path}")
+            _notify_changed(_DEFAULTS.keys())
             return LoadPreferencesResult(LOAD_STATUS_CREATED_DEFAULTS, target_path)
 
         status, payload = _read_preferences_file(target_path)
@@ -431,6 +455,7 @@ def load_preferences_from_file(path):
         _apply_loaded_preferences(payload)
         globals()['preferences_file_path'] = target_path
         print(f"Loaded preferences from {target_path}")
+        _notify_changed(_DEFAULTS.keys())
         return LoadPreferencesResult(LOAD_STATUS_LOADED, target_path)
     except Exception as error:
         for key, value in previous_preferences.items():
@@ -453,6 +478,7 @@ def overwrite_preferences_file_with_defaults(path):
             raise OSError(f"Could not write '{target_path}'")
         globals()['preferences_file_path'] = target_path
         print(f"Overwrote preferences file with defaults at {target_path}")
+        _notify_changed(_DEFAULTS.keys())
         return LoadPreferencesResult(LOAD_STATUS_CREATED_DEFAULTS, target_path)
     except Exception as error:
         for key, value in previous_preferences.items():
@@ -4,6 +4,9 @@ from utils import preferences
 from utils.filter import bandpass_filter
 from utils.translation import _
 from utils.excluded_regions import get_included_samples
+from utils.spectral_stats import SPECTRAL_STAT_SPECS
+from utils.numeric import ACCUMULATOR_DTYPE, as_samples, sample_dtype
+from utils.uniform_axis import concatenate_axes, mean_axis
 
 # Implement here any custom more complicated profile statistics
 
@@ -57,7 +60,7 @@ STAT_SPECS = [
         "long_label": _("SLOPE_LONG"),
         "unit": "g",
     },
-]
+] + SPECTRAL_STAT_SPECS
 
 
 def excluded_regions_aware(func):
@@ -71,6 +74,7 @@ def excluded_regions_aware(func):
         if len(data) == 0:
             return np.nan
 
+        data = as_samples(data)
         if preferences.excluded_regions_mode != settings.EXCLUDED_REGIONS_MODE_NONE and len(data) > 0:
             unit_info = preferences.get_distance_unit_info()
             included_data, _ = get_included_samples(
@@ -83,8 +87,8 @@ def excluded_regions_aware(func):
             # If all data is excluded, return NaN
             if len(included_data) == 0:
                 return np.nan
-            return func(included_data)
-        return func(data)
+            return float(func(included_data))
+        return float(func(data))
     return wrapper
 
 
@@ -101,6 +105,10 @@ analysis_to_alert_name = {
     spec["analysis_key"]: spec["name"]
     for spec in STAT_SPECS
 }
+alert_to_analysis_name = {
+    spec["name"]: spec["analysis_key"]
+    for spec in STAT_SPECS
+}
 stat_units = {spec["name"]: spec["unit"] for spec in STAT_SPECS}
 
 
@@ -121,7 +129,7 @@ def _get_included_data_with_positions(profile_data):
     if isinstance(profile_data, tuple) and len(profile_data) == 2:
         distances, data = profile_data
 
-    data = np.asarray(data, dtype=float)
+    data = as_samples(data)
     if len(data) <= 1:
         positions = np.zeros(len(data), dtype=float)
     else:
@@ -156,25 +164,94 @@ def _get_included_data_with_positions(profile_data):
     return positions, data
 
 
+def _closed_form_slope(n, sum_x, sum_y, sum_xx, sum_xy):
+    """Least-squares slope from the running sums of a straight-line fit."""
+    if n < 2:
+        return 0.0
+    denominator = n * sum_xx - sum_x * sum_x
+    if denominator <= 0:
+        return 0.0
+    return float((n * sum_xy - sum_x * sum_y) / denominator)
+
+
+def prefix_sum(values):
+    prefix = np.zeros(len(values) + 1, dtype=float)
+    np.cumsum(values, out=prefix[1:])
+    return prefix
+
+
+class LinearFitSums:
+    """
+    Prefix sums for closed-form least-squares line fits.
+
+    Sums of x, y, x*x and x*y are accumulated once, after which the slope of
+    any contiguous sample window [start, end) is answered in O(1). Both axes
+    are shifted by their first sample before summing to keep the sums well
+    conditioned; the slope is invariant to such shifts.
+    """
+
+    def __init__(self, positions, data):
+        positions = np.asarray(positions, dtype=float)
+        data = np.asarray(data, dtype=float)
+        if len(positions) != len(data):
+            raise ValueError("positions and data must have the same length")
+
+        self.length = len(data)
+        x = positions - positions[0] if self.length else positions
+        y = data - data[0] if self.length else data
+
+        self._sum_x = prefix_sum(x)
+        self._sum_y = prefix_sum(y)
+        self._sum_xx = prefix_sum(x * x)
+        self._sum_xy = prefix_sum(x * y)
+
+    def _window(self, start, end):
+        start = 0 if start is None else min(self.length, max(0, int(start)))
+        end = self.length if end is None else min(self.length, int(end))
+        return start, max(start, end)
+
+    def slope(self, start=None, end=None):
+        """Return the least-squares slope of samples in [start, end)."""
+        start, end = self._window(start, end)
+        return _closed_form_slope(
+            end - start,
+            self._sum_x[end] - self._sum_x[start],
+            self._sum_y[end] - self._sum_y[start],
+            self._sum_xx[end] - self._sum_xx[start],
+            self._sum_xy[end] - self._sum_xy[start],
+        )
+
+
+def linear_fit_slope(positions, data):
+    """Return the least-squares slope of data over positions in a single pass."""
+    positions = np.asarray(positions, dtype=float)
+    data = np.asarray(data, dtype=float)
+    if len(data) < 2:
+        return 0.0
+
+    x = positions - positions[0]
+    y = data - data[0]
+    return _closed_form_slope(len(data), np.sum(x), np.sum(y), np.dot(x, x), np.dot(x, y))
+
+
 def calc_slope(f):
     positions, data = _get_included_data_with_positions(f)
 
     if len(data) == 0:
         return np.nan
-    if len(data) < 2:
-        return 0.0
 
-    slope, _ = np.polyfit(positions, data, 1)
-    return float(slope)
+    return linear_fit_slope(positions, data)
 
 
 class Stats:
     def __init__(self):
-        self.mean = excluded_regions_aware(np.mean)
-        self.std = excluded_regions_aware(np.std)
+        self.mean = excluded_regions_aware(lambda f: np.mean(f, dtype=ACCUMULATOR_DTYPE))
+        self.std = excluded_regions_aware(lambda f: np.std(f, dtype=ACCUMULATOR_DTYPE))
         self.min = excluded_regions_aware(np.min)
         self.max = excluded_regions_aware(np.max)
-        self.cv = excluded_regions_aware(lambda f: (np.std(f) / np.mean(f)) * 100)
+        self.cv = excluded_regions_aware(
+            lambda f: (np.std(f, dtype=ACCUMULATOR_DTYPE) / np.mean(f, dtype=ACCUMULATOR_DTYPE)) * 100
+        )
         self.pp = excluded_regions_aware(lambda f: np.max(f) - np.min(f))
         self.slope = calc_slope
 
@@ -247,23 +324,25 @@ def calc_mean_profile(profiles, band_pass_low=None, band_pass_high=None, sample_
                 current_distance += distances[-1] + settings.SAMPLE_INTERVAL_M
 
         # Stack the distances and values
-        all_distances = np.concatenate(distances_list)
-        all_values = np.concatenate(values_list)
+        all_distances = concatenate_axes(distances_list)
+        all_values = as_samples(np.concatenate(values_list))
 
-        mean_profile = np.array([all_distances, all_values])
+        mean_profile = (all_distances, all_values)
 
     else:
         min_length = min(len(profile.data.distances)
                          for profile in filtered_profiles)
-        truncated_profiles = [
-            np.vstack((
-                profile.data.distances[:min_length],
-                profile.data.hardnesses[:min_length]
-            ))
-            for profile in filtered_profiles
-        ]
-        stacked_profiles = np.stack(truncated_profiles, axis=1)
-        mean_profile = np.mean(stacked_profiles, axis=1)
+        # Accumulate in float64, the mean is stored back in sample precision
+        mean_distances = mean_axis(
+            [profile.data.distances for profile in filtered_profiles],
+            min_length,
+        )
+        mean_values = np.mean(
+            [profile.data.hardnesses[:min_length] for profile in filtered_profiles],
+            axis=0,
+            dtype=ACCUMULATOR_DTYPE,
+        ).astype(sample_dtype())
+        mean_profile = (mean_distances, mean_values)
 
     distances = mean_profile[0]
     values = bandpass_filter(
@@ -6,6 +6,8 @@ from typing import Iterable, Literal
 
 import numpy as np
 
+from utils.uniform_axis import UniformAxis
+
 
 RangeMode = Literal["none", "relative", "absolute"]
 
@@ -100,6 +102,13 @@ def relative_ranges_to_indices(sample_count: int, ranges: Iterable[NumericRange]
     return index_ranges
 
 
+def _as_distance_array(distances):
+    # Implicit uniform axes answer indexing and searchsorted without materializing
+    if isinstance(distances, UniformAxis):
+        return distances
+    return np.asarray(distances, dtype=float)
+
+
 def absolute_ranges_to_indices(
     distances: Iterable[float] | np.ndarray | None,
     ranges: Iterable[NumericRange],
@@ -107,7 +116,7 @@ def absolute_ranges_to_indices(
     if distances is None:
         return []
 
-    distance_array = np.asarray(distances, dtype=float)
+    distance_array = _as_distance_array(distances)
     if len(distance_array) == 0:
         return []
 
@@ -118,8 +127,8 @@ def absolute_ranges_to_indices(
     for numeric_range in ranges:
         start_value = clamp_value(numeric_range.start, profile_start, profile_end)
         end_value = clamp_value(numeric_range.end, profile_start, profile_end)
-        start_idx = int(np.searchsorted(distance_array, start_value, side="left"))
-        end_idx = int(np.searchsorted(distance_array, end_value, side="right"))
+        start_idx = int(distance_array.searchsorted(start_value, side="left"))
+        end_idx = int(distance_array.searchsorted(end_value, side="right"))
         start_idx = max(0, min(start_idx, len(distance_array)))
         end_idx = max(0, min(end_idx, len(distance_array)))
         if start_idx < end_idx:
@@ -136,7 +145,7 @@ def ranges_to_visual_coordinates(
     if distances is None:
         return []
 
-    distance_array = np.asarray(distances, dtype=float)
+    distance_array = _as_distance_array(distances)
     if len(distance_array) == 0 or mode == "none":
         return []
 
@@ -0,0 +1,93 @@
+"""
+Roll name filtering shared by the roll list and the statistics analysis.
+
+Typing a filter pattern re-filters every roll on each change. RollFilter
+remembers which roll names matched each recent pattern, so a pattern seen
+before, e.g. after deleting the last typed character, is not searched again.
+When a plain text pattern is extended, only the names that matched the
+previous pattern are searched: the others can't match the longer text.
+"""
+
+import re
+from collections import OrderedDict
+import settings
+
+_REGEX_SPECIAL_CHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+
+def is_literal(pattern):
+    """Return True if pattern matches only its own text."""
+    return not _REGEX_SPECIAL_CHARACTERS.intersection(pattern)
+
+
+def _narrows(previous_key, key):
+    """Return True if every name matching key also matches previous_key."""
+    (previous_pattern, previous_flags), (pattern, flags) = previous_key, key
+    if previous_flags != flags or not (is_literal(previous_pattern) and is_literal(pattern)):
+        return False
+    if flags & re.IGNORECASE:
+        return previous_pattern.lower() in pattern.lower()
+    return previous_pattern in pattern
+
+
+class RollFilter:
+    """The active roll name filter with the match results of recent patterns."""
+
+    def __init__(self, max_patterns=None):
+        self.max_patterns = max_patterns if max_patterns is not None else settings.ROLL_FILTER_CACHE_PATTERNS
+        self.pattern = ""
+        self.regex = None
+        # (pattern, flags) -> {roll name: matches}, most recently used last
+        self._results = OrderedDict()
+        self._active_results = None
+        # Results of the pattern the active one extends, names not matching it are skipped
+        self._narrowed_results = None
+
+    def set_pattern(self, pattern, regex):
+        """Make regex, compiled from pattern, the active filter. Returns True if the filter changed."""
+        if not pattern:
+            regex = None
+        if regex is None and self.regex is None:
+            return False
+        if regex is not None and self.regex is not None and regex.pattern == self.regex.pattern \
+                and regex.flags == self.regex.flags:
+            return False
+
+        previous_key = self._key(self.regex)
+        self.pattern = pattern if regex is not None else ""
+        self.regex = regex
+        self._active_results = None
+        self._narrowed_results = None
+        if regex is None:
+            return True
+
+        key = self._key(regex)
+        if previous_key is not None and previous_key in self._results and _narrows(previous_key, key):
+            self._narrowed_results = self._results[previous_key]
+        self._active_results = self._results.setdefault(key, {})
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_patterns:
+            self._results.popitem(last=False)
+        return True
+
+    @staticmethod
+    def _key(regex):
+        return (regex.pattern, regex.flags) if regex is not None else None
+
+    def matches(self, name):
+        if self.regex is None:
+            return True
+        match = self._active_results.get(name)
+        if match is None:
+            if self._narrowed_results is not None and self._narrowed_results.get(name) is False:
+                match = False
+            else:
+                match = self.regex.search(name) is not None
+            self._active_results[name] = match
+        return match
+
+    def filter(self, items, key=lambda item: item):
+        """Return the items whose name, key(item), matches the filter."""
+        if self.regex is None:
+            return list(items)
+        return [item for item in items if self.matches(key(item))]
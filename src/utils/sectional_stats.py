@@ -0,0 +1,241 @@
+"""
+Sectional statistics over a mean profile.
+
+A SectionalStats engine precomputes prefix sums, prefix sums of squares and
+block sparse tables once per profile. After that mean, standard deviation,
+CV, min, max and slope are answered for any distance window without touching
+the samples again, which keeps per-section statistics cheap even for long
+continuous-mode profiles.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+import settings
+from utils import preferences
+from utils.excluded_regions import get_included_samples
+from utils.highlighted_regions import get_visual_distance_highlight_regions
+from utils.profile_stats import LinearFitSums, prefix_sum
+
+
+@dataclass(frozen=True)
+class SectionStats:
+    """Statistics of one profile section; field names match STAT_SPECS analysis keys."""
+
+    start: float    # Section start distance in meters
+    end: float      # Section end distance in meters
+    count: int      # Number of included samples in the section
+    mean: float
+    std: float
+    cv: float
+    min: float
+    max: float
+    slope: float
+
+    @property
+    def pp(self):
+        return self.max - self.min
+
+    def to_dict(self):
+        return {
+            "start": self.start,
+            "end": self.end,
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "cv": self.cv,
+            "min": self.min,
+            "max": self.max,
+            "pp": self.pp,
+            "slope": self.slope,
+        }
+
+
+class _BlockSparseTable:
+    """
+    Range minimum or maximum queries in O(1) table lookups.
+
+    The sparse table is built over per-block extrema instead of individual
+    samples so that memory stays at O(n / BLOCK_SIZE * log n); partial blocks
+    at the window edges are reduced directly from the samples.
+    """
+
+    BLOCK_SIZE = 64
+
+    def __init__(self, values, reducer, identity):
+        self._values = values
+        self._reduce = reducer
+
+        block_count = -(-len(values) // self.BLOCK_SIZE)
+        padded = np.full(block_count * self.BLOCK_SIZE, identity, dtype=float)
+        padded[:len(values)] = values
+        self._levels = [reducer.reduce(padded.reshape(block_count, self.BLOCK_SIZE), axis=1)]
+
+        span = 1
+        while span * 2 <= block_count:
+            previous = self._levels[-1]
+            self._levels.append(reducer(previous[:-span], previous[span:]))
+            span *= 2
+
+    def query(self, start, end):
+        """Reduce values[start:end]; the window must not be empty."""
+        first_block = start // self.BLOCK_SIZE
+        last_block = (end - 1) // self.BLOCK_SIZE
+        if last_block - first_block <= 1:
+            return self._reduce.reduce(self._values[start:end])
+
+        full_start = first_block + 1
+        full_end = last_block
+        result = self._reduce(
+            self._reduce.reduce(self._values[start:full_start * self.BLOCK_SIZE]),
+            self._reduce.reduce(self._values[full_end * self.BLOCK_SIZE:end]),
+        )
+
+        level = (full_end - full_start).bit_length() - 1
+        table = self._levels[level]
+        return self._reduce(result, self._reduce(table[full_start], table[full_end - (1 << level)]))
+
+
+class SectionalStats:
+    """
+    Window statistics over a profile with optional excluded samples.
+
+    Excluded samples are dropped once up front; a prefix count of included
+    samples maps any window of the full profile onto the included samples.
+    """
+
+    def __init__(self, distances, values, included_mask=None):
+        self.distances = np.asarray(distances, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if len(self.distances) != len(values):
+            raise ValueError("distances and values must have the same length")
+
+        if included_mask is None:
+            included_mask = np.ones(len(values), dtype=bool)
+        self._included_before = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(included_mask, out=self._included_before[1:])
+
+        if len(self.distances) > 1 and self.distances[-1] > self.distances[0]:
+            positions = (self.distances - self.distances[0]) / (self.distances[-1] - self.distances[0])
+        else:
+            positions = np.zeros(len(values), dtype=float)
+        self._positions = positions
+
+        included_values = values[included_mask]
+        # Shift by the mean before summing squares to avoid cancellation
+        self._shift = float(np.mean(included_values)) if len(included_values) else 0.0
+        shifted = included_values - self._shift
+        self._sum = prefix_sum(shifted)
+        self._sum_sq = prefix_sum(shifted * shifted)
+        self._min = _BlockSparseTable(included_values, np.minimum, np.inf)
+        self._max = _BlockSparseTable(included_values, np.maximum, -np.inf)
+        self._fit = LinearFitSums(positions[included_mask], included_values)
+
+    @classmethod
+    def from_profile_data(cls, profile_data):
+        """Build an engine for (distances, values), honoring excluded regions preferences."""
+        distances, values = profile_data
+        values = np.asarray(values, dtype=float)
+        included_mask = np.ones(len(values), dtype=bool)
+
+        if preferences.excluded_regions_mode != settings.EXCLUDED_REGIONS_MODE_NONE and len(values) > 0:
+            unit_info = preferences.get_distance_unit_info()
+            _, excluded_ranges = get_included_samples(
+                values,
+                preferences.excluded_regions,
+                mode=preferences.excluded_regions_mode,
+                distances=distances,
+                absolute_scale=1 / unit_info.conversion_factor,
+            )
+            for start_idx, end_idx in excluded_ranges:
+                included_mask[start_idx:end_idx] = False
+
+        return cls(distances, values, included_mask)
+
+    def __len__(self):
+        return len(self.distances)
+
+    def window(self, start, end):
+        """Return statistics for samples [start, end), or None if none are included."""
+        start = max(0, min(int(start), len(self)))
+        end = max(start, min(int(end), len(self)))
+        first = int(self._included_before[start])
+        last = int(self._included_before[end])
+        count = last - first
+        if count == 0:
+            return None
+
+        shifted_mean = (self._sum[last] - self._sum[first]) / count
+        variance = max((self._sum_sq[last] - self._sum_sq[first]) / count - shifted_mean ** 2, 0.0)
+        mean = self._shift + shifted_mean
+        std = float(np.sqrt(variance))
+
+        return SectionStats(
+            start=float(self.distances[start]),
+            end=float(self.distances[end - 1]),
+            count=count,
+            mean=float(mean),
+            std=std,
+            cv=std / mean * 100 if mean != 0 else np.nan,
+            min=float(self._min.query(first, last)),
+            max=float(self._max.query(first, last)),
+            # Scale to the section span so that slope is comparable to calc_slope
+            slope=self._fit.slope(first, last) * (self._positions[end - 1] - self._positions[start]),
+        )
+
+    def window_between(self, start_distance, end_distance):
+        """Return statistics for samples with start_distance <= distance <= end_distance."""
+        start = int(np.searchsorted(self.distances, start_distance, side="left"))
+        end = int(np.searchsorted(self.distances, end_distance, side="right"))
+        return self.window(start, end)
+
+    def fixed_length_sections(self, section_length):
+        """Split the profile into consecutive sections of section_length meters."""
+        if len(self) == 0 or section_length <= 0:
+            return []
+
+        span = self.distances[-1] - self.distances[0]
+        section_count = max(1, int(np.ceil(span / section_length)))
+        boundaries = self.distances[0] + section_length * np.arange(section_count + 1)
+        # Tolerate floating point error in sample distances at section boundaries
+        indices = np.searchsorted(self.distances, boundaries - 1e-9, side="left")
+        indices[-1] = len(self)
+
+        sections = []
+        for start, end in zip(indices[:-1], indices[1:]):
+            section = self.window(start, end)
+            if section is not None:
+                sections.append(section)
+        return sections
+
+    def region_sections(self, regions, absolute_scale=1.0):
+        """Return statistics for each distance highlight region."""
+        sections = []
+        for region in get_visual_distance_highlight_regions(regions, self.distances, absolute_scale):
+            section = self.window_between(region.start, region.end)
+            if section is not None:
+                sections.append(section)
+        return sections
+
+
+def calc_sectional_stats(profile_data, section_length=None):
+    """
+    Return per-section statistics for a mean profile.
+
+    Sections follow the configured distance highlight regions when there are
+    any, otherwise the profile is split every SECTION_STATS_LENGTH_M meters.
+    """
+    distances, values = profile_data
+    if len(values) == 0:
+        return []
+
+    engine = SectionalStats.from_profile_data((distances, values))
+    if section_length is None and preferences.distance_highlight_regions:
+        unit_info = preferences.get_distance_unit_info()
+        return engine.region_sections(
+            preferences.distance_highlight_regions,
+            absolute_scale=1 / unit_info.conversion_factor,
+        )
+
+    return engine.fixed_length_sections(section_length or settings.SECTION_STATS_LENGTH_M)
@@ -0,0 +1,259 @@
+"""
+Statistical process control over the roll history.
+
+A ControlChart follows one statistic roll by roll: the rolling mean and sigma
+of the latest rolls, an EWMA with its control limits, a two-sided tabular
+CUSUM and the Western Electric rules. The centre line and sigma are fixed
+from the first settings.SPC_BASELINE_ROLLS rolls. Each roll only updates a
+small running state, so ProcessControl keeps the charts of all statistics up
+to date with work proportional to the number of new rolls.
+"""
+
+import copy
+import math
+from collections import deque
+from typing import Dict, NamedTuple
+import numpy as np
+
+import settings
+
+RULE_BEYOND_3_SIGMA = 1
+RULE_2_OF_3_BEYOND_2_SIGMA = 2
+RULE_4_OF_5_BEYOND_1_SIGMA = 4
+RULE_8_ON_ONE_SIDE = 8
+RULE_CUSUM = 16
+RULE_EWMA = 32
+
+RULES = (
+    RULE_BEYOND_3_SIGMA,
+    RULE_2_OF_3_BEYOND_2_SIGMA,
+    RULE_4_OF_5_BEYOND_1_SIGMA,
+    RULE_8_ON_ONE_SIDE,
+    RULE_CUSUM,
+    RULE_EWMA,
+)
+
+
+class ControlChartData(NamedTuple):
+    """Control chart values of each roll. Rolls without a value, and the baseline's rules, are NaN or 0."""
+    rolling_mean: np.ndarray
+    rolling_sigma: np.ndarray
+    ewma: np.ndarray
+    ewma_limit: np.ndarray
+    cusum_high: np.ndarray
+    cusum_low: np.ndarray
+    violations: np.ndarray
+    centre: float | None
+    sigma: float | None
+
+    def take(self, rows):
+        """Return the values of rows, keeping the centre line and sigma."""
+        return self._replace(**{
+            field: getattr(self, field)[rows]
+            for field in ControlChartData._fields if field not in ('centre', 'sigma')
+        })
+
+
+class _ControlState:
+    """Running state of a control chart after the rolls added so far."""
+
+    def __init__(self, window):
+        self.baseline = []
+        self.centre = None
+        self.sigma = None
+        self.window = deque(maxlen=window)
+        self.window_sum = 0.0
+        self.window_sum_of_squares = 0.0
+        self.ewma = None
+        self.ewma_count = 0
+        self.cusum_high = 0.0
+        self.cusum_low = 0.0
+        # Distances from the centre line in sigmas of the latest rolls, for the Western Electric rules
+        self.zones = deque(maxlen=8)
+
+
+class ControlChart:
+    """Control chart of one statistic, extended one roll at a time."""
+
+    def __init__(self, baseline_rolls=None, window=None, ewma_lambda=None, ewma_width=None,
+                 cusum_k=None, cusum_h=None):
+        self.baseline_rolls = baseline_rolls if baseline_rolls is not None else settings.SPC_BASELINE_ROLLS
+        self.window = window if window is not None else settings.SPC_ROLLING_WINDOW
+        self.ewma_lambda = ewma_lambda if ewma_lambda is not None else settings.SPC_EWMA_LAMBDA
+        self.ewma_width = ewma_width if ewma_width is not None else settings.SPC_EWMA_LIMIT_SIGMAS
+        self.cusum_k = cusum_k if cusum_k is not None else settings.SPC_CUSUM_K
+        self.cusum_h = cusum_h if cusum_h is not None else settings.SPC_CUSUM_H
+        self.clear()
+
+    def clear(self):
+        self._state = _ControlState(self.window)
+        # Values of each roll, with room to grow
+        self._values = np.empty((64, 6))
+        self._violations = np.zeros(64, dtype=np.int64)
+        self.committed_count = 0
+        # State and value of the newest roll, which may still change
+        self._provisional_state = None
+        self.provisional_value = None
+
+    def __len__(self):
+        return self.committed_count + (self._provisional_state is not None)
+
+    def add(self, value):
+        """Add the value of the next roll, NaN if it has none."""
+        self._provisional_state = None
+        self.provisional_value = None
+        self._store(self.committed_count, self._step(self._state, value))
+        self.committed_count += 1
+
+    def set_provisional(self, value):
+        """Set the value of a roll after the added ones, replacing the previous provisional value."""
+        self._provisional_state = copy.deepcopy(self._state)
+        self.provisional_value = value
+        self._store(self.committed_count, self._step(self._provisional_state, value))
+
+    def _store(self, row, values):
+        if row >= len(self._values):
+            self._values = np.concatenate([self._values, np.empty_like(self._values)])
+            self._violations = np.concatenate([self._violations, np.zeros_like(self._violations)])
+        self._values[row] = values[:6]
+        self._violations[row] = values[6]
+
+    def data(self) -> ControlChartData:
+        """Return the values of all rolls. The arrays are views, changed by the next update."""
+        count = len(self)
+        state = self._provisional_state if self._provisional_state is not None else self._state
+        return ControlChartData(
+            *(self._values[:count, i] for i in range(6)),
+            violations=self._violations[:count],
+            centre=state.centre,
+            sigma=state.sigma,
+        )
+
+    def _step(self, state: _ControlState, value):
+        """Update state with value and return the control chart values of its roll."""
+        if value is None or math.isnan(value):
+            return (math.nan,) * 6 + (0,)
+
+        if len(state.window) == state.window.maxlen:
+            oldest = state.window[0]
+            state.window_sum -= oldest
+            state.window_sum_of_squares -= oldest * oldest
+        state.window.append(value)
+        state.window_sum += value
+        state.window_sum_of_squares += value * value
+        count = len(state.window)
+        rolling_mean = state.window_sum / count
+        rolling_sigma = math.nan
+        if count > 1:
+            variance = (state.window_sum_of_squares - count * rolling_mean * rolling_mean) / (count - 1)
+            rolling_sigma = math.sqrt(max(0.0, variance))
+
+        lam = self.ewma_lambda
+        state.ewma = value if state.ewma is None else lam * value + (1 - lam) * state.ewma
+        state.ewma_count += 1
+
+        if state.centre is None:
+            state.baseline.append(value)
+            if len(state.baseline) >= self.baseline_rolls:
+                state.centre = float(np.mean(state.baseline))
+                state.sigma = float(np.std(state.baseline, ddof=1)) if len(state.baseline) > 1 else 0.0
+                state.baseline = []
+                # The EWMA and its limits start from the centre line once it is known
+                state.ewma = state.centre
+                state.ewma_count = 0
+            return (rolling_mean, rolling_sigma, math.nan, math.nan, math.nan, math.nan, 0)
+
+        centre, sigma = state.centre, state.sigma
+        ewma_limit = self.ewma_width * sigma * math.sqrt(
+            lam / (2 - lam) * (1 - (1 - lam) ** (2 * state.ewma_count)))
+        violations = 0
+        if sigma > 0:
+            violations |= self._western_electric(state, (value - centre) / sigma)
+
+            allowance, decision = self.cusum_k * sigma, self.cusum_h * sigma
+            state.cusum_high = max(0.0, state.cusum_high + value - centre - allowance)
+            state.cusum_low = max(0.0, state.cusum_low + centre - allowance - value)
+            if state.cusum_high > decision or state.cusum_low > decision:
+                violations |= RULE_CUSUM
+            cusum_high, cusum_low = state.cusum_high, state.cusum_low
+            if violations & RULE_CUSUM:
+                # Restart after a signal so a single shift is reported once
+                state.cusum_high = state.cusum_low = 0.0
+
+            if abs(state.ewma - centre) > ewma_limit:
+                violations |= RULE_EWMA
+        else:
+            cusum_high = cusum_low = 0.0
+        return (rolling_mean, rolling_sigma, state.ewma, ewma_limit, cusum_high, cusum_low, violations)
+
+    @staticmethod
+    def _western_electric(state: _ControlState, zone):
+        state.zones.append(zone)
+        zones = list(state.zones)
+        violations = 0
+        if abs(zone) > 3:
+            violations |= RULE_BEYOND_3_SIGMA
+        side = 1 if zone > 0 else -1
+        if zone * side > 2 and sum(z * side > 2 for z in zones[-3:]) >= 2:
+            violations |= RULE_2_OF_3_BEYOND_2_SIGMA
+        if zone * side > 1 and sum(z * side > 1 for z in zones[-5:]) >= 4:
+            violations |= RULE_4_OF_5_BEYOND_1_SIGMA
+        if len(zones) == 8 and all(z * side > 0 for z in zones):
+            violations |= RULE_8_ON_ONE_SIDE
+        return violations
+
+
+class ProcessControl:
+    """
+    Control charts of each statistic over the roll history.
+
+    Rolls are sorted by time, so a sync normally only adds the rolls after
+    the previous ones. The newest roll may still be receiving profiles and is
+    only evaluated provisionally until a newer roll arrives. If earlier rolls
+    changed, e.g. after recalculating their statistics, the charts are built
+    again from the start.
+    """
+
+    def __init__(self, **chart_options):
+        self.chart_options = chart_options
+        self.roll_statistics = None
+        self._charts: Dict[str, ControlChart] = {}
+
+    def sync(self, roll_statistics):
+        """Follow roll_statistics, keeping the charts of the rolls that didn't change."""
+        if roll_statistics is self.roll_statistics:
+            return
+        previous, self.roll_statistics = self.roll_statistics, roll_statistics
+        for stat_name, chart in list(self._charts.items()):
+            committed = chart.committed_count
+            if committed == 0:
+                continue
+            # A vectorized comparison, only new rolls go through the charts
+            if len(roll_statistics) == committed or not roll_statistics.has_same_rows(previous, committed, [stat_name]):
+                chart.clear()
+
+    def chart(self, stat_name) -> ControlChart:
+        """Return the control chart of stat_name, extended with the rolls added since the last call."""
+        chart = self._charts.get(stat_name)
+        if chart is None:
+            chart = self._charts[stat_name] = ControlChart(**self.chart_options)
+        if self.roll_statistics is None or len(self.roll_statistics) == 0:
+            chart.clear()
+            return chart
+
+        values = self.roll_statistics.column(stat_name)
+        newest = len(values) - 1
+        for value in values[chart.committed_count:newest]:
+            chart.add(float(value))
+        value = float(values[newest])
+        if len(chart) == chart.committed_count or not _same_value(chart.provisional_value, value):
+            chart.set_provisional(value)
+        return chart
+
+    def clear(self):
+        self.roll_statistics = None
+        self._charts = {}
+
+
+def _same_value(a, b):
+    return a == b or (math.isnan(a) and math.isnan(b))
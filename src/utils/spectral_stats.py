@@ -0,0 +1,109 @@
+"""
+Spectral statistics of mean profiles.
+
+RMS amplitude within each configured wavelength band (settings.SPECTRAL_BANDS_M)
+and the dominant wavelength are derived from the Welch spectrum of the
+filtered mean profile. calc_spectral_stats evaluates them for many rolls at
+once: spectra of equal length profiles share one window and one batched FFT,
+and band sums are taken for all of those rolls with a single matrix product.
+"""
+
+import numpy as np
+
+import settings
+from utils.spectrum import WelchParams, calc_spectra, equivalent_noise_bandwidth
+from utils.translation import _
+
+DOMINANT_WAVELENGTH_KEY = "dominant_wavelength"
+
+
+def spectral_band_stat_key(band):
+    """Analysis key of the RMS statistic of a wavelength band, e.g. 'rms_0.02_0.1m'."""
+    shortest, longest = band
+    return f"rms_{shortest:g}_{longest:g}m"
+
+
+SPECTRAL_STAT_SPECS = [
+    {
+        "analysis_key": spectral_band_stat_key(band),
+        "name": f"{spectral_band_stat_key(band)}_g",
+        "label": _("ALERT_LIMIT_BAND_RMS").format(shortest=f"{band[0]:g}", longest=f"{band[1]:g}"),
+        "long_label": _("BAND_RMS_LONG").format(shortest=f"{band[0]:g}", longest=f"{band[1]:g}"),
+        "unit": "g",
+    }
+    for band in settings.SPECTRAL_BANDS_M
+] + [
+    {
+        "analysis_key": DOMINANT_WAVELENGTH_KEY,
+        "name": "dominant_wavelength_m",
+        "label": _("ALERT_LIMIT_DOMINANT_WAVELENGTH"),
+        "long_label": _("DOMINANT_WAVELENGTH_LONG"),
+        "unit": "m",
+    },
+]
+
+SPECTRAL_STAT_KEYS = [spec["analysis_key"] for spec in SPECTRAL_STAT_SPECS]
+
+
+def _band_masks(frequencies):
+    masks = []
+    for shortest, longest in settings.SPECTRAL_BANDS_M:
+        masks.append((frequencies >= 1 / longest) & (frequencies <= 1 / shortest))
+    return np.array(masks, dtype=float).reshape(len(masks), len(frequencies))
+
+
+def _spectrum_range_mask(frequencies):
+    return (
+        (frequencies > 0) &
+        (frequencies >= settings.SPECTRUM_LOWER_LIMIT_1M) &
+        (frequencies <= settings.SPECTRUM_UPPER_LIMIT_1M)
+    )
+
+
+def _stats_for_group(frequencies, powers, nperseg):
+    """Return spectral statistics for rows of powers sharing frequencies."""
+    # Band power sums divided by the window ENBW give the mean square amplitude
+    band_power = powers @ _band_masks(frequencies).T
+    band_rms = np.sqrt(band_power / equivalent_noise_bandwidth(nperseg))
+
+    in_range = _spectrum_range_mask(frequencies)
+    if np.any(in_range):
+        peak_bins = np.argmax(np.where(in_range, powers, -np.inf), axis=1)
+        dominant_wavelengths = 1 / frequencies[peak_bins]
+    else:
+        dominant_wavelengths = np.full(len(powers), np.nan)
+
+    results = []
+    for row in range(len(powers)):
+        stats = {
+            spec["analysis_key"]: float(band_rms[row, band_index])
+            for band_index, spec in enumerate(SPECTRAL_STAT_SPECS[:len(settings.SPECTRAL_BANDS_M)])
+        }
+        stats[DOMINANT_WAVELENGTH_KEY] = float(dominant_wavelengths[row])
+        results.append(stats)
+    return results
+
+
+def calc_spectral_stats(values_list, params=None):
+    """Return a dict of spectral statistics for each mean profile in values_list."""
+    params = params or WelchParams.from_settings()
+    spectra = calc_spectra(values_list, params)
+    results = [{key: np.nan for key in SPECTRAL_STAT_KEYS} for _values in values_list]
+
+    groups = {}
+    for index, (values, (frequencies, power)) in enumerate(zip(values_list, spectra)):
+        if len(power) == 0:
+            continue
+        groups.setdefault(params.for_length(len(values)), (frequencies, []))[1].append((index, power))
+
+    for length_params, (frequencies, rows) in groups.items():
+        powers = np.array([power for _index, power in rows])
+        for (index, _power), stats in zip(rows, _stats_for_group(frequencies, powers, length_params.nperseg)):
+            results[index] = stats
+
+    return results
+
+
+def calc_spectral_stat(values, analysis_key):
+    """Return one spectral statistic of a single mean profile."""
+    return calc_spectral_stats([values])[0][analysis_key]
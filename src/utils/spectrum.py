@@ -0,0 +1,177 @@
+"""
+Welch amplitude spectra of mean profiles.
+
+Spectra are computed with the same parameters as scipy.signal.welch using a
+Hann window, constant detrending and 'spectrum' scaling. Results are cached
+per (profile content hash, welch parameters) so that redraws which do not
+change the mean profile reuse the previous spectrum.
+
+calc_spectra computes the spectra of many profiles at once: profiles of equal
+length share one window and are transformed with a single batched FFT.
+
+Spectra are calculated from the GUI thread and from worker threads, the cache
+is only used with its lock held. The FFTs run without it.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import threading
+
+import numpy as np
+from scipy.signal import get_window
+
+import settings
+
+WINDOW = 'hann'
+
+
+@dataclass(frozen=True)
+class WelchParams:
+    fs: float
+    nperseg: int
+    noverlap: int
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            fs=1 / settings.SAMPLE_INTERVAL_M,
+            nperseg=int(settings.NPERSEG),
+            # welch truncates a fractional noverlap the same way
+            noverlap=int(settings.NOVERLAP),
+        )
+
+    def for_length(self, length):
+        """Return the parameters welch uses for a signal of the given length."""
+        nperseg = max(1, min(self.nperseg, length))
+        return WelchParams(self.fs, nperseg, min(self.noverlap, nperseg - 1))
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_windows = {}
+
+
+def _content_key(values, params):
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(values.tobytes(), digest_size=16)
+    digest.update(str((values.dtype.str, values.shape)).encode())
+    return digest.hexdigest(), params
+
+
+def _get_window(nperseg):
+    window = _windows.get(nperseg)
+    if window is None:
+        window = get_window(WINDOW, nperseg)
+        window.setflags(write=False)
+        _windows[nperseg] = window
+    return window
+
+
+def equivalent_noise_bandwidth(nperseg):
+    """Equivalent noise bandwidth of the analysis window in frequency bins."""
+    window = _get_window(nperseg)
+    return nperseg * np.sum(window ** 2) / np.sum(window) ** 2
+
+
+def _welch_rows(rows, params):
+    """Power spectra of equal length rows, one batched FFT over all segments."""
+    rows = np.asarray(rows, dtype=np.float64)
+    window = _get_window(params.nperseg)
+    step = params.nperseg - params.noverlap
+
+    segments = np.lib.stride_tricks.sliding_window_view(rows, params.nperseg, axis=-1)[:, ::step, :]
+    segments = segments - segments.mean(axis=-1, keepdims=True)
+    spectrum = np.fft.rfft(segments * window, axis=-1)
+
+    power = (spectrum.real ** 2 + spectrum.imag ** 2) / window.sum() ** 2
+    if params.nperseg % 2:
+        power[..., 1:] *= 2
+    else:
+        power[..., 1:-1] *= 2
+
+    frequencies = np.fft.rfftfreq(params.nperseg, 1 / params.fs)
+    return frequencies, power.mean(axis=1)
+
+
+def _empty_spectrum():
+    return np.array([], dtype=float), np.array([], dtype=float)
+
+
+def _remember(key, spectrum):
+    for array in spectrum:
+        array.setflags(write=False)
+    with _cache_lock:
+        _cache[key] = spectrum
+        _cache.move_to_end(key)
+        while len(_cache) > settings.SPECTRUM_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return spectrum
+
+
+def _cached(key):
+    """Return the cached spectrum of key, marking it most recently used, or None."""
+    with _cache_lock:
+        spectrum = _cache.get(key)
+        if spectrum is not None:
+            _cache.move_to_end(key)
+        return spectrum
+
+
+def calc_spectrum(values, params=None):
+    """
+    Return (frequencies, power) of values, reusing a cached result when the
+    same content was already analysed with the same parameters.
+    """
+    values = np.asarray(values)
+    if len(values) == 0:
+        return _empty_spectrum()
+
+    params = (params or WelchParams.from_settings()).for_length(len(values))
+    key = _content_key(values, params)
+    spectrum = _cached(key)
+    if spectrum is not None:
+        return spectrum
+
+    frequencies, power = _welch_rows(values[np.newaxis, :], params)
+    return _remember(key, (frequencies, power[0]))
+
+
+def calc_spectra(values_list, params=None):
+    """Return a list of (frequencies, power) for each profile in values_list."""
+    params = params or WelchParams.from_settings()
+    spectra = [None] * len(values_list)
+
+    pending = {}
+    for index, values in enumerate(values_list):
+        values = np.asarray(values)
+        if len(values) == 0:
+            spectra[index] = _empty_spectrum()
+            continue
+
+        length_params = params.for_length(len(values))
+        key = _content_key(values, length_params)
+        spectrum = _cached(key)
+        if spectrum is not None:
+            spectra[index] = spectrum
+            continue
+        pending.setdefault(length_params, {}).setdefault(len(values), []).append((index, key, values))
+
+    for length_params, groups in pending.items():
+        for entries in groups.values():
+            frequencies, power = _welch_rows([values for _, _, values in entries], length_params)
+            for row, (index, key, _) in enumerate(entries):
+                spectra[index] = _remember(key, (frequencies, power[row].copy()))
+
+    return spectra
+
+
+def amplitude_spectrum(spectrum):
+    """Convert a (frequencies, power) spectrum into amplitudes."""
+    frequencies, power = spectrum
+    return frequencies, np.sqrt(power)
+
+
+def clear_spectrum_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,196 @@
+"""
+Implicit evenly spaced distance axis.
+
+A profile's distance axis is fully defined by its first distance, the sample
+step and the sample count. UniformAxis stores just those three numbers and
+behaves like a read-only 1D float array where the application needs one:
+len(), indexing (including integer index arrays) and slicing, scalar
+arithmetic, searchsorted and implicit conversion with np.asarray (e.g. when
+plotting).
+"""
+
+import math
+import numbers
+
+import numpy as np
+
+
+class UniformAxis:
+    """Distances start + i * step for i in range(length)."""
+
+    __slots__ = ("start", "step", "length")
+
+    # Let UniformAxis handle `ndarray <op> UniformAxis` via its reflected operators
+    __array_priority__ = 1000
+
+    def __init__(self, start, step, length):
+        self.start = float(start)
+        self.step = float(step)
+        self.length = max(0, int(length))
+
+    @classmethod
+    def from_step(cls, step, length):
+        return cls(0.0, step, length)
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float64)
+
+    @property
+    def shape(self):
+        return (self.length,)
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def size(self):
+        return self.length
+
+    @property
+    def nbytes(self):
+        # No sample array is held, only start, step and length
+        return 0
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return f"UniformAxis(start={self.start!r}, step={self.step!r}, length={self.length!r})"
+
+    def __eq__(self, other):
+        if isinstance(other, UniformAxis):
+            return (self.start, self.step, self.length) == (other.start, other.step, other.length)
+        return NotImplemented
+
+    __hash__ = None
+
+    def _value_at(self, index):
+        return self.start + index * self.step
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, stride = key.indices(self.length)
+            return UniformAxis(self._value_at(start), self.step * stride, len(range(start, stop, stride)))
+        if isinstance(key, numbers.Integral):
+            index = int(key)
+            if index < 0:
+                index += self.length
+            if not 0 <= index < self.length:
+                raise IndexError(f"index {key} is out of bounds for axis of length {self.length}")
+            return self._value_at(index)
+        indices = np.asarray(key)
+        if indices.dtype.kind in "iu":
+            # Integer array indexing, computed without materializing the axis
+            indices = np.where(indices < 0, indices + self.length, indices)
+            if indices.size and (indices.min() < 0 or indices.max() >= self.length):
+                raise IndexError(f"index out of bounds for axis of length {self.length}")
+            return self._value_at(indices)
+        return np.asarray(self)[key]
+
+    def __iter__(self):
+        for index in range(self.length):
+            yield self._value_at(index)
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.start + np.arange(self.length) * self.step
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    def __add__(self, offset):
+        if isinstance(offset, numbers.Real):
+            return UniformAxis(self.start + offset, self.step, self.length)
+        return np.asarray(self) + offset
+
+    __radd__ = __add__
+
+    def __sub__(self, offset):
+        if isinstance(offset, numbers.Real):
+            return UniformAxis(self.start - offset, self.step, self.length)
+        return np.asarray(self) - offset
+
+    def __rsub__(self, other):
+        return other - np.asarray(self)
+
+    def __mul__(self, factor):
+        if isinstance(factor, numbers.Real):
+            return UniformAxis(self.start * factor, self.step * factor, self.length)
+        return np.asarray(self) * factor
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor):
+        if isinstance(divisor, numbers.Real):
+            return UniformAxis(self.start / divisor, self.step / divisor, self.length)
+        return np.asarray(self) / divisor
+
+    def _searchsorted_array(self, values, side):
+        values = np.asarray(values, dtype=float)
+        with np.errstate(invalid="ignore"):
+            offsets = np.clip(np.ceil((values - self.start) / self.step), 0, self.length)
+        indices = np.where(np.isnan(values), self.length, offsets).astype(np.intp)
+
+        def before(index):
+            samples = self._value_at(index)
+            return samples < values if side == "left" else samples <= values
+
+        # Step back and forth to match the rounding of the materialized samples
+        for _ in range(2):
+            indices -= (indices > 0) & ~before(np.maximum(indices - 1, 0))
+            indices += (indices < self.length) & before(np.minimum(indices, self.length - 1))
+        return indices
+
+    def searchsorted(self, value, side="left"):
+        """Return the insertion index of a value or array of values, like ndarray.searchsorted."""
+        if self.step <= 0 or self.length == 0:
+            return np.asarray(self).searchsorted(value, side=side)
+        if not isinstance(value, numbers.Real):
+            return self._searchsorted_array(value, side)
+        if math.isnan(value):
+            return self.length
+
+        def before(index):
+            sample = self._value_at(index)
+            return sample < value if side == "left" else sample <= value
+
+        offset = (value - self.start) / self.step
+        if offset <= 0:
+            index = 0
+        elif offset >= self.length:
+            index = self.length
+        else:
+            index = math.ceil(offset)
+        # Step back and forth to match the rounding of the materialized samples
+        while index > 0 and not before(index - 1):
+            index -= 1
+        while index < self.length and before(index):
+            index += 1
+        return index
+
+
+def mean_axis(axes, length):
+    """Return the elementwise mean of the first length samples of axes."""
+    if axes and all(isinstance(axis, UniformAxis) for axis in axes):
+        return UniformAxis(
+            np.mean([axis.start for axis in axes]),
+            np.mean([axis.step for axis in axes]),
+            length,
+        )
+    return np.mean([np.asarray(axis, dtype=float)[:length] for axis in axes], axis=0)
+
+
+def concatenate_axes(axes):
+    """Concatenate axes, staying implicit when they continue one another evenly."""
+    axes = [axis for axis in axes if len(axis) > 0]
+    if axes and all(isinstance(axis, UniformAxis) for axis in axes):
+        first = axes[0]
+        continuous = all(
+            math.isclose(axis.step, first.step)
+            and math.isclose(axis.start, previous[-1] + first.step)
+            for previous, axis in zip(axes, axes[1:])
+        )
+        if continuous:
+            return UniformAxis(first.start, first.step, sum(len(axis) for axis in axes))
+    if not axes:
+        return np.array([], dtype=float)
+    return np.concatenate([np.asarray(axis, dtype=float) for axis in axes])
@@ -0,0 +1,279 @@
+"""
+This module contains the background indexer for the roll modification dates shown in the directory list.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import NamedTuple
+from PySide6.QtCore import QObject, Signal, Slot, QTimer
+import settings
+
+log = logging.getLogger(__name__)
+
+# Folders with more files than this are not sorted by their profile dates
+CUSTOM_SORT_FILES_IN_DIRECTORY_LIMIT = 128
+
+
+def _scan_folders(directory_path):
+    """Yield the DirEntry lists of directory_path and its subfolders. Unreadable folders are skipped like os.walk does."""
+    directories = [directory_path]
+    while directories:
+        try:
+            with os.scandir(directories.pop()) as iterator:
+                entries = list(iterator)
+        except OSError:
+            continue
+        # DirEntry caches is_dir() and stat(), on Windows both come with the listing
+        directories.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        yield entries
+
+
+def scan_profile_files(directory_path):
+    """
+    Return (latest, count): the modification time of the newest profile file
+    in directory_path or its subfolders and the number of profiles in the roll
+    itself. latest is None if there are no profile files, a file can't be
+    accessed or a folder has more than CUSTOM_SORT_FILES_IN_DIRECTORY_LIMIT
+    files, count is None if the roll folder can't be listed.
+    """
+    latest = None
+    count = None
+    try:
+        for entries in _scan_folders(directory_path):
+            files = [entry for entry in entries if not entry.is_dir(follow_symlinks=False)]
+            profiles = [
+                entry for entry in files
+                if entry.name.lower().endswith('.prof') and entry.name.lower() != 'mean.prof'
+            ]
+            if count is None:
+                # The roll folder itself is listed first
+                count = len(profiles)
+            if len(files) > CUSTOM_SORT_FILES_IN_DIRECTORY_LIMIT:
+                return None, count
+            for entry in profiles:
+                modified = entry.stat().st_mtime
+                if latest is None or modified > latest:
+                    latest = modified
+    except OSError:
+        return None, count
+    return latest, count
+
+
+def latest_profile_mtime(directory_path):
+    """
+    Return the modification time of the newest profile file in directory_path
+    or its subfolders, see scan_profile_files.
+    """
+    return scan_profile_files(directory_path)[0]
+
+
+def folder_signature(directory_path):
+    """
+    Return the newest modification time in nanoseconds of directory_path and
+    its subfolders. It changes when profile files are added, removed or renamed
+    anywhere in the roll and only needs the folder listings, not a stat of
+    every file. Returns None if the folder can't be read or is too large to be
+    sorted by its profile dates.
+    """
+    try:
+        signature = os.stat(directory_path).st_mtime_ns
+        for entries in _scan_folders(directory_path):
+            if len(entries) > CUSTOM_SORT_FILES_IN_DIRECTORY_LIMIT:
+                return None
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    signature = max(signature, entry.stat(follow_symlinks=False).st_mtime_ns)
+    except (OSError, ValueError):
+        return None
+    return signature
+
+
+class IndexedRoll(NamedTuple):
+    """Result of index_roll: timestamp is the date shown and sorted by, signature the folder_signature it is valid for."""
+    signature: int | None
+    timestamp: float | None
+    profile_count: int | None
+
+
+def index_roll(directory_path, known: IndexedRoll | None = None):
+    """
+    Return the IndexedRoll of a roll: the modification time of its newest
+    profile file, or of the folder itself if it has none, and its number of
+    profiles. The profile files are only read if the folder_signature differs
+    from the known one. The timestamp is None if the folder can't be read.
+    """
+    signature = folder_signature(directory_path)
+    if known is not None and signature is not None and signature == known.signature:
+        return known
+
+    timestamp, profile_count = scan_profile_files(directory_path)
+    if timestamp is None:
+        try:
+            timestamp = os.path.getmtime(directory_path)
+        except (OSError, ValueError):
+            return IndexedRoll(None, None, None)
+    return IndexedRoll(signature, timestamp, profile_count)
+
+
+class RollDateIndex:
+    """
+    Roll folder path -> IndexedRoll, saved to a JSON file so the dates are
+    known right away in the next session. Rolls without a signature are shown
+    with their saved date but always rescanned.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._entries = {}
+        self.modified = False
+
+    def load(self):
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                entries = json.load(file)
+            self._entries = {path: IndexedRoll(*entry) for path, entry in entries.items()}
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            log.warning(f"Could not read roll date index {self.file_path}: {e}")
+            self._entries = {}
+        self.modified = False
+
+    def save(self):
+        if not self.modified:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            temp_path = f"{self.file_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({path: list(entry) for path, entry in self._entries.items()}, file)
+            os.replace(temp_path, self.file_path)
+            self.modified = False
+        except OSError as e:
+            log.warning(f"Could not save roll date index {self.file_path}: {e}")
+
+    def get(self, path):
+        return self._entries.get(path)
+
+    def set(self, path, indexed: IndexedRoll):
+        if self._entries.get(path) == indexed:
+            return
+        # Most recently indexed last, the oldest entries are dropped first
+        self._entries.pop(path, None)
+        self._entries[path] = indexed
+        while len(self._entries) > settings.ROLL_DATE_INDEX_MAX_ENTRIES:
+            del self._entries[next(iter(self._entries))]
+        self.modified = True
+
+    def invalidate(self, path):
+        """Make the next index_roll of path scan the folder, keeping the old date to show meanwhile."""
+        indexed = self.get(path)
+        if indexed is not None and indexed.signature is not None:
+            self._entries[path] = indexed._replace(signature=None)
+            self.modified = True
+
+
+class RollDateIndexer(QObject):
+    """
+    Indexes roll modification dates in a background thread, in the order they
+    are requested, and reports them in batches.
+
+    Signals:
+        dates_indexed(list): Emitted with (path, IndexedRoll) pairs.
+        idle(): Emitted when all requested dates have been reported.
+    """
+
+    dates_indexed = Signal(list)
+    idle = Signal()
+    _batch_indexed = Signal(list, bool)
+
+    def __init__(self, index_file_path=None, parent=None):
+        super().__init__(parent)
+        self.index = RollDateIndex(index_file_path or settings.ROLL_DATE_INDEX_FILE_PATH)
+        self.index.load()
+        self._pending = set()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self._batch_indexed.connect(self._on_batch_indexed)
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.timeout.connect(self.index.save)
+
+    def known(self, path):
+        """Return the last IndexedRoll of path, possibly from an earlier session, or None."""
+        return self.index.get(path)
+
+    def known_date(self, path):
+        """Return the last indexed timestamp of path, possibly from an earlier session."""
+        indexed = self.index.get(path)
+        return indexed.timestamp if indexed is not None else None
+
+    def request(self, path):
+        """Queue path for indexing unless it is already queued."""
+        if path in self._pending:
+            return
+        self._pending.add(path)
+        with self._lock:
+            self._queue.append((path, self.index.get(path)))
+            if self._thread is None:
+                # A plain daemon thread: it must not keep the application or a
+                # deleted model alive and needs no event loop of its own
+                self._thread = threading.Thread(target=self._run, name="RollDateIndexer", daemon=True)
+                self._thread.start()
+
+    def invalidate(self, path):
+        """Rescan path the next time it is requested."""
+        self.index.invalidate(path)
+
+    def is_busy(self):
+        return bool(self._pending)
+
+    def _run(self):
+        batch = []
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._thread = None
+                    break
+                path, known = self._queue.popleft()
+                more = bool(self._queue)
+
+            batch.append((path, index_roll(path, known)))
+            if len(batch) >= settings.ROLL_DATE_INDEX_BATCH_SIZE or not more:
+                if not self._emit_batch(batch, more):
+                    return
+                batch = []
+
+        if batch:
+            self._emit_batch(batch, False)
+
+    def _emit_batch(self, batch, more):
+        try:
+            self._batch_indexed.emit(batch, more)
+            return True
+        except RuntimeError:
+            # The indexer was deleted with its model
+            return False
+
+    @Slot(list, bool)
+    def _on_batch_indexed(self, batch, more):
+        for path, indexed in batch:
+            self._pending.discard(path)
+            if indexed.timestamp is not None:
+                self.index.set(path, indexed)
+        self.dates_indexed.emit(batch)
+
+        if self.index.modified:
+            self._save_timer.start(settings.ROLL_DATE_INDEX_SAVE_DELAY_MS)
+        if not self._pending:
+            self.idle.emit()
+
+    def save(self):
+        self._save_timer.stop()
+        self.index.save()
@@ -0,0 +1,325 @@
+"""
+This module contains the worker and manager for loading the roll shown in the profile view.
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from PySide6.QtCore import QObject, Signal, QThread, QTimer
+from models.RollView import RollView
+import settings
+import store
+
+log = logging.getLogger(__name__)
+
+CACHE_NAME = "Roll views"
+
+
+class RollViewWorker(QObject):
+    """
+    A worker that loads a roll and calculates its RollView in a separate thread.
+
+    Signals:
+        finished(object, int): Emitted when done with the RollView, or None if
+                               the load was cancelled or failed.
+        error(str, int): Emitted when an error occurs.
+    """
+    finished = Signal(object, int)
+    error = Signal(str, int)
+
+    def __init__(self, path: str, worker_id: int):
+        super().__init__()
+        self.path = path
+        self.worker_id = worker_id
+        self._running = True
+
+    def is_cancelled(self):
+        return not self._running
+
+    def run(self):
+        view = None
+        try:
+            if self._running:
+                view = self._load()
+        except Exception as e:
+            log.exception(f"Error loading roll {self.path}")
+            self.error.emit(str(e), self.worker_id)
+        self.finished.emit(view, self.worker_id)
+
+    def _load(self):
+        roll = store.roll_repository.acquire(self.path)
+        view = None
+        try:
+            if self._running:
+                view = RollView.build(
+                    self.path, roll, store.sorted_profiles(roll.profiles) or roll.profiles, self.is_cancelled)
+        finally:
+            # A view carries the reference to its roll, a cancelled load gives it back
+            if view is None:
+                store.roll_repository.release(self.path)
+        return view
+
+    def stop(self):
+        """
+        Cancels the load at the next step.
+        """
+        self._running = False
+
+
+class RollViewCache:
+    """
+    Least recently used RollViews, limited by count and bytes of sample data.
+
+    Each cached view holds a reference to its roll in store.roll_repository,
+    released when the view is evicted or discarded.
+
+    With a budget, the views are also accounted in the shared CacheBudget,
+    which calls evict(key) when it drops one, by default discarding it.
+    """
+
+    def __init__(self, max_count=None, max_bytes=None, budget=None, evict=None):
+        self.max_count = max_count if max_count is not None else settings.ROLL_VIEW_CACHE_SIZE
+        self.max_bytes = max_bytes if max_bytes is not None else settings.ROLL_VIEW_CACHE_MAX_BYTES
+        self.budget = budget
+        self._budget_evict = evict if evict is not None else self.discard
+        # Roll path key -> (RollView, bytes)
+        self._views = OrderedDict()
+        self.total_bytes = 0
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def __contains__(self, path):
+        return self._key(path) in self._views
+
+    def __len__(self):
+        return len(self._views)
+
+    def get(self, path):
+        """Return the cached view of path, or None if missing or its files changed."""
+        key = self._key(path)
+        view = self._views[key][0] if key in self._views else None
+        if view is not None and view.roll.is_stale():
+            self.discard(path)
+            view = None
+        if self.budget is not None:
+            if view is not None:
+                self.budget.record_hit(CACHE_NAME)
+            else:
+                self.budget.record_miss(CACHE_NAME)
+        if view is None:
+            return None
+        self._views.move_to_end(key)
+        if self.budget is not None:
+            self.budget.touch(CACHE_NAME, key)
+        return view
+
+    def put(self, view):
+        """Add a view, taking over its roll reference, and evict the least recently used views."""
+        self.discard(view.path)
+        key = self._key(view.path)
+        view_bytes = view.nbytes
+        self._views[key] = (view, view_bytes)
+        self.total_bytes += view_bytes
+        # The newest view stays even if it alone is over the byte limit
+        while len(self._views) > self.max_count or (
+            len(self._views) > 1 and self.total_bytes > self.max_bytes
+        ):
+            self._evict(next(iter(self._views)))
+        if self.budget is not None:
+            self.budget.add(CACHE_NAME, key, view_bytes, self._budget_evict)
+
+    def discard(self, path):
+        key = self._key(path)
+        if key in self._views:
+            self._evict(key)
+
+    def clear(self):
+        for key in list(self._views):
+            self._evict(key)
+
+    def _evict(self, key):
+        view, view_bytes = self._views.pop(key)
+        self.total_bytes -= view_bytes
+        if self.budget is not None:
+            self.budget.discard(CACHE_NAME, key)
+        store.roll_repository.release(view.path)
+
+
+class RollViewLoader(QObject):
+    """
+    Loads rolls for the profile view one at a time in a separate thread.
+
+    Only the latest requested roll is delivered. A new request cancels the
+    load in progress and replaces any request still waiting for it to stop,
+    so moving quickly through the roll list doesn't queue up loads.
+
+    Once the selection has stayed put for ROLL_PREFETCH_DELAY_MS, the rolls
+    given to prefetch() are loaded in the background into a RollViewCache,
+    and requesting one of them delivers it at once. Each delivered view
+    comes with a roll reference the receiver takes over, see
+    store.set_loaded_roll.
+    """
+
+    loaded = Signal(object)
+    error = Signal(str)
+    _budget_evicted = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+        self._worker = None
+        self._next_worker_id = 1
+        self._worker_id = 0
+        # Whether the result of the running worker is delivered or only cached
+        self._deliver_result = False
+        self._pending_path = None
+        self._prefetch_paths = []
+        # The budget may evict views from a worker thread, the cache is only changed in this one
+        self.cache = RollViewCache(budget=store.cache_budget, evict=self._budget_evicted.emit)
+        self._budget_evicted.connect(self.cache.discard)
+
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.timeout.connect(self._start_next)
+
+        # Invalidation is reported on the GUI thread
+        store.roll_repository.add_invalidation_listener(self._on_roll_invalidated)
+
+    def load(self, path: str):
+        """
+        Loads the roll at path, superseding earlier requests. A cached roll is
+        delivered before returning.
+        """
+        self._prefetch_timer.stop()
+        self._prefetch_paths = []
+        self._pending_path = None
+
+        if self._worker is not None and self._worker.path == path and not self._worker.is_cancelled():
+            # Already being loaded, possibly as a prefetch
+            self._deliver_result = True
+            return
+
+        if self._worker is not None:
+            # Start once the superseded worker has stopped, without waiting for it here
+            self._worker.stop()
+            self._deliver_result = False
+
+        view = self.cache.get(path)
+        if view is not None:
+            self._deliver(view)
+            return
+
+        self._pending_path = path
+        self._start_next()
+
+    def prefetch(self, paths):
+        """
+        Loads paths into the cache, nearest first, once no other request has
+        come in for ROLL_PREFETCH_DELAY_MS.
+        """
+        self._prefetch_paths = [path for path in paths if path not in self.cache]
+        if self._prefetch_paths:
+            self._prefetch_timer.start(settings.ROLL_PREFETCH_DELAY_MS)
+
+    def _start_next(self):
+        if self._worker is not None:
+            return
+        if self._pending_path is not None:
+            path, self._pending_path = self._pending_path, None
+            self._start(path, deliver_result=True)
+            return
+        if self._prefetch_timer.isActive():
+            return
+        while self._prefetch_paths:
+            path = self._prefetch_paths.pop(0)
+            if path not in self.cache and os.path.isdir(path):
+                self._start(path, deliver_result=False)
+                return
+
+    def _start(self, path: str, deliver_result: bool):
+        self._worker_id = self._next_worker_id
+        self._next_worker_id += 1
+        self._deliver_result = deliver_result
+        self._thread = QThread()
+        self._worker = RollViewWorker(path, self._worker_id)
+
+        self._worker.moveToThread(self._thread)
+
+        self._worker.finished.connect(self._on_finished)
+        self._worker.error.connect(self._on_error)
+        self._worker.finished.connect(self._thread.quit)
+        self._worker.finished.connect(self._worker.deleteLater)
+        self._thread.finished.connect(self._on_thread_finished)
+        self._thread.finished.connect(self._thread.deleteLater)
+        self._thread.started.connect(self._worker.run)
+
+        log.debug(f"{'Loading' if deliver_result else 'Prefetching'} roll {path} (worker {self._worker_id}).")
+        self._thread.start()
+
+    def _deliver(self, view):
+        # The receiver gets a reference of its own, the cache keeps the view's
+        store.roll_repository.acquire(view.path)
+        self.loaded.emit(view)
+
+    def _on_finished(self, view, worker_id: int):
+        """Internal handler for finished signal."""
+        if view is None:
+            return
+        if worker_id != self._worker_id:
+            store.roll_repository.release(view.path)
+            return
+        # A superseded load that completed anyway is kept for later
+        self.cache.put(view)
+        if self._deliver_result:
+            self._deliver(view)
+
+    def _on_error(self, error_message: str, worker_id: int):
+        """Internal handler for error signal."""
+        if worker_id == self._worker_id and self._deliver_result:
+            self.error.emit(error_message)
+
+    def _on_thread_finished(self):
+        """Internal handler for thread cleanup, starts the next request."""
+        self._thread = None
+        self._worker = None
+        self._start_next()
+
+    def _on_roll_invalidated(self, path):
+        if path is None:
+            self.cache.clear()
+        else:
+            self.cache.discard(path)
+
+    def clear_cache(self):
+        """Drops cached rolls, e.g. after preferences they were calculated with changed."""
+        self.cache.clear()
+
+    def cancel(self):
+        """
+        Cancels the load in progress, prefetching and any waiting request.
+        """
+        self._prefetch_timer.stop()
+        self._prefetch_paths = []
+        self._pending_path = None
+        self._deliver_result = False
+        if self._worker is not None:
+            self._worker.stop()
+
+    def stop(self):
+        """
+        Cancels loading, waits for the thread to finish and releases cached rolls.
+        """
+        self.cancel()
+        thread = self._thread
+        if thread is not None and thread.isRunning():
+            thread.quit()
+            if not thread.wait(5000):
+                log.warning("Roll view loader thread did not stop within timeout.")
+        self._worker_id = 0
+        self.cache.clear()
+        store.roll_repository.remove_invalidation_listener(self._on_roll_invalidated)
+
+    def is_loading(self):
+        return self._worker is not None
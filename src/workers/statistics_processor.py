@@ -3,11 +3,15 @@ This module contains the worker for processing statistics data.
 """
 
 import logging
+import math
 import os
 from typing import List, Dict, Any
 from PySide6.QtCore import QObject, Signal, QThread
-from models.Profile import RollDirectory
+from models.Profile import RollDirectory, RollMemoryUsage
+from models.RollStatistics import RollStatistics
+import store
 from utils.profile_stats import Stats
+from utils.spectral_stats import SPECTRAL_STAT_KEYS, calc_spectral_stats
 
 log = logging.getLogger(__name__)
 
@@ -18,11 +22,11 @@ class StatisticsProcessorWorker(QObject):
 
     Signals:
         progress(int, str, int): Emitted to report processing progress.
-        finished(list, int): Emitted when complete with list of roll data.
+        finished(RollStatistics, int): Emitted when complete with the statistics of all rolls.
         error(str, int): Emitted when an error occurs.
     """
     progress = Signal(int, str, int)
-    finished = Signal(list, int)
+    finished = Signal(object, int)
     error = Signal(str, int)
 
     def __init__(self, root_directory: str, worker_id: int):
@@ -55,37 +59,48 @@ class StatisticsProcessorWorker(QObject):
 
             self.progress.emit(30, f"Processing {len(dir_paths_in_root_dir)} rolls...", self.worker_id)
 
-            # Create RollDirectory objects
-            roll_directories = [RollDirectory(d) for d in dir_paths_in_root_dir]
-
-            if not self._running:
-                return
-
             self.progress.emit(50, "Calculating all statistics...", self.worker_id)
 
             # Process all statistics for all rolls
-            roll_data = self._process_all_rolls(roll_directories)
+            roll_statistics = RollStatistics.from_rolls(self._process_all_rolls(dir_paths_in_root_dir))
 
             if not self._running:
                 return
 
             self.progress.emit(100, "Complete", self.worker_id)
-            log.info(f"Statistics processing (worker {self.worker_id}) complete. Processed {len(roll_data)} rolls.")
-            self.finished.emit(roll_data, self.worker_id)
+            log.info(f"Statistics processing (worker {self.worker_id}) complete. Processed {len(roll_statistics)} rolls.")
+            self.finished.emit(roll_statistics, self.worker_id)
 
         except Exception as e:
             log.error(f"Error during statistics processing (worker {self.worker_id}): {e}")
             if self._running:
                 self.error.emit(str(e), self.worker_id)
-            self.finished.emit([], self.worker_id)
+            self.finished.emit(RollStatistics(), self.worker_id)
 
-    def _process_all_rolls(self, roll_directories: List[RollDirectory]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _log_memory_usage(usage: RollMemoryUsage):
+        log.debug(
+            f"Roll {os.path.basename(usage.path)}: {usage.profile_count} profiles, "
+            f"{usage.profile_bytes} bytes of profiles, "
+            f"{usage.mean_profile_bytes} bytes of mean profile"
+        )
+
+    def _process_all_rolls(self, roll_paths: List[str]) -> List[Dict[str, Any]]:
         """
-        Calculate all statistics for all roll directories.
-        Returns a list of roll data with all stats pre-computed.
+        Calculate all statistics for the rolls at roll_paths.
+        Returns a list of roll data with all stats pre-computed, in no particular order.
+
+        Rolls are borrowed from store.roll_repository one at a time, sharing
+        rolls already loaded by the views, and only their mean profiles are
+        kept for the spectral statistics. Released rolls stay in the cache
+        budget, so the next run parses only the rolls that were evicted.
+        Rolls out of date are read again here as new objects, the repository
+        swaps them in on the GUI thread.
         """
         roll_data = []
-        total = len(roll_directories)
+        mean_profiles = {}
+        total = len(roll_paths)
+        total_bytes = 0
 
         # Get all stat functions
         stat_funcs = {
@@ -98,7 +113,7 @@ class StatisticsProcessorWorker(QObject):
             'slope': self.stats.slope,
         }
 
-        for idx, roll_dir in enumerate(roll_directories):
+        for idx, roll_path in enumerate(roll_paths):
             if not self._running:
                 return roll_data
 
@@ -107,29 +122,57 @@ class StatisticsProcessorWorker(QObject):
                 progress = 50 + int((idx / total) * 50)  # 50-100% range
                 self.progress.emit(progress, f"Processing roll {idx + 1}/{total}...", self.worker_id)
 
-            if roll_dir.mean_profile is not None and len(roll_dir.mean_profile) > 0:
-                # Calculate all stats at once
-                stats = {}
-                profile_data = (roll_dir.distances, roll_dir.mean_profile)
-                for stat_name, stat_func in stat_funcs.items():
-                    try:
-                        stats[stat_name] = float(stat_func(profile_data))
-                    except Exception as e:
-                        log.warning(f"Error calculating {stat_name} for {roll_dir.path}: {e}")
-                        stats[stat_name] = None
-
-                # Store roll data with all stats
-                roll_data.append({
-                    'label': os.path.basename(roll_dir.path),
-                    'path': roll_dir.path,
-                    'timestamp': roll_dir.newest_timestamp,
-                    'stats': stats
-                })
-
-        # Sort by timestamp
-        roll_data.sort(key=lambda r: r['timestamp'])
+            with store.roll_repository.borrow(roll_path) as roll_dir:
+                usage = roll_dir.memory_usage()
+                self._log_memory_usage(usage)
+                total_bytes += usage.total_bytes
+                if roll_dir.mean_profile is not None and len(roll_dir.mean_profile) > 0:
+                    roll_data.append(self._roll_stats(roll_dir, stat_funcs, usage))
+                    mean_profiles[roll_dir.path] = roll_dir.mean_profile
+
+        log.info(f"Sample data of {total} rolls holds {total_bytes} bytes, read one roll at a time")
+        self._add_spectral_stats(roll_data, mean_profiles)
         return roll_data
 
+    @staticmethod
+    def _roll_stats(roll_dir: RollDirectory, stat_funcs, usage: RollMemoryUsage) -> Dict[str, Any]:
+        """Return the roll data of roll_dir with all stats of its mean profile."""
+        # Calculate all stats at once
+        stats = {}
+        profile_data = (roll_dir.distances, roll_dir.mean_profile)
+        for stat_name, stat_func in stat_funcs.items():
+            try:
+                stats[stat_name] = float(stat_func(profile_data))
+            except Exception as e:
+                log.warning(f"Error calculating {stat_name} for {roll_dir.path}: {e}")
+                stats[stat_name] = None
+
+        return {
+            'label': os.path.basename(roll_dir.path),
+            'path': roll_dir.path,
+            'timestamp': roll_dir.newest_timestamp,
+            'memory_bytes': usage.total_bytes,
+            'stats': stats
+        }
+
+    def _add_spectral_stats(self, roll_data: List[Dict[str, Any]], mean_profiles: Dict[str, Any]):
+        """Add frequency band statistics of all rolls, computed as one batch from their mean profiles by path."""
+        if not roll_data:
+            return
+
+        try:
+            spectral_stats = calc_spectral_stats([mean_profiles[roll['path']] for roll in roll_data])
+        except Exception as e:
+            log.warning(f"Error calculating spectral statistics: {e}")
+            spectral_stats = [{key: None for key in SPECTRAL_STAT_KEYS} for _ in roll_data]
+
+        for roll, stats in zip(roll_data, spectral_stats):
+            # Rolls without a spectrum in range are left out of the chart
+            roll['stats'].update({
+                key: None if value is None or math.isnan(value) else value
+                for key, value in stats.items()
+            })
+
     def stop(self):
         """
         Stops the processing.
@@ -144,7 +187,7 @@ class StatisticsProcessor(QObject):
     """
 
     progress = Signal(int, str)
-    finished = Signal(list)
+    finished = Signal(object)
     error = Signal(str)
 
     def __init__(self, parent=None):